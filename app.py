@@ -1,26 +1,139 @@
 import streamlit as st
-import pandas as pd
 from pipeline import MIPSPipeline
+from interpreter import MIPSInterpreter
+from parser import MIPSParser
+from elf_loader import ELF_MAGIC, ELFError, load_elf
+from program_image import ProgramImage, IMAGE_MAGIC
 from utils.assembler import MIPSAssembler
-from components.alu import signedVal
-import tempfile
+from utils.conversion import ConversionError
+from tracing import Tracer, RingBufferSink, CATEGORIES, OFF, INFO, DEBUG
+from register_history import RegisterHistory
+from components.registers import REGISTER_NAMES
+from result_cache import ResultCache, SimulationResult, program_key
+from perf_counters import cpi_stack_rows
+from branch_predictor import PREDICTORS
+import pandas as pd
 import os
 
+REGISTER_ROWS_SHOWN = 1000  # register states rendered per tab
+MEMORY_BYTES_SHOWN = 8 * 1024  # memory shown in the sidebar: the default 4 KiB and the start of .data
+RESULT_CACHE_ENTRIES = 32  # simulation results kept in memory
+CHECKPOINT_INTERVAL = 256  # cycles between pipeline checkpoints for the cycle inspector
+PROGRESS_INTERVAL = 500  # cycles between progress updates while the pipeline runs
+PROGRESS_ROWS = 20  # most recent cycles shown while the pipeline runs
+
+@st.cache_resource
+def get_result_cache():
+    """Simulation results shared by all sessions; set MIPS_CACHE_DIR to also keep them on disk."""
+    return ResultCache(max_entries=RESULT_CACHE_ENTRIES, directory=os.environ.get("MIPS_CACHE_DIR"),
+                       max_bytes=int(os.environ.get("MIPS_CACHE_MAX_MB", 256)) * 1024 * 1024)
+
+
+@st.cache_data(max_entries=RESULT_CACHE_ENTRIES)
+def assemble_source(source):
+    """Program image and formatted listing of its instructions for assembly source text."""
+    assembler = MIPSAssembler()
+    image = assembler.assemble(source.splitlines())
+    return image, assembler.format_machine_codes([f"{word:032b}" for word in image.text_words()])
+
+
+def run_pipelined(image, cycle_budget, trace_level, trace_categories, predictor):
+    """Run the pipeline with live progress and collect a SimulationResult."""
+    level = {"Off": OFF, "Info": INFO, "Debug": DEBUG}[trace_level]
+    trace_sink = RingBufferSink()
+    pipeline = MIPSPipeline(program=image, tracer=Tracer(level, trace_categories, trace_sink),
+                            checkpoint_interval=CHECKPOINT_INTERVAL, predictor=predictor)
+    # Execute the pipeline cycle-by-cycle, showing progress as it goes;
+    # pressing Stop reruns the script, which abandons the loop
+    st.button("Stop")
+    progress = st.progress(0.0)
+    status = st.empty()
+    recent_cycles = st.empty()
+    for state in pipeline.iter_cycles(cycle_budget):
+        if state.cycle % PROGRESS_INTERVAL == 0:
+            progress.progress(state.cycle / cycle_budget)
+            status.write(f"Cycle {state.cycle}: {state.retired} instructions retired, PC {state.pc}")
+            recent_cycles.dataframe(pipeline.trace.to_dataframe(max(0, state.cycle - PROGRESS_ROWS + 1)),
+                                    use_container_width=True)
+    progress.empty()
+    status.empty()
+    recent_cycles.empty()
+    pipeline.trace_registers()
+    return SimulationResult(pipeline.register_states, pipeline.io.io_memory, bytes(pipeline.memory.buffer),
+                            pipeline.trace, pipeline.checkpoints, pipeline.cycle,
+                            pipeline.stop_reason != 'budget', trace_sink.lines(), pipeline.perf_counters())
+
+
+def show_counters(counters):
+    """Performance counters of a pipelined run and its CPI stack."""
+    st.subheader("Performance counters")
+    cpi = f"{counters['cpi']:.3f}" if counters['cpi'] is not None else "-"
+    columns = st.columns(4)
+    columns[0].metric("Cycles", counters['cycles'])
+    columns[1].metric("Retired", counters['retired'])
+    columns[2].metric("CPI", cpi)
+    columns[3].metric("Load-use stalls", counters['load_use_stalls'])
+    accuracy = {kind: f"{counters[kind + '_accuracy']:.1%}" if counters[kind + '_accuracy'] is not None else "-"
+                for kind in ('branch', 'jump')}
+    events = {
+        "Branches (taken)": f"{counters['branches']} ({counters['branches_taken']})",
+        "Jumps": counters['jumps'],
+        f"Branch prediction accuracy ({counters['predictor']})": accuracy['branch'],
+        "Jump prediction accuracy": accuracy['jump'],
+        "Flushes (mispredictions)": counters['flushes'],
+        "Forwarded from EX/MEM": counters['forward_ex_mem'],
+        "Forwarded from MEM/WB": counters['forward_mem_wb'],
+        "Memory reads": counters['memory_reads'],
+        "Memory writes": counters['memory_writes'],
+        "I/O stores": counters['io_stores'],
+    }
+    st.dataframe(pd.DataFrame({"Count": [str(value) for value in events.values()]}, index=list(events)))
+    st.write("CPI stack (cycles by cause):")
+    stack = pd.DataFrame(cpi_stack_rows(counters), columns=["Cause", "Cycles", "CPI", "Share"]).set_index("Cause")
+    st.bar_chart(stack["CPI"])
+    st.dataframe(stack.style.format({"CPI": "{:.3f}", "Share": "{:.1%}"}, na_rep="-"))
+
+
+def show_cycle_inspector():
+    """Jump to any cycle of the last pipelined run by restoring its nearest checkpoint."""
+    inspected_run = st.session_state.get("inspected_run")
+    if inspected_run is None:
+        return
+    key, image, checkpoints, last_cycle, predictor = inspected_run
+    pipeline = st.session_state.get("inspector_pipeline")
+    if pipeline is None or st.session_state.get("inspector_key") != key:
+        # A fresh machine seeded with the run's checkpoints (restoring copies, so they stay intact)
+        pipeline = MIPSPipeline(program=image, checkpoint_interval=CHECKPOINT_INTERVAL, predictor=predictor)
+        pipeline.checkpoints = list(checkpoints)
+        st.session_state.inspector_pipeline = pipeline
+        st.session_state.inspector_key = key
+    st.subheader("Inspect a cycle")
+    cycle = int(st.number_input("Cycle", min_value=0, max_value=last_cycle, value=last_cycle, step=1))
+    pipeline.seek(cycle)
+    label = image.label(pipeline.PC)
+    st.write(f"PC: {pipeline.PC}" + (f" ({label})" if label else ""))
+    history = pipeline.register_states
+    st.dataframe(history.to_dataframe(len(history) - 1), use_container_width=True)
+    st.text(repr(pipeline.latches.current))
 
-def cleanup_files(file_path, binary_file_path):
-    # Clean up the temporary files
-    if file_path:
-        os.remove(file_path)
-    if binary_file_path:
-        os.remove(binary_file_path)
 
 def main_2():
     st.title("MIPS Pipeline Simulator")
     st.write("Choose an option to simulate the pipeline stages:")
 
+    sim_mode = st.radio("Simulation mode", ("Pipelined (cycle-by-cycle)", "Functional (fast, final results only)"))
+    if sim_mode == "Pipelined (cycle-by-cycle)":
+        with st.expander("Stage trace"):
+            trace_level = st.selectbox("Trace level", ("Off", "Info", "Debug"))
+            trace_categories = st.multiselect("Trace categories", CATEGORIES, default=list(CATEGORIES))
+        predictor = st.selectbox("Branch predictor", list(PREDICTORS),
+                                 help="How fetch guesses the path after a branch or jump; not-taken always "
+                                      "fetches the next instruction")
+    cycle_budget = int(st.number_input("Cycle budget", min_value=1, value=100000, step=1000,
+                                       help="Stop programs that have not halted after this many cycles (instructions in functional mode)"))
     code_format = st.radio("Select code format", ("MIPS Assembly", "Binary Code"))
-    file_path = None
-    binary_file_path = None
+    asm_source = None
+    binary_source = None
 
     if code_format == "MIPS Assembly":
         # Option to upload MIPS assembly file
@@ -31,49 +144,31 @@ def main_2():
             uploaded_file = st.file_uploader("Choose a MIPS assembly file", type="asm")
 
             if uploaded_file is not None:
-                # Read the uploaded file
-                with tempfile.NamedTemporaryFile(delete=False, mode='w', suffix='.asm') as tmp_file:
-                    tmp_file.write(uploaded_file.getvalue().decode("utf-8"))
-                    file_path = tmp_file.name
+                asm_source = uploaded_file.getvalue().decode("utf-8")
         else:
             # Text area for MIPS assembly code
-            mips_code = st.text_area("Enter MIPS Assembly Code", height=200)
-
-            if mips_code:
-                # Write the MIPS code to a temporary file
-                with tempfile.NamedTemporaryFile(delete=False, mode='w', suffix='.asm') as tmp_file:
-                    tmp_file.write(mips_code)
-                    file_path = tmp_file.name
+            asm_source = st.text_area("Enter MIPS Assembly Code", height=200) or None
     else:
          upload_option = st.radio("Select an input option", ("Upload binary file", "Enter binary code"))
          if upload_option == "Upload binary file":
             # File uploader for binary file
-            uploaded_file = st.file_uploader("Choose a binary file", type="txt")
+            uploaded_file = st.file_uploader("Choose a binary or hex file, program image or ELF executable",
+                                             type=["txt", "hex", "img", "elf"])
 
             if uploaded_file is not None:
-                # Read the uploaded binary file
-                with tempfile.NamedTemporaryFile(delete=False, mode='w') as tmp_file:
-                    tmp_file.write(uploaded_file.getvalue().decode("utf-8"))
-                    binary_file_path = tmp_file.name
+                binary_source = uploaded_file.getvalue()  # bytes: an image, an executable or binary/hex text
          else:
             # Text area for binary code
-            binary_code = st.text_area("Enter Binary Code (one instruction per line)", height=200)
-
-            if binary_code:
-                # Write the binary code to a temporary file
-                with tempfile.NamedTemporaryFile(delete=False, mode='w') as tmp_file:
-                    tmp_file.write(binary_code)
-                    binary_file_path = tmp_file.name
+            binary_source = st.text_area("Enter Binary or Hex Code (one instruction per line)", height=200) or None
     
-    if st.button("Run Pipeline"):
-        # Initialize the MIPS pipeline using the binary file path
-        if code_format == "MIPS Assembly" and file_path:
-            assembler = MIPSAssembler()
-            test_instructions = assembler.parse_asm(file_path)
-
+    if st.button("Run Pipeline") and (asm_source or binary_source):
+        if asm_source:
             # Assemble instructions to machine code
-            machine_codes = assembler.assemble_binary(test_instructions)
-            format_code = assembler.format_machine_codes(machine_codes)
+            try:
+                image, format_code = assemble_source(asm_source)
+            except ValueError as e:
+                st.error(f"Assembly failed: {e}")
+                st.stop()
 
             # Display the MIPS Assembly to Machine Code Conversion
             st.subheader("MIPS Assembly to Machine Code Conversion:")
@@ -83,52 +178,101 @@ def main_2():
             st.write("-" * 60)
             # Set assembled flag to True
             st.session_state.assembled = True
-            # Save binary code temporarily
-            with tempfile.NamedTemporaryFile(delete=False, mode='w') as tmp_file:
-                tmp_file.write("\n".join(machine_codes))  # Writing the machine code to the file
-                binary_file_path = tmp_file.name
+        elif isinstance(binary_source, bytes) and binary_source.startswith(IMAGE_MAGIC):
+            try:
+                image = ProgramImage.from_buffer(binary_source)
+            except ValueError as e:
+                st.error(f"Can't load the program image: {e}")
+                st.stop()
+        elif isinstance(binary_source, bytes) and binary_source.startswith(ELF_MAGIC):
+            try:
+                image = load_elf(binary_source)
+            except ELFError as e:
+                st.error(f"Can't load the executable: {e}")
+                st.stop()
+        else:
+            try:
+                # Binary or hex words, converted in bulk
+                image = MIPSParser().parse_image(program=binary_source)
+            except ConversionError as e:
+                st.error(f"Invalid program:\n{e}")
+                st.stop()
 
-        
-        pipeline = MIPSPipeline(binary_file_path)
-        st.subheader("MIPS Pipeline Execution (Cycle-by-Cycle):")
-        # Execute the pipeline cycle-by-cycle
-        register_states, io_memory, cycle_state = pipeline.run_pipeline()
-
-        # Convert the list of register states into a DataFrame
-        all_reg_names = ["$0", "$at", "$v0", "$v1", "$a0", "$a1", "$a2", "$a3",
-                        "$t0", "$t1", "$t2", "$t3", "$t4", "$t5", "$t6", "$t7",
-                        "$s0", "$s1", "$s2", "$s3", "$s4", "$s5", "$s6", "$s7",
-                        "$t8", "$t9", "$k0", "$k1", "$gp", "$sp", "$fp", "$ra"]
-        register_states_per_cycle = []
-        
-        # Process each cycle (state) and collect register values
-        for i, state in enumerate(register_states):
-            # Convert each register value using signedVal
-            all_reg_values = [signedVal(val) for val in state]
-            register_states_per_cycle.append(all_reg_values)
-        index_labels = ['Initial Value'] + [f'I{i}' for i in range(1, len(register_states))]
-        # Create a DataFrame from the collected register states
-        register_df = pd.DataFrame(register_states_per_cycle, columns=all_reg_names, index=index_labels)
+        pipelined = sim_mode == "Pipelined (cycle-by-cycle)"
+        config = {'mode': 'pipeline' if pipelined else 'functional', 'budget': cycle_budget}
+        if pipelined:
+            config.update(trace_level=trace_level, trace_categories=trace_categories,
+                          checkpoint_interval=CHECKPOINT_INTERVAL, predictor=predictor)
+        key = program_key(image, config)
+        cache = get_result_cache()
+        result = cache.get(key)
+
+        if pipelined:
+            st.subheader("MIPS Pipeline Execution (Cycle-by-Cycle):")
+        else:
+            st.subheader("MIPS Functional Execution:")
+        if result is not None:
+            st.caption("Loaded from the result cache")
+        elif pipelined:
+            try:
+                result = run_pipelined(image, cycle_budget, trace_level, trace_categories, predictor)
+            except IndexError as e:  # a load or store outside memory
+                st.error(f"Simulation failed: {e}")
+                st.stop()
+            cache.put(key, result)
+        else:
+            pipeline = MIPSInterpreter(program=image)
+            try:
+                register_states, io_memory = pipeline.run(max_steps=cycle_budget)
+            except IndexError as e:
+                st.error(f"Simulation failed: {e}")
+                st.stop()
+            result = SimulationResult(RegisterHistory.from_states(register_states), io_memory,
+                                      bytes(pipeline.memory.buffer), None, [], pipeline.instruction_count,
+                                      pipeline.halt, [])
+            cache.put(key, result)
+
+        if not result.completed:
+            unit = "cycles" if pipelined else "instructions"
+            st.warning(f"Stopped after {cycle_budget} {unit} without halting")
+        elif pipelined:
+            st.write(f"Completed in {result.cycles} cycles")
+        if result.counters is not None:
+            show_counters(result.counters)
+        if result.trace_lines:
+            with st.expander("Stage trace output"):
+                st.code("\n".join(result.trace_lines), language=None)
+        if pipelined:
+            # Keep the run for the cycle inspector, which seeks through its checkpoints
+            st.session_state.inspected_run = (key, image, result.checkpoints, result.cycles, predictor)
+        else:
+            st.session_state.pop("inspected_run", None)
+        register_states, io_memory, cycle_state = result.register_states, result.io_memory, result.cycle_trace
+
+        # Register history, rebuilt into DataFrames only for the rows shown
+        shown_rows = min(len(register_states), REGISTER_ROWS_SHOWN)
 
         # Display the register states over cycles
         st.write("Register States Over Cycles:")
+        if shown_rows < len(register_states):
+            st.caption(f"Showing the first {shown_rows} of {len(register_states)} states")
 
-        # Split the DataFrame into tabs for better readability
-        num_tabs = 4
-        tab_names = [f"Registers {i+1}-{i+8}" for i in range(0, len(all_reg_names), 8)]
+        # Split the registers into tabs for better readability
+        tab_names = [f"Registers {i+1}-{i+8}" for i in range(0, len(REGISTER_NAMES), 8)]
         tabs = st.tabs(tab_names)
 
         for i, tab in enumerate(tabs):
             with tab:
                 start_idx = i * 8
-                end_idx = min(start_idx + 8, len(all_reg_names))
+                end_idx = min(start_idx + 8, len(REGISTER_NAMES))
                 # Display DataFrame with index column renamed to "Instructions"
-                styled_df = register_df.iloc[:, start_idx:end_idx].copy()
+                styled_df = register_states.to_dataframe(0, shown_rows, range(start_idx, end_idx))
                 styled_df.index.name = "Instructions"
                 st.dataframe(styled_df)
-        st.write("Cycle-wise execution")
+        if cycle_state is not None:
+            st.write("Cycle-wise execution")
 
-        st.dataframe(cycle_state, use_container_width=True)
+            st.dataframe(cycle_state.to_dataframe(label=image.label if image.symbols else None), use_container_width=True)
 
         container = st.container()
         with container:
@@ -139,11 +283,11 @@ def main_2():
         
         # Move memory component view to the sidebar
         with st.sidebar.expander("Memory contents"):
-            
-            st.write(pipeline.memory.data)
-        
-        # Clean up the temporary files
-        cleanup_files(file_path, binary_file_path)
+            if len(result.memory) > MEMORY_BYTES_SHOWN:
+                st.caption(f"Showing the first {MEMORY_BYTES_SHOWN} of {len(result.memory)} bytes")
+            st.write([format(byte, '08b') for byte in result.memory[:MEMORY_BYTES_SHOWN]])
+
+    show_cycle_inspector()
 
 
 if __name__ == "__main__":
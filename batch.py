@@ -0,0 +1,153 @@
+"""
+Batch simulation of many programs on a process pool.
+
+Each .asm file is assembled with MIPSAssembler (.data included), each .img
+program image or .elf executable is memory-mapped and each .txt or .hex file is
+read as one 32-bit binary or hex instruction word per line. Programs are simulated in parallel
+with a ProcessPoolExecutor, and one JSON object per program is written as
+soon as its job finishes.
+
+Usage (from the repository root):
+    python batch.py tests/ "submissions/**/*.asm" --workers 8 --timeout 5 --mode functional -o results.jsonl
+"""
+import argparse
+import contextlib
+import glob
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from branch_predictor import PREDICTORS
+from interpreter import MIPSInterpreter
+from parser import MIPSParser
+from pipeline import MIPSPipeline
+from translator import MIPSTranslator
+from utils.assembler import MIPSAssembler
+
+MODES = ('pipeline', 'functional', 'translated')
+PROGRAM_EXTENSIONS = ('.asm', '.txt', '.hex', '.img', '.elf')
+CHECK_INTERVAL = 1024  # cycles/instructions between timeout checks
+
+
+def collect_programs(paths):
+    """Expand directories and glob patterns into a sorted list of program files."""
+    programs = set()
+    for path in paths:
+        if os.path.isdir(path):
+            for ext in PROGRAM_EXTENSIONS:
+                programs.update(glob.glob(os.path.join(path, '**', '*' + ext), recursive=True))
+        else:
+            programs.update(f for f in glob.glob(path, recursive=True) if f.endswith(PROGRAM_EXTENSIONS))
+    return sorted(programs)
+
+
+def load_program(program_path):
+    """ProgramImage of an .asm, .img, .elf, or binary or hex .txt/.hex program."""
+    if program_path.endswith('.asm'):
+        return MIPSAssembler().assemble_file(program_path)
+    return MIPSParser().parse_image(program_path)
+
+
+def _run_pipeline(image, deadline, predictor=None):
+    pipeline = MIPSPipeline(program=image, predictor=predictor)
+    cycles = 0
+    while not pipeline.empty_pipeline():
+        pipeline.run_cycle()
+        cycles += 1
+        if cycles % CHECK_INTERVAL == 0 and time.monotonic() > deadline:
+            raise TimeoutError
+    return {
+        'cycles': cycles,
+        'instructions': len(pipeline.register_states) - 1 + int(pipeline.halt),
+        'stalls': pipeline.stall_cycles,
+        'registers': pipeline.registers.snapshot(),
+        'io': list(pipeline.io.io_memory),
+        'counters': pipeline.perf_counters(),
+    }
+
+
+def _run_functional(simulator_class, image, deadline):
+    simulator = simulator_class(program=image, record_states=False)
+    while not simulator.halt:
+        simulator.run(max_steps=simulator.instruction_count + CHECK_INTERVAL)
+        if not simulator.halt and time.monotonic() > deadline:
+            raise TimeoutError
+    return {
+        'cycles': None,
+        'instructions': simulator.instruction_count,
+        'stalls': None,
+        'registers': simulator.registers.snapshot(),
+        'io': list(simulator.io.io_memory),
+    }
+
+
+def simulate_program(program_path, mode='pipeline', timeout=None, predictor=None):
+    """
+    Assemble (if needed) and simulate one program. Never raises: failures and
+    timeouts are reported in the 'status' and 'error' fields of the result.
+    """
+    start = time.monotonic()
+    deadline = start + timeout if timeout else float('inf')
+    result = {'program': program_path, 'mode': mode, 'status': 'ok'}
+    try:
+        # The parser reports some problems on stdout; keep workers quiet
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            image = load_program(program_path)
+            if mode == 'pipeline':
+                result.update(_run_pipeline(image, deadline, predictor))
+            elif mode == 'functional':
+                result.update(_run_functional(MIPSInterpreter, image, deadline))
+            else:
+                result.update(_run_functional(MIPSTranslator, image, deadline))
+    except TimeoutError:
+        result['status'] = 'timeout'
+    except Exception as e:
+        result['status'] = 'error'
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = round(time.monotonic() - start, 6)
+    return result
+
+
+def run_batch(programs, mode='pipeline', workers=None, timeout=None, predictor=None):
+    """Simulate programs on a process pool, yielding each result as its job finishes."""
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(simulate_program, program, mode, timeout, predictor) for program in programs]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def main(argv=None):
+    arg_parser = argparse.ArgumentParser(description="Simulate many MIPS programs in parallel.")
+    arg_parser.add_argument('paths', nargs='+', help="directories, files or glob patterns of .asm/.txt/.hex/.img/.elf programs")
+    arg_parser.add_argument('--mode', choices=MODES, default='pipeline')
+    arg_parser.add_argument('--predictor', choices=list(PREDICTORS), default=None,
+                            help="branch predictor of the pipeline (default: not-taken)")
+    arg_parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    arg_parser.add_argument('--timeout', type=float, default=None, help="per-program time limit in seconds")
+    arg_parser.add_argument('-o', '--output', default=None, help="JSON lines output file (default: stdout)")
+    args = arg_parser.parse_args(argv)
+
+    programs = collect_programs(args.paths)
+    if not programs:
+        arg_parser.error("no .asm, .txt, .hex, .img or .elf programs found")
+
+    out = open(args.output, 'w') if args.output else sys.stdout
+    counts = {'ok': 0, 'error': 0, 'timeout': 0}
+    start = time.monotonic()
+    try:
+        for result in run_batch(programs, args.mode, args.workers, args.timeout, args.predictor):
+            counts[result['status']] += 1
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+    finally:
+        if args.output:
+            out.close()
+    elapsed = time.monotonic() - start
+    print(f"{len(programs)} programs in {elapsed:.2f}s ({len(programs) / elapsed:.1f}/s): "
+          f"{counts['ok']} ok, {counts['error']} errors, {counts['timeout']} timeouts", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Assembler throughput in source lines per second: the streaming single-pass
+utils.assembler.MIPSAssembler against the old two-pass string assembler, on a
+generated program with labels and forward and backward branches.
+
+Run from the repository root:
+    python -m benchmarks.assembler_bench [--lines N] [--skip-old]
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from old.assembler_old import MIPSAssembler as StringAssembler
+from utils.assembler import MIPSAssembler
+
+BLOCK = [
+    "block{n}:",
+    "addi $t0, $t0, -1          # count down",
+    "add $t1, $t1, $t0",
+    "sll $t2, $t1, 2",
+    "lw $t3, 4($sp)",
+    "sw $t3, -8($sp)",
+    "beq $t0, $0, block{next}",
+    "ori $t4, $t4, 0xff",
+    "bne $t4, $t5, block{n}",
+    "jal block{next}",
+    "",
+]
+
+
+def write_program(path, lines):
+    """Write about `lines` lines of source made of labelled blocks that branch forwards and backwards."""
+    with open(path, 'w') as f:
+        blocks = max(1, lines // len(BLOCK))
+        for n in range(blocks):
+            f.writelines(line.format(n=n, next=n + 1) + "\n" for line in BLOCK)
+        f.write(f"block{blocks}:\nsyscall\n")
+
+
+def text_length(image):
+    return (image.text_end - image.text_start) // 4
+
+
+def timed(label, lines, assemble):
+    """Time `assemble`, which returns the number of instructions assembled."""
+    start = time.perf_counter()
+    instructions = assemble()
+    seconds = time.perf_counter() - start
+    print(f"{label:<32} {seconds:>8.2f} s {lines / seconds:>14,.0f} lines/s  ({instructions} instructions)")
+    return seconds
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--lines', type=int, default=200000)
+    arg_parser.add_argument('--skip-old', action='store_true', help="don't time the old assembler (slow for 1M+ lines)")
+    args = arg_parser.parse_args()
+
+    fd, asm_path = tempfile.mkstemp(suffix='.asm')
+    os.close(fd)
+    try:
+        write_program(asm_path, args.lines)
+        with open(asm_path) as f:
+            lines = sum(1 for _ in f)
+        print(f"{'Assembler':<32} {'Time':>10} {'Throughput':>20}")
+        print("-" * 70)
+
+        assembler = MIPSAssembler()
+        new = timed("streaming (file)", lines, lambda: text_length(assembler.assemble_file(asm_path)))
+        if not args.skip_old:
+            old_assembler = StringAssembler()
+            old = timed("old two-pass (list of strings)", lines,
+                        lambda: len(old_assembler.assemble_binary(old_assembler.parse_asm(asm_path))))
+            print(f"Speedup: {old / new:.1f}x")
+
+        tracemalloc.start()
+        image = assembler.assemble_file(asm_path)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"Streaming peak memory: {peak / 2**20:.1f} MiB ({peak / text_length(image):.1f} bytes per instruction)")
+    finally:
+        os.remove(asm_path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""
+Whole-file conversion of hex and binary program text to instruction words,
+and back: the bulk utils.conversion functions against the old line-by-line
+conversions, on files of millions of words.
+
+Run from the repository root:
+    python -m benchmarks.conversion_bench [--words N] [--skip-old]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+
+from old import conversion_old
+from utils.conversion import binary_to_words, hex_to_words, words_to_binary, words_to_hex
+
+
+def old_hex_words(path):
+    """Hex file to words the old way: binary strings per line, then int()."""
+    return [int(binary, 2) for binary in conversion_old.parse_hex_file(path)]
+
+
+def old_binary_words(path):
+    """Binary file to words line by line, as MIPSParser used to."""
+    words = []
+    with open(path) as f:
+        for line in f:
+            instruction = line.strip()
+            if len(instruction) == 32 and not instruction.strip('01'):
+                words.append(int(instruction, 2))
+    return words
+
+
+def new_words(convert, path):
+    with open(path, 'rb') as f:
+        return convert(f.read())
+
+
+def timed(label, words, convert):
+    """Best of three runs of `convert`, which returns the converted words or text."""
+    best = float('inf')
+    for _ in range(3):
+        start = time.perf_counter()
+        result = convert()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<36} {best:>8.3f} s {words / best / 1e6:>10.2f} M words/s")
+    return best, result
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--words', type=int, default=2000000)
+    arg_parser.add_argument('--skip-old', action='store_true', help="don't time the old line-by-line conversions")
+    args = arg_parser.parse_args()
+
+    words = np.random.default_rng(0).integers(0, 2**32, args.words, dtype=np.uint32)
+    directory = tempfile.mkdtemp()
+    hex_path = os.path.join(directory, "program.hex")
+    binary_path = os.path.join(directory, "program.txt")
+    try:
+        with open(hex_path, 'w') as f:
+            f.write(words_to_hex(words))
+        with open(binary_path, 'w') as f:
+            f.write(words_to_binary(words))
+        print(f"{args.words} words: {os.path.getsize(hex_path) / 2**20:.1f} MiB hex, "
+              f"{os.path.getsize(binary_path) / 2**20:.1f} MiB binary")
+        print(f"{'Conversion':<36} {'Time':>10} {'Throughput':>18}")
+        print("-" * 66)
+
+        cases = [
+            ("hex file -> words", lambda: new_words(hex_to_words, hex_path), lambda: old_hex_words(hex_path)),
+            ("binary file -> words", lambda: new_words(binary_to_words, binary_path), lambda: old_binary_words(binary_path)),
+            ("words -> hex text", lambda: words_to_hex(words),
+             lambda: "".join(conversion_old.binary_to_hex(f"{word:032b}") + "\n" for word in words.tolist())),
+        ]
+        for label, new, old in cases:
+            new_time, result = timed(f"{label} (bulk)", args.words, new)
+            if isinstance(result, str):
+                assert result == words_to_hex(words)
+            else:
+                assert np.array_equal(np.asarray(result, dtype=np.uint32), words)
+            if not args.skip_old:
+                old_time, _ = timed(f"{label} (line by line)", args.words, old)
+                print(f"{'':<36} {old_time / new_time:>8.1f}x faster")
+    finally:
+        for path in (hex_path, binary_path):
+            if os.path.exists(path):
+                os.remove(path)
+        os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    main()
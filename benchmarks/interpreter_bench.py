@@ -0,0 +1,85 @@
+"""
+Compares the functional interpreter (MIPSInterpreter) and the basic-block
+translator (MIPSTranslator) with the cycle-level MIPSPipeline on a counted
+loop, in retired instructions per second. The lockstep VectorizedInterpreter
+is reported in instructions per second summed over its lanes.
+
+Run from the repository root:
+    python -m benchmarks.interpreter_bench [--iterations N] [--no-record] [--lanes N]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from interpreter import MIPSInterpreter
+from pipeline import MIPSPipeline
+from translator import MIPSTranslator
+from utils.assembler import MIPSAssembler
+from vectorized import VectorizedInterpreter
+
+
+def loop_program(iterations):
+    """Assembly for a loop that accumulates into $t1 and stores it every iteration."""
+    return [
+        f"addi $t0, $0, {iterations}",
+        "addi $t1, $0, 0",
+        "loop:",
+        "addi $t1, $t1, 3",
+        "sw $t1, 0($sp)",
+        "lw $t2, 0($sp)",
+        "addi $t0, $t0, -1",
+        "bne $t0, $0, loop",
+        "syscall",
+    ]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--iterations', type=int, default=200)
+    arg_parser.add_argument('--no-record', action='store_true',
+                            help="keep only the final register state in the functional modes")
+    arg_parser.add_argument('--lanes', type=int, default=1000, help="machines in the vectorized run")
+    args = arg_parser.parse_args()
+
+    assembler = MIPSAssembler()
+    machine_codes = assembler.assemble_binary(loop_program(args.iterations))
+    with tempfile.NamedTemporaryFile(delete=False, mode='w', suffix='.txt') as tmp_file:
+        tmp_file.write("\n".join(machine_codes))
+        binary_path = tmp_file.name
+
+    try:
+        start = time.perf_counter()
+        pipeline = MIPSPipeline(binary_path)
+        pipeline_states, _, _ = pipeline.run_pipeline()
+        pipeline_time = time.perf_counter() - start
+
+        timings = {}
+        for mode, simulator_class in [('functional', MIPSInterpreter), ('translated', MIPSTranslator)]:
+            start = time.perf_counter()
+            simulator = simulator_class(binary_path, record_states=not args.no_record)
+            states, _ = simulator.run()
+            timings[mode] = time.perf_counter() - start
+            assert list(states[-1]) == list(pipeline_states[-1]), f"{mode}: final registers differ"
+
+        start = time.perf_counter()
+        vectorized = VectorizedInterpreter(binary_path, lanes=args.lanes)
+        vectorized.run()
+        vectorized_time = time.perf_counter() - start
+        assert vectorized.lane_registers(0) == list(pipeline_states[-1]), "vectorized: final registers differ"
+    finally:
+        os.remove(binary_path)
+
+    instructions = simulator.instruction_count
+    print(f"{'Mode':<12} {'Instructions':>12} {'Seconds':>10} {'Instr/s':>12} {'Speedup':>9}")
+    print("-" * 59)
+    print(f"{'pipeline':<12} {instructions:>12} {pipeline_time:>10.4f} {instructions / pipeline_time:>12.1f} {1:>8.1f}x")
+    for mode, seconds in timings.items():
+        print(f"{mode:<12} {instructions:>12} {seconds:>10.4f} {instructions / seconds:>12.1f} {pipeline_time / seconds:>8.1f}x")
+    lane_instructions = int(vectorized.instruction_count.sum())
+    print(f"{f'vector x{args.lanes}':<12} {lane_instructions:>12} {vectorized_time:>10.4f} "
+          f"{lane_instructions / vectorized_time:>12.1f} {pipeline_time * args.lanes / vectorized_time:>8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
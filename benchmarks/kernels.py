@@ -0,0 +1,337 @@
+"""
+Parameterized workloads for benchmarking the simulators, written in the
+assembly MIPSAssembler accepts.
+
+Each kernel leaves a checksum in $v0, and KERNELS pairs the source generator
+with a Python model of that checksum so every run can be validated.
+
+    python -m benchmarks.kernels    # assemble and check every kernel at a small size
+"""
+import math
+from typing import Callable, NamedTuple
+
+from program_image import DATA_BASE
+
+MASK32 = 0xFFFFFFFF
+
+
+class Kernel(NamedTuple):
+    """A workload: `source(size)` gives assembly lines, `expected(size)` the final $v0."""
+    source: Callable[[int], list]
+    expected: Callable[[int], int]
+    default_size: int
+    scale: Callable[[int, float], int]  # (default size, factor) -> size doing about factor times the work
+    description: str
+
+
+def _linear(size, factor):
+    return max(1, round(size * factor))
+
+
+def _quadratic(size, factor):
+    return max(2, round(size * math.sqrt(factor)))
+
+
+def _cubic(size, factor):
+    return max(1, round(size * factor ** (1 / 3)))
+
+
+def _exponential(size, factor):
+    # fib(n) makes about phi**n calls
+    return max(2, size + round(math.log(factor) / math.log((1 + math.sqrt(5)) / 2)))
+
+
+def _random_words(count, seed, limit):
+    """`count` pseudo-random values below `limit` from a fixed LCG, so programs are reproducible."""
+    values = []
+    state = seed
+    for _ in range(count):
+        state = (state * 1103515245 + 12345) & 0x7FFFFFFF
+        values.append(state % limit)
+    return values
+
+
+def _words_directive(values, per_line=16):
+    return [".word " + ", ".join(str(v) for v in values[i:i + per_line]) for i in range(0, len(values), per_line)]
+
+
+def _signed(value):
+    value &= MASK32
+    return value - (1 << 32) if value & 0x80000000 else value
+
+
+# Counted loop --------------------------------------------------------------
+
+def loops_source(n):
+    return [
+        f"li $t0, {n}",
+        "addi $v0, $0, 0",
+        "loop:",
+        "add $v0, $v0, $t0",
+        "andi $t1, $t0, 7",
+        "add $v0, $v0, $t1",
+        "addi $t0, $t0, -1",
+        "bne $t0, $0, loop",
+        "syscall",
+    ]
+
+
+def loops_expected(n):
+    return _signed(sum(i + (i & 7) for i in range(1, n + 1)))
+
+
+# Recursive Fibonacci: calls, returns and stack traffic ------------------------
+
+def fib_source(n):
+    return [
+        f"addi $a0, $0, {n}",
+        "jal fib",
+        "syscall",
+        "fib:",
+        "slti $t0, $a0, 2",
+        "beq $t0, $0, recurse",
+        "add $v0, $a0, $0",
+        "jr $ra",
+        "recurse:",
+        "addi $sp, $sp, -12",
+        "sw $ra, 8($sp)",
+        "sw $a0, 4($sp)",
+        "addi $a0, $a0, -1",
+        "jal fib",
+        "sw $v0, 0($sp)",
+        "lw $a0, 4($sp)",
+        "addi $a0, $a0, -2",
+        "jal fib",
+        "lw $t1, 0($sp)",
+        "add $v0, $v0, $t1",
+        "lw $ra, 8($sp)",
+        "addi $sp, $sp, 12",
+        "jr $ra",
+    ]
+
+
+def fib_expected(n):
+    a, b = 0, 1
+    for _ in range(n):
+        a, b = b, a + b
+    return _signed(a)
+
+
+# Bubble sort: nested loops, data-dependent branches ---------------------------
+
+def bubble_sort_values(n):
+    return _random_words(n, seed=1, limit=10000)
+
+
+def bubble_sort_source(n):
+    return [
+        ".data",
+        "array:",
+        *_words_directive(bubble_sort_values(n)),
+        ".text",
+        f"addi $s0, $0, {n - 1}",
+        "addi $v0, $0, 0            # swaps",
+        "outer:",
+        "la $t0, array",
+        "add $t1, $s0, $0",
+        "inner:",
+        "lw $t2, 0($t0)",
+        "lw $t3, 4($t0)",
+        "slt $t4, $t3, $t2",
+        "beq $t4, $0, noswap",
+        "sw $t3, 0($t0)",
+        "sw $t2, 4($t0)",
+        "addi $v0, $v0, 1",
+        "noswap:",
+        "addi $t0, $t0, 4",
+        "addi $t1, $t1, -1",
+        "bne $t1, $0, inner",
+        "addi $s0, $s0, -1",
+        "bne $s0, $0, outer",
+        "syscall",
+    ]
+
+
+def bubble_sort_expected(n):
+    values = bubble_sort_values(n)
+    swaps = 0
+    for last in range(n - 1, 0, -1):
+        for i in range(last):
+            if values[i + 1] < values[i]:
+                values[i], values[i + 1] = values[i + 1], values[i]
+                swaps += 1
+    return swaps
+
+
+# memcpy: streaming loads and stores, store-to-load forwarding -----------------
+
+def memcpy_values(n):
+    return _random_words(n, seed=2, limit=1 << 30)
+
+
+def memcpy_source(n):
+    return [
+        ".data",
+        "src:",
+        *_words_directive(memcpy_values(n)),
+        "dst:",
+        f".space {4 * n}",
+        ".text",
+        "la $t0, src",
+        "la $t1, dst",
+        f"li $t2, {n}",
+        "addi $v0, $0, 0            # checksum of the copy, read back",
+        "copy:",
+        "lw $t3, 0($t0)",
+        "sw $t3, 0($t1)",
+        "lw $t4, 0($t1)",
+        "add $v0, $v0, $t4",
+        "addi $t0, $t0, 4",
+        "addi $t1, $t1, 4",
+        "addi $t2, $t2, -1",
+        "bne $t2, $0, copy",
+        "syscall",
+    ]
+
+
+def memcpy_expected(n):
+    return _signed(sum(memcpy_values(n)))
+
+
+# Matrix multiply: triple loop with a shift-and-add multiply -------------------
+
+def matmul_values(n):
+    return _random_words(n * n, seed=3, limit=100), _random_words(n * n, seed=4, limit=16)
+
+
+def matmul_source(n):
+    a, b = matmul_values(n)
+    stride = 4 * n
+    return [
+        ".data",
+        "A:",
+        *_words_directive(a),
+        "B:",
+        *_words_directive(b),
+        "C:",
+        f".space {4 * n * n}",
+        ".text",
+        "addi $v0, $0, 0            # sum of C",
+        "la $s0, A                  # &A[i][0]",
+        "la $s5, C                  # &C[i][j]",
+        f"addi $s6, $0, {n}",
+        "row:",
+        "la $s1, B                  # &B[0][j]",
+        f"addi $s7, $0, {n}",
+        "col:",
+        "add $t0, $s0, $0",
+        "add $t1, $s1, $0",
+        f"addi $t2, $0, {n}",
+        "addi $t3, $0, 0",
+        "dot:",
+        "lw $a0, 0($t0)",
+        "lw $a1, 0($t1)",
+        "addi $t4, $0, 0            # $t4 = $a0 * $a1",
+        "mul:",
+        "beq $a1, $0, product",
+        "andi $t5, $a1, 1",
+        "beq $t5, $0, shift",
+        "add $t4, $t4, $a0",
+        "shift:",
+        "sll $a0, $a0, 1",
+        "srl $a1, $a1, 1",
+        "j mul",
+        "product:",
+        "add $t3, $t3, $t4",
+        "addi $t0, $t0, 4",
+        f"addi $t1, $t1, {stride}",
+        "addi $t2, $t2, -1",
+        "bne $t2, $0, dot",
+        "sw $t3, 0($s5)",
+        "add $v0, $v0, $t3",
+        "addi $s5, $s5, 4",
+        "addi $s1, $s1, 4",
+        "addi $s7, $s7, -1",
+        "bne $s7, $0, col",
+        f"addi $s0, $s0, {stride}",
+        "addi $s6, $s6, -1",
+        "bne $s6, $0, row",
+        "syscall",
+    ]
+
+
+def matmul_expected(n):
+    a, b = matmul_values(n)
+    return _signed(sum(a[i * n + k] * b[k * n + j] for i in range(n) for j in range(n) for k in range(n)))
+
+
+# Pointer chase: dependent loads over a random cycle ---------------------------
+
+POINTER_NODES = 1024
+POINTER_STRIDE = 16  # bytes per node; only the first word (the next pointer) is used
+
+
+def pointer_chase_nodes():
+    """Next-node addresses of a single random cycle through the nodes (Sattolo's algorithm)."""
+    order = list(range(POINTER_NODES))
+    for i, r in zip(range(POINTER_NODES - 1, 0, -1), _random_words(POINTER_NODES - 1, seed=5, limit=1 << 30)):
+        j = r % i
+        order[i], order[j] = order[j], order[i]
+    following = [0] * POINTER_NODES
+    for current, successor in zip(order, order[1:] + order[:1]):
+        following[current] = DATA_BASE + POINTER_STRIDE * successor
+    return following
+
+
+def pointer_chase_source(steps):
+    words = []
+    for address in pointer_chase_nodes():
+        words += [address, 0, 0, 0][:POINTER_STRIDE // 4]
+    return [
+        ".data",
+        "nodes:",  # the first .data label, so at DATA_BASE
+        *_words_directive(words),
+        ".text",
+        "la $t0, nodes",
+        f"li $t1, {steps}",
+        "addi $v0, $0, 0            # sum of visited addresses",
+        "chase:",
+        "lw $t0, 0($t0)",
+        "add $v0, $v0, $t0",
+        "addi $t1, $t1, -1",
+        "bne $t1, $0, chase",
+        "syscall",
+    ]
+
+
+def pointer_chase_expected(steps):
+    following = pointer_chase_nodes()
+    address, total = DATA_BASE, 0
+    for _ in range(steps):
+        address = following[(address - DATA_BASE) // POINTER_STRIDE]
+        total += address
+    return _signed(total)
+
+
+KERNELS = {
+    'loops': Kernel(loops_source, loops_expected, 20000, _linear, "counted ALU loop"),
+    'fib': Kernel(fib_source, fib_expected, 17, _exponential, "recursive Fibonacci (calls and stack)"),
+    'bubble_sort': Kernel(bubble_sort_source, bubble_sort_expected, 100, _quadratic, "bubble sort of random words"),
+    'memcpy': Kernel(memcpy_source, memcpy_expected, 10000, _linear, "word copy with read-back"),
+    'matmul': Kernel(matmul_source, matmul_expected, 12, _cubic, "matrix multiply, shift-and-add products"),
+    'pointer_chase': Kernel(pointer_chase_source, pointer_chase_expected, 20000, _linear,
+                            f"dependent loads around a {POINTER_NODES}-node random cycle"),
+}
+
+
+if __name__ == "__main__":
+    from interpreter import MIPSInterpreter
+    from utils.assembler import MIPSAssembler
+
+    for name, kernel in KERNELS.items():
+        size = kernel.scale(kernel.default_size, 0.1)
+        simulator = MIPSInterpreter(program=MIPSAssembler().assemble(kernel.source(size)), record_states=False)
+        simulator.run()
+        result = simulator.registers.read(2)
+        assert simulator.halt and result == kernel.expected(size), (name, size, result, kernel.expected(size))
+        print(f"{name:<14} size {size:<6} {simulator.instruction_count:>8} instructions  $v0 = {result}")
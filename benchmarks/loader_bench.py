@@ -0,0 +1,67 @@
+"""
+Program startup time: constructing a simulator from a binary text file (one
+'0'/'1' line per instruction) against a memory-mapped program image (.img).
+
+Run from the repository root:
+    python -m benchmarks.loader_bench [--instructions N]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from interpreter import MIPSInterpreter
+from pipeline import MIPSPipeline
+from utils.assembler import MIPSAssembler
+
+BODY = [
+    "addi $t0, $t0, 1",
+    "lw $t1, 0($sp)",
+    "add $t2, $t1, $t0",
+    "sw $t2, 4($sp)",
+]
+
+
+def startup(simulator_class, path, repeat=3):
+    """Best of `repeat` constructions of `simulator_class` from `path`, in seconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        simulator_class(path)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--instructions', type=int, default=1000000)
+    args = arg_parser.parse_args()
+
+    assembler = MIPSAssembler()
+    source = (BODY[i % len(BODY)] for i in range(args.instructions - 1))
+    image = assembler.assemble([*source, "syscall"])
+
+    directory = tempfile.mkdtemp()
+    text_path = os.path.join(directory, "program.txt")
+    image_path = os.path.join(directory, "program.img")
+    try:
+        assembler.write_binary(image.text_words(), text_path)
+        image.save(image_path)
+        print(f"{args.instructions} instructions: {os.path.getsize(text_path) / 2**20:.1f} MiB as text, "
+              f"{os.path.getsize(image_path) / 2**20:.1f} MiB as an image")
+        print(f"{'Simulator':<20} {'Text file':>12} {'Image file':>12} {'Speedup':>9}")
+        print("-" * 56)
+        for simulator_class in (MIPSInterpreter, MIPSPipeline):
+            text_time = startup(simulator_class, text_path)
+            image_time = startup(simulator_class, image_path)
+            print(f"{simulator_class.__name__:<20} {text_time * 1e3:>9.1f} ms {image_time * 1e3:>9.1f} ms "
+                  f"{text_time / image_time:>8.0f}x")
+    finally:
+        for path in (text_path, image_path):
+            if os.path.exists(path):
+                os.remove(path)
+        os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Measures MIPSPipeline throughput in simulated cycles per second on the
+programs in tests/*.asm.
+
+Run from the repository root:
+    python -m benchmarks.pipeline_bench [--repeat N] [pattern ...]
+"""
+import argparse
+import glob
+import os
+import tempfile
+import time
+
+from pipeline import MIPSPipeline
+from utils.assembler import MIPSAssembler
+
+
+def assemble_to_file(asm_path):
+    """Assemble an .asm file into a temporary binary file and return its path."""
+    assembler = MIPSAssembler()
+    machine_codes = assembler.assemble_binary(assembler.parse_asm(asm_path))
+    with tempfile.NamedTemporaryFile(delete=False, mode='w', suffix='.txt') as tmp_file:
+        tmp_file.write("\n".join(machine_codes))
+        return tmp_file.name
+
+
+def bench_program(binary_path, repeat):
+    """Run a program `repeat` times and return (cycles per run, best seconds per run)."""
+    best = float('inf')
+    cycles = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        pipeline = MIPSPipeline(binary_path)
+        _, _, cycle_states = pipeline.run_pipeline()
+        elapsed = time.perf_counter() - start
+        cycles = len(cycle_states) - 1  # exclude the 'Initial State' row
+        best = min(best, elapsed)
+    return cycles, best
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('patterns', nargs='*', default=['tests/*.asm'])
+    arg_parser.add_argument('--repeat', type=int, default=5)
+    args = arg_parser.parse_args()
+
+    asm_files = sorted({f for pattern in args.patterns for f in glob.glob(pattern)})
+    total_cycles = 0
+    total_time = 0.0
+    print(f"{'Program':<28} {'Cycles':>8} {'Seconds':>10} {'Cycles/s':>12}")
+    print("-" * 61)
+    for asm_path in asm_files:
+        binary_path = assemble_to_file(asm_path)
+        try:
+            cycles, seconds = bench_program(binary_path, args.repeat)
+        finally:
+            os.remove(binary_path)
+        total_cycles += cycles
+        total_time += seconds
+        print(f"{os.path.basename(asm_path):<28} {cycles:>8} {seconds:>10.4f} {cycles / seconds:>12.1f}")
+    print("-" * 61)
+    if total_time:
+        print(f"{'Total':<28} {total_cycles:>8} {total_time:>10.4f} {total_cycles / total_time:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
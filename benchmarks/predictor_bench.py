@@ -0,0 +1,78 @@
+"""
+Branch predictors compared on the kernels in benchmarks/kernels.py and on
+random programs from utils.program_generator: branch and jump prediction
+accuracy, CPI, and the cycles saved against static not-taken (which is what
+the pipeline did before it had predictors).
+
+Run from the repository root:
+    python -m benchmarks.predictor_bench [--kernels loops matmul] [--predictors 2-bit gshare]
+                                         [--scale 0.5] [--random 20]
+"""
+import argparse
+
+from benchmarks.kernels import KERNELS
+from branch_predictor import PREDICTORS
+from pipeline import MIPSPipeline
+from utils.assembler import MIPSAssembler
+from utils.program_generator import GeneratorConfig, generate_program
+
+RANDOM_CONFIG = GeneratorConfig(length=400, loop_density=0.06, loop_iterations=(2, 20))
+
+
+def run(image, predictor, expected=None):
+    """perf_counters() of a pipeline run, checking $v0 against `expected` if given."""
+    pipeline = MIPSPipeline(program=image, predictor=predictor)
+    counters = pipeline.run_pipeline(counters=True)[3]
+    if expected is not None and pipeline.registers.read(2) != expected:
+        raise AssertionError(f"$v0 = {pipeline.registers.read(2)} with {predictor}, expected {expected}")
+    return counters
+
+
+def _percent(value):
+    return f"{value:>8.1%}" if value is not None else f"{'-':>8}"
+
+
+def print_workload(name, results):
+    baseline = results.get('not-taken')
+    print(f"\n{name}")
+    print(f"  {'Predictor':<10} {'Cycles':>10} {'CPI':>6} {'Branch':>8} {'Jump':>8} {'Flushes':>8} {'Saved':>8}")
+    for predictor, counters in results.items():
+        saved = f"{1 - counters['cycles'] / baseline['cycles']:>8.1%}" if baseline else f"{'-':>8}"
+        print(f"  {predictor:<10} {counters['cycles']:>10,} {counters['cpi']:>6.3f} "
+              f"{_percent(counters['branch_accuracy'])} {_percent(counters['jump_accuracy'])} "
+              f"{counters['flushes']:>8,} {saved}")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--kernels', nargs='+', choices=list(KERNELS), default=list(KERNELS))
+    arg_parser.add_argument('--predictors', nargs='+', choices=list(PREDICTORS), default=list(PREDICTORS))
+    arg_parser.add_argument('--scale', type=float, default=0.25, help="multiply the work done by every kernel")
+    arg_parser.add_argument('--random', type=int, default=10, help="random programs, summed into one row each")
+    args = arg_parser.parse_args()
+
+    print("Accuracy of branch (beq/bne) and jump (j/jal/jr) predictions; Saved: cycles against not-taken")
+    for name in args.kernels:
+        kernel = KERNELS[name]
+        size = kernel.scale(kernel.default_size, args.scale)
+        image = MIPSAssembler().assemble(kernel.source(size))
+        print_workload(f"{name} (size {size})",
+                       {predictor: run(image, predictor, kernel.expected(size)) for predictor in args.predictors})
+
+    if args.random:
+        images = [MIPSAssembler().assemble(generate_program(seed, RANDOM_CONFIG)) for seed in range(args.random)]
+        totals = {}
+        for predictor in args.predictors:
+            runs = [run(image, predictor) for image in images]
+            total = {key: sum(counters[key] for counters in runs)
+                     for key in ('cycles', 'retired', 'branches', 'jumps', 'branch_mispredicts', 'jump_mispredicts',
+                                 'flushes')}
+            total['cpi'] = total['cycles'] / total['retired']
+            total['branch_accuracy'] = 1 - total['branch_mispredicts'] / total['branches'] if total['branches'] else None
+            total['jump_accuracy'] = 1 - total['jump_mispredicts'] / total['jumps'] if total['jumps'] else None
+            totals[predictor] = total
+        print_workload(f"{args.random} random programs", totals)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,43 @@
+"""
+Microbenchmarks for per-access cost of the register file: the int-backed
+components.registers.Registers against the old binary-string implementation.
+
+Run from the repository root:
+    python -m benchmarks.registers_bench [--number N]
+"""
+import argparse
+import timeit
+
+from components.alu import signedBin
+from components.registers import Registers
+from old.registers_old import Registers as StringRegisters
+
+
+def bench(label, stmt, namespace, number):
+    seconds = min(timeit.repeat(stmt, globals=namespace, number=number, repeat=5))
+    print(f"{label:<40} {seconds / number * 1e9:>10.1f} ns")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--number', type=int, default=200000)
+    args = arg_parser.parse_args()
+
+    namespace = {
+        'old': StringRegisters(initialise=True),
+        'new': Registers(initialise=True),
+        'signedBin': signedBin,
+    }
+    print(f"{'Operation':<40} {'Per access':>13}")
+    print("-" * 54)
+    bench("string read", "old.read(29)", namespace, args.number)
+    bench("int read", "new.read(29)", namespace, args.number)
+    bench("string write (signedBin)", "old.write(8, signedBin(-12345))", namespace, args.number)
+    bench("int write (wrapped)", "new.write(8, -12345)", namespace, args.number)
+    bench("string snapshot", "old.reg.copy()", namespace, args.number)
+    bench("int snapshot", "new.snapshot()", namespace, args.number)
+    bench("int string view (UI only)", "new.reg", namespace, args.number // 10)
+
+
+if __name__ == "__main__":
+    main()
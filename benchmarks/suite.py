@@ -0,0 +1,182 @@
+"""
+Runs the kernels in benchmarks/kernels.py on each simulator mode and reports
+simulated instructions/s, cycles/s (pipeline), startup time and peak RSS.
+Results can be saved as a JSON baseline and compared with a later run.
+
+Each (kernel, mode) runs in a fresh process, so peak RSS belongs to that run
+alone. Startup is the time to build the simulator from an assembled program.
+
+Run from the repository root:
+    python -m benchmarks.suite [--kernels fib memcpy] [--modes pipeline functional]
+                               [--scale 4] [--repeat 3] [--save baseline.json]
+                               [--compare baseline.json] [--tolerance 0.1]
+"""
+import argparse
+import json
+import multiprocessing
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from benchmarks.kernels import KERNELS
+from interpreter import MIPSInterpreter
+from pipeline import MIPSPipeline
+from translator import MIPSTranslator
+from utils.assembler import MIPSAssembler
+from vectorized import VectorizedInterpreter
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+MODES = ('pipeline', 'functional', 'translated', 'vectorized')
+VECTOR_LANES = 64
+
+
+def peak_rss_mib():
+    """Peak resident set size of this process in MiB, or None where it can't be read."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10  # bytes on macOS, KiB elsewhere
+
+
+def _simulate(mode, image, lanes):
+    """Build and run one simulator; returns (startup s, run s, instructions, cycles, $v0)."""
+    start = time.perf_counter()
+    if mode == 'pipeline':
+        simulator = MIPSPipeline(program=image)
+    elif mode == 'vectorized':
+        simulator = VectorizedInterpreter(program=image, lanes=lanes)
+    else:
+        simulator = (MIPSTranslator if mode == 'translated' else MIPSInterpreter)(program=image, record_states=False)
+    built = time.perf_counter()
+
+    if mode == 'pipeline':
+        simulator.run_pipeline()
+        finished = time.perf_counter()
+        instructions = len(simulator.register_states) - 1 + int(simulator.halt)
+        return built - start, finished - built, instructions, simulator.cycle, simulator.registers.read(2)
+    simulator.run()
+    finished = time.perf_counter()
+    if mode == 'vectorized':
+        return (built - start, finished - built, int(simulator.instruction_count.sum()), None,
+                simulator.lane_registers(0)[2])
+    return built - start, finished - built, simulator.instruction_count, None, simulator.registers.read(2)
+
+
+def measure(name, size, mode, image, repeat, lanes):
+    """Best-of-`repeat` measurement of one kernel in one mode, as a result record."""
+    startup = run = float('inf')
+    for _ in range(repeat):
+        built, ran, instructions, cycles, result = _simulate(mode, image, lanes)
+        startup, run = min(startup, built), min(run, ran)
+    expected = KERNELS[name].expected(size)
+    if result != expected:
+        raise AssertionError(f"{name} in {mode} mode: $v0 = {result}, expected {expected}")
+    return {
+        'kernel': name,
+        'size': size,
+        'mode': mode,
+        'instructions': instructions,
+        'cycles': cycles,
+        'startup_s': startup,
+        'run_s': run,
+        'instructions_per_s': instructions / run,
+        'cycles_per_s': cycles / run if cycles is not None else None,
+        'peak_rss_mib': peak_rss_mib(),
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results):
+    print(f"{'Kernel':<14} {'Size':>6} {'Mode':<11} {'Instructions':>12} {'Instr/s':>12} {'Cycles/s':>10} "
+          f"{'Startup':>10} {'Peak RSS':>10}")
+    print("-" * 94)
+    for r in results:
+        cycles_per_s = f"{r['cycles_per_s']:>10,.0f}" if r['cycles_per_s'] is not None else f"{'-':>10}"
+        rss = f"{r['peak_rss_mib']:>6.1f} MiB" if r['peak_rss_mib'] is not None else f"{'n/a':>10}"
+        print(f"{r['kernel']:<14} {r['size']:>6} {r['mode']:<11} {r['instructions']:>12,} "
+              f"{r['instructions_per_s']:>12,.0f} {cycles_per_s} {r['startup_s'] * 1e3:>7.2f} ms {rss}")
+
+
+def compare(results, baseline, tolerance):
+    """Print throughput against `baseline` results; returns the number of regressions beyond `tolerance`."""
+    before = {(r['kernel'], r['size'], r['mode']): r for r in baseline['results']}
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'} (instructions/s, tolerance {tolerance:.0%}):")
+    regressions = 0
+    for r in results:
+        old = before.get((r['kernel'], r['size'], r['mode']))
+        if old is None:
+            print(f"  {r['kernel']:<14} {r['mode']:<11} not in the baseline")
+            continue
+        change = r['instructions_per_s'] / old['instructions_per_s'] - 1
+        flag = ""
+        if change < -tolerance:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(f"  {r['kernel']:<14} {r['mode']:<11} {old['instructions_per_s']:>12,.0f} -> "
+              f"{r['instructions_per_s']:>12,.0f}  {change:>+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    arg_parser.add_argument('--kernels', nargs='+', choices=list(KERNELS), default=list(KERNELS))
+    arg_parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+    arg_parser.add_argument('--scale', type=float, default=1.0, help="multiply the work done by every kernel")
+    arg_parser.add_argument('--repeat', type=int, default=3, help="runs per measurement; the best is kept")
+    arg_parser.add_argument('--lanes', type=int, default=VECTOR_LANES, help="machines in vectorized runs")
+    arg_parser.add_argument('--in-process', action='store_true',
+                            help="don't start a process per run (faster, but peak RSS accumulates)")
+    arg_parser.add_argument('--save', metavar='PATH', help="write the results as a JSON baseline")
+    arg_parser.add_argument('--compare', metavar='PATH', help="compare with a saved baseline; exit 1 on regressions")
+    arg_parser.add_argument('--tolerance', type=float, default=0.1, help="allowed throughput drop (fraction)")
+    args = arg_parser.parse_args()
+
+    results = []
+    context = multiprocessing.get_context('spawn')
+    for name in args.kernels:
+        kernel = KERNELS[name]
+        size = kernel.scale(kernel.default_size, args.scale)
+        image = MIPSAssembler().assemble(kernel.source(size))
+        for mode in args.modes:
+            if args.in_process:
+                results.append(measure(name, size, mode, image, args.repeat, args.lanes))
+                continue
+            with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                results.append(pool.submit(measure, name, size, mode, image, args.repeat, args.lanes).result())
+    print_results(results)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump({
+                'commit': git_commit(),
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'python': platform.python_version(),
+                'machine': platform.machine(),
+                'scale': args.scale,
+                'lanes': args.lanes,
+                'results': results,
+            }, f, indent=2)
+        print(f"\nSaved to {args.save}")
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        if regressions:
+            print(f"{regressions} regressions")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,288 @@
+"""
+Branch predictors that steer MIPSPipeline's fetch stage.
+
+Fetch asks the predictor for the address to fetch after each branch or jump
+(`predict`), and the execute stage tells it the outcome (`update`). When the
+outcome differs from the prediction, the wrong-path instruction in decode is
+squashed and fetch restarts at the right address, costing one cycle. Correct
+predictions cost nothing, even for a branch or jump to pc+4. The default
+not-taken predictor keeps the pipeline's timing from before predictors
+existed, where every taken branch or jump cost the cycle (`flushes_taken`).
+
+The instructions come from the decode cache already decoded, so the
+direction predictors compute the target of a beq/bne/j/jal at fetch, and
+predict unconditional direct jumps taken. `jr` targets are only known to a
+branch target buffer or a return-address stack. Predictors are trained with
+resolved outcomes only, so nothing has to be repaired after a squash.
+
+    MIPSPipeline(path, predictor='gshare')
+    MIPSPipeline(path, predictor=TwoBitPredictor(entries=1024, return_stack=8))
+"""
+from instructions import Op
+
+
+def branch_target(pc, inst):
+    """Target of a beq/bne/j/jal at `pc` (offsets are relative to the next instruction)."""
+    if inst.op == Op.J or inst.op == Op.JAL:
+        return pc + 4 + (inst.target << 2)
+    return pc + 4 + (inst.simm << 2)
+
+
+class BranchPredictor:
+    """
+    Base class: predicts every branch and jump not taken, which is what the
+    pipeline did before predictors existed. Subclasses override `direction`
+    (and `train`) for beq/bne, and may add a return-address stack for jr $ra.
+    """
+    name = 'not-taken'
+    predicts_jumps = False  # fetch j/jal targets right away (the pipeline used to wait for execute)
+    flushes_taken = True  # a taken branch or jump fetched past is mispredicted, even to pc+4
+
+    def __init__(self, return_stack=0):
+        self.return_stack = return_stack  # depth of the return-address stack, 0 for none
+        self.returns = []
+
+    def predict(self, pc, inst):
+        """Address to fetch after the branch or jump `inst` at `pc`."""
+        op = inst.op
+        if op == Op.BEQ or op == Op.BNE:
+            return branch_target(pc, inst) if self.direction(pc, inst) else pc + 4
+        if op == Op.JR:
+            if inst.rs == 31 and self.returns:
+                return self.returns[-1]
+            return pc + 4  # the target register isn't known at fetch
+        return branch_target(pc, inst) if self.predicts_jumps else pc + 4
+
+    def direction(self, pc, inst):
+        """Whether the beq/bne `inst` at `pc` is predicted taken."""
+        return False
+
+    def update(self, pc, inst, taken, target):
+        """Train on a resolved branch or jump: `taken` and the address it went to if taken."""
+        op = inst.op
+        if self.return_stack:
+            if op == Op.JAL:
+                self.returns.append(pc + 4)
+                if len(self.returns) > self.return_stack:
+                    del self.returns[0]
+            elif op == Op.JR and inst.rs == 31 and self.returns:
+                self.returns.pop()
+        self.train(pc, inst, taken, target)
+
+    def train(self, pc, inst, taken, target):
+        pass
+
+    def snapshot(self):
+        """Predictor state as JSON-serialisable lists, for checkpoints."""
+        return [list(self.returns)] + self.tables()
+
+    def restore(self, state):
+        self.returns = list(state[0])
+        self.restore_tables(state[1:])
+
+    def tables(self):
+        return []
+
+    def restore_tables(self, tables):
+        pass
+
+    def __repr__(self):
+        return f"{type(self).__name__}(return_stack={self.return_stack})"
+
+
+class TakenPredictor(BranchPredictor):
+    """Static: every branch and jump taken."""
+    name = 'taken'
+    predicts_jumps = True
+    flushes_taken = False
+
+    def direction(self, pc, inst):
+        return True
+
+
+class BTFNPredictor(BranchPredictor):
+    """Static: backward branches (loops) taken, forward branches not taken."""
+    name = 'btfn'
+    predicts_jumps = True
+    flushes_taken = False
+
+    def direction(self, pc, inst):
+        return inst.simm < 0
+
+
+class CounterPredictor(BranchPredictor):
+    """
+    A table of `entries` n-bit saturating counters indexed by the branch
+    address; a counter in its upper half predicts taken. One-bit counters
+    remember the last outcome, two-bit counters need two mispredictions in a
+    row to change their mind.
+    """
+    predicts_jumps = True
+    flushes_taken = False
+
+    def __init__(self, entries=1024, bits=2, return_stack=0):
+        super().__init__(return_stack)
+        if entries & (entries - 1):
+            raise ValueError(f"entries must be a power of two, not {entries}")
+        self.mask = entries - 1
+        self.maximum = (1 << bits) - 1
+        self.threshold = 1 << (bits - 1)
+        self.counters = [self.threshold - 1] * entries  # weakly not taken
+
+    def index(self, pc):
+        return (pc >> 2) & self.mask
+
+    def direction(self, pc, inst):
+        return self.counters[self.index(pc)] >= self.threshold
+
+    def train(self, pc, inst, taken, target):
+        if inst.op != Op.BEQ and inst.op != Op.BNE:
+            return
+        i = self.index(pc)
+        if taken:
+            if self.counters[i] < self.maximum:
+                self.counters[i] += 1
+        elif self.counters[i] > 0:
+            self.counters[i] -= 1
+
+    def tables(self):
+        return [list(self.counters)]
+
+    def restore_tables(self, tables):
+        self.counters = list(tables[0])
+
+    def __repr__(self):
+        return (f"{type(self).__name__}(entries={self.mask + 1}, bits={self.maximum.bit_length()}, "
+                f"return_stack={self.return_stack})")
+
+
+class OneBitPredictor(CounterPredictor):
+    name = '1-bit'
+
+    def __init__(self, entries=1024, return_stack=0):
+        super().__init__(entries, bits=1, return_stack=return_stack)
+
+
+class TwoBitPredictor(CounterPredictor):
+    name = '2-bit'
+
+    def __init__(self, entries=1024, return_stack=0):
+        super().__init__(entries, bits=2, return_stack=return_stack)
+
+
+class GSharePredictor(CounterPredictor):
+    """Two-bit counters indexed by the branch address XORed with the last `history_bits` outcomes."""
+    name = 'gshare'
+
+    def __init__(self, entries=1024, history_bits=10, return_stack=0):
+        super().__init__(entries, bits=2, return_stack=return_stack)
+        self.history_mask = (1 << history_bits) - 1
+        self.history = 0
+
+    def index(self, pc):
+        return ((pc >> 2) ^ self.history) & self.mask
+
+    def train(self, pc, inst, taken, target):
+        if inst.op != Op.BEQ and inst.op != Op.BNE:
+            return
+        super().train(pc, inst, taken, target)
+        self.history = ((self.history << 1) | taken) & self.history_mask
+
+    def tables(self):
+        return [list(self.counters), [self.history]]
+
+    def restore_tables(self, tables):
+        self.counters = list(tables[0])
+        self.history = tables[1][0]
+
+
+class BTBPredictor(BranchPredictor):
+    """
+    A direct-mapped branch target buffer: each entry holds the address of a
+    branch or jump, the target it last went to and a two-bit counter. Fetch
+    only redirects on a hit, so unlike the predictors above it doesn't rely on
+    decoding at fetch, and it also predicts `jr` targets. Returns use the
+    return-address stack first.
+    """
+    name = 'btb'
+    flushes_taken = False
+
+    def __init__(self, entries=256, return_stack=16):
+        super().__init__(return_stack)
+        if entries & (entries - 1):
+            raise ValueError(f"entries must be a power of two, not {entries}")
+        self.mask = entries - 1
+        self.tags = [None] * entries
+        self.targets = [0] * entries
+        self.counters = [0] * entries
+
+    def predict(self, pc, inst):
+        if inst.op == Op.JR and inst.rs == 31 and self.returns:
+            return self.returns[-1]
+        i = (pc >> 2) & self.mask
+        if self.tags[i] == pc and self.counters[i] >= 2:
+            return self.targets[i]
+        return pc + 4
+
+    def train(self, pc, inst, taken, target):
+        i = (pc >> 2) & self.mask
+        if self.tags[i] != pc:
+            if not taken:
+                return  # only taken branches are allocated
+            self.tags[i] = pc
+            self.counters[i] = 2
+        elif taken:
+            self.counters[i] = min(self.counters[i] + 1, 3)
+        else:
+            self.counters[i] = max(self.counters[i] - 1, 0)
+        if taken:
+            self.targets[i] = target
+
+    def tables(self):
+        return [list(self.tags), list(self.targets), list(self.counters)]
+
+    def restore_tables(self, tables):
+        self.tags, self.targets, self.counters = (list(table) for table in tables)
+
+    def __repr__(self):
+        return f"BTBPredictor(entries={self.mask + 1}, return_stack={self.return_stack})"
+
+
+PREDICTORS = {
+    'not-taken': BranchPredictor,
+    'taken': TakenPredictor,
+    'btfn': BTFNPredictor,
+    '1-bit': OneBitPredictor,
+    '2-bit': TwoBitPredictor,
+    'gshare': GSharePredictor,
+    'btb': BTBPredictor,
+}
+
+
+def make_predictor(predictor=None):
+    """A BranchPredictor from a PREDICTORS name, an instance (returned as is), or None for not-taken."""
+    if predictor is None:
+        return BranchPredictor()
+    if isinstance(predictor, BranchPredictor):
+        return predictor
+    try:
+        return PREDICTORS[predictor]()
+    except KeyError:
+        raise ValueError(f"unknown branch predictor {predictor!r}; choose from {', '.join(PREDICTORS)}") from None
+
+
+if __name__ == "__main__":
+    from pipeline import MIPSPipeline
+    from utils.assembler import MIPSAssembler
+
+    # A taken branch or jump to pc+4 costs its flush cycle with not-taken, as it
+    # did before predictors, and nothing with the others; a not-taken one is free
+    for first, taken in (("beq $0, $0, next", True), ("j next", True), ("bne $0, $0, next", False)):
+        image = MIPSAssembler().assemble([first, "next:", "addi $v0, $0, 7", "syscall"])
+        for name in PREDICTORS:
+            pipeline = MIPSPipeline(program=image, predictor=name)
+            report = pipeline.run_pipeline(counters=True)[3]
+            flushes = int(taken and name == 'not-taken')
+            assert (report['cycles'], report['flushes'], pipeline.registers.read(2)) == (6 + flushes, flushes, 7), \
+                (first, name, report['cycles'], report['flushes'])
+    print("Branch predictor self-check passed")
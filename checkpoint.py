@@ -0,0 +1,174 @@
+import json
+import struct
+import zlib
+from array import array
+
+import numpy as np
+
+from components.latches import FetchLatch, DecodeLatch, ExecuteLatch, MemoryLatch
+from cycle_trace import CycleTrace
+from instructions import decode
+from register_history import RegisterHistory
+
+MAGIC = b"MIPSCKP1"
+
+_LATCH_TYPES = {cls.__name__: cls for cls in (FetchLatch, DecodeLatch, ExecuteLatch, MemoryLatch)}
+
+
+class Checkpoint:
+    """
+    Complete machine state of a MIPSPipeline between two cycles.
+
+    Taken with `MIPSPipeline.checkpoint()` and applied with `restore()`.
+    Checkpoints are cheap to take. Memory is a tuple of pages that shares
+    unchanged pages with the previous snapshot. Latch payloads are immutable
+    once written, so they are shared. The I/O buffer, cycle trace and register
+    history are append-only, so they are kept as (object, length) and only
+    copied when a checkpoint is restored.
+    """
+    __slots__ = ('cycle', 'pc', 'halt', 'stall', 'stall_cycles', 'latches',
+                 'registers', 'memory', 'io', 'trace', 'history', 'counters', 'predictor')
+
+    def __init__(self, cycle, pc, halt, stall, stall_cycles, latches, registers, memory, io, trace, history,
+                 counters=None, predictor=None):
+        self.cycle = cycle  # cycles run so far
+        self.pc = pc
+        self.halt = halt
+        self.stall = stall
+        self.stall_cycles = stall_cycles
+        self.latches = latches  # (IF_ID, ID_EX, EX_MEM, MEM_WB) payloads of the current bank
+        self.registers = registers  # tuple of 32 ints
+        self.memory = memory  # tuple of pages, see Memory.snapshot
+        self.io = io  # (io_memory list, length)
+        self.trace = trace  # (CycleTrace, length)
+        self.history = history  # (RegisterHistory, length)
+        self.counters = counters  # PerfCounters.values(), or None for zeros
+        self.predictor = predictor  # BranchPredictor.snapshot(), or None to leave the predictor as it is
+
+    def io_memory(self):
+        io_list, length = self.io
+        return io_list[:length]
+
+    def cycle_trace(self):
+        trace, length = self.trace
+        return trace.copy(length)
+
+    def register_history(self):
+        history, length = self.history
+        return history.copy(length)
+
+    def __repr__(self):
+        return f"Checkpoint(cycle={self.cycle}, pc={self.pc}, halt={self.halt})"
+
+    # On-disk format --------------------------------------------------------
+    #
+    # MAGIC followed by a zlib stream of: a 4-byte big-endian header length,
+    # a JSON header with the scalar state, latches and section sizes, then the
+    # raw sections (memory, trace columns, register history arrays) in order.
+
+    def save(self, path):
+        trace = self.cycle_trace()
+        history = self.register_history()
+        sections = [
+            b"".join(self.memory),
+            trace.pc[:len(trace)].tobytes(),
+            trace.op[:len(trace)].tobytes(),
+            trace.flags[:len(trace)].tobytes(),
+            history.delta_index.tobytes(),
+            history.delta_reg.tobytes(),
+            history.delta_value.tobytes(),
+        ]
+        header = {
+            'cycle': self.cycle,
+            'pc': self.pc,
+            'halt': self.halt,
+            'stall': self.stall,
+            'stall_cycles': self.stall_cycles,
+            'counters': self.counters,
+            'predictor': self.predictor,
+            'latches': [_latch_to_json(latch) for latch in self.latches],
+            'registers': list(self.registers),
+            'page_size': len(self.memory[0]) if self.memory else 0,
+            'io': self.io_memory(),
+            'trace_length': len(trace),
+            'history': {
+                'length': len(history),
+                'keyframe_interval': history.keyframe_interval,
+                'keyframes': history.keyframes,
+                'keyframe_deltas': history.keyframe_deltas,
+                'current': history.current,
+            },
+            'sections': [len(section) for section in sections],
+        }
+        header = json.dumps(header, separators=(',', ':')).encode()
+        payload = struct.pack('>I', len(header)) + header + b"".join(sections)
+        with open(path, 'wb') as f:
+            f.write(MAGIC)
+            f.write(zlib.compress(payload))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f"{path} is not a pipeline checkpoint")
+            payload = zlib.decompress(f.read())
+        (header_length,) = struct.unpack_from('>I', payload)
+        header = json.loads(payload[4:4 + header_length])
+        sections = []
+        offset = 4 + header_length
+        for size in header['sections']:
+            sections.append(payload[offset:offset + size])
+            offset += size
+        memory, trace_pc, trace_op, trace_flags, delta_index, delta_reg, delta_value = sections
+
+        page_size = header['page_size']
+        pages = tuple(memory[start:start + page_size] for start in range(0, len(memory), page_size))
+
+        length = header['trace_length']
+        trace = CycleTrace(max(length, 1024))
+        trace.pc[:length] = np.frombuffer(trace_pc, dtype=trace.pc.dtype).reshape(length, -1)
+        trace.op[:length] = np.frombuffer(trace_op, dtype=trace.op.dtype).reshape(length, -1)
+        trace.flags[:length] = np.frombuffer(trace_flags, dtype=trace.flags.dtype).reshape(length, -1)
+        trace.length = length
+        trace.row = length - 1
+
+        saved = header['history']
+        history = RegisterHistory(saved['keyframes'][0], saved['keyframe_interval'])
+        history.keyframes = saved['keyframes']
+        history.keyframe_deltas = saved['keyframe_deltas']
+        history.current = saved['current']
+        history.delta_index = _array('q', delta_index)
+        history.delta_reg = _array('B', delta_reg)
+        history.delta_value = _array('q', delta_value)
+        history.length = saved['length']
+
+        return cls(header['cycle'], header['pc'], header['halt'], header['stall'], header['stall_cycles'],
+                   tuple(_latch_from_json(latch) for latch in header['latches']),
+                   tuple(header['registers']), pages, (header['io'], len(header['io'])),
+                   (trace, length), (history, saved['length']), header.get('counters'),
+                   header.get('predictor'))
+
+
+def _array(typecode, data):
+    values = array(typecode)
+    values.frombytes(data)
+    return values
+
+
+def _latch_to_json(latch):
+    """[type name, {slot: value}] with the decoded instruction stored as its word."""
+    if latch is None:
+        return None
+    fields = {}
+    for name in latch.__slots__:
+        value = getattr(latch, name)
+        fields[name] = value.word if name == 'instruction' else value
+    return [type(latch).__name__, fields]
+
+
+def _latch_from_json(data):
+    if data is None:
+        return None
+    type_name, fields = data
+    fields['instruction'] = decode(fields['instruction'])
+    return _LATCH_TYPES[type_name](**fields)
@@ -12,66 +12,83 @@ def signedBin(num):
     else:
         ans = format(num, '032b')
     return ans
+
+MASK32 = 0xFFFFFFFF
+
+def toSigned32(num):
+    # wrap an arbitrary int to a signed 32-bit value
+    return ((num + 0x80000000) & MASK32) - 0x80000000
+# ---------------------------
+# Operations on signed 32-bit ints; results are wrapped to signed 32 bits
+
+def _add(a, b): return ((a + b + 0x80000000) & MASK32) - 0x80000000
+def _sub(a, b): return ((a - b + 0x80000000) & MASK32) - 0x80000000
+def _and(a, b): return a & b
+def _or(a, b): return a | b
+def _xor(a, b): return a ^ b
+def _nor(a, b): return ~(a | b)
+def _slt(a, b): return int(a < b)
+def _sltu(a, b): return int((a & MASK32) < (b & MASK32))
+def _lui(a, imm): return ((((imm & 0xFFFF) << 16) + 0x80000000) & MASK32) - 0x80000000
+
+def _sll(a, shamt): return (((a << shamt) + 0x80000000) & MASK32) - 0x80000000
+def _srl(a, shamt): return ((((a & MASK32) >> shamt) + 0x80000000) & MASK32) - 0x80000000
+def _sra(a, shamt): return a >> shamt  # Python's >> on a signed int is arithmetic
+
+# Dispatch tables indexed by the integer funct (R-type) or opcode (I-type) field
+R_ARITH_TABLE = [None] * 64
+R_ARITH_TABLE[0b100000] = _add   # add
+R_ARITH_TABLE[0b100001] = _add   # addu (overflow never traps, so the same as add)
+R_ARITH_TABLE[0b100010] = _sub   # sub
+R_ARITH_TABLE[0b100011] = _sub   # subu
+R_ARITH_TABLE[0b100100] = _and   # and
+R_ARITH_TABLE[0b100101] = _or    # or
+R_ARITH_TABLE[0b100110] = _xor   # xor
+R_ARITH_TABLE[0b100111] = _nor   # nor
+R_ARITH_TABLE[0b101010] = _slt   # slt
+R_ARITH_TABLE[0b101011] = _sltu  # sltu
+
+SHIFT_TABLE = [None] * 64
+SHIFT_TABLE[0b000000] = _sll  # sll
+SHIFT_TABLE[0b000010] = _srl  # srl
+SHIFT_TABLE[0b000011] = _sra  # sra
+
+# Immediates arrive sign-extended from the decode stage
+I_ARITH_TABLE = [None] * 64
+I_ARITH_TABLE[0b001000] = _add   # addi
+I_ARITH_TABLE[0b001001] = _add   # addiu
+I_ARITH_TABLE[0b001010] = _slt   # slti
+I_ARITH_TABLE[0b001011] = _sltu  # sltiu
+I_ARITH_TABLE[0b001100] = _and   # andi
+I_ARITH_TABLE[0b001101] = _or    # ori
+I_ARITH_TABLE[0b001110] = _xor   # xori
+I_ARITH_TABLE[0b001111] = _lui   # lui
 # ---------------------------
 
 class ALU:
     def __init__(self):
         pass
 
-    def alu_shift(self, operation, opr1, shamt):
-        """Perform shift operations."""
-        opr1 = signedBin(opr1)
-        ans = ""
-        match operation:
-            case "000000":  # sll
-                ans = opr1[shamt:] + ("0" * min(32, shamt))
-            case "000010":  # srl
-                ans = ("0"*min(32, shamt)) + opr1[:-1*shamt] 
-            case "000011":  # sra
-                # Arithmetic right shift, preserving the sign
-                if signedVal(opr1)<0: 
-                    ans = ("1"*min(32, shamt)) + opr1[:-1*shamt] 
-                else:
-                    # same as srl
-                    ans = ("0"*min(32, shamt)) + opr1[:-1*shamt] 
-        return signedVal(ans)
-
-    def alu_arith(self, operation, opr1, opr2):
-        """Perform arithmetic operations."""
-        opr1 = signedBin(opr1)
-        opr2 = signedBin(opr2)
-        match operation:
-            case "100000": # add
-                ans = signedBin(signedVal(opr1) + signedVal(opr2))
-            case "100010": # sub
-                ans = signedBin(signedVal(opr1) - signedVal(opr2))
-            case "100100": # and
-                ans = signedBin(signedVal(opr1) & signedVal(opr2))
-            case "100101": # or
-                ans = signedBin(signedVal(opr1) | signedVal(opr2))
-            case "101010": #slt 
-                ans = format(int(signedVal(opr1) < signedVal(opr2)), "032b")
-            case "101011": # sltu
-                ans = format(int(int(opr1,2) < int(opr2,2)), "032b")
-            case "100111": # nor
-                ans = format(~(signedVal(opr1) | signedVal(opr2)), "032b")
-        return signedVal(ans)
-
-    def alu_arith_i(self, operation, src, immediate):
-        """Perform immediate arithmetic operations."""
-        src = signedBin(src)
-        immediate = signedBin(immediate)
-        match operation:
-            case "000":  # addi
-                return signedVal(src) + signedVal(immediate)
-            case "010":  # slti
-                return 1 if signedVal(src) < signedVal(immediate) else 0
-            case "011":  # sltiu
-                return 1 if int(src, 2) < int(immediate, 2) else 0
-            case "100":  # andi
-                return signedVal(src) & signedVal(immediate)
-            case "101":  # ori
-                return signedVal(src) | signedVal(immediate)
+    def alu_shift(self, funct, opr1, shamt):
+        """Perform shift operations selected by the integer funct field."""
+        operation = SHIFT_TABLE[funct]
+        if operation is None:
+            raise ValueError(f"Unsupported shift funct: {funct:06b}")
+        return operation(opr1, shamt)
+
+    def alu_arith(self, funct, opr1, opr2):
+        """Perform arithmetic operations selected by the integer funct field."""
+        operation = R_ARITH_TABLE[funct]
+        if operation is None:
+            raise ValueError(f"Unsupported R-type funct: {funct:06b}")
+        return operation(opr1, opr2)
+
+    def alu_arith_i(self, opcode, src, immediate):
+        """Perform immediate arithmetic operations selected by the integer opcode."""
+        operation = I_ARITH_TABLE[opcode]
+        if operation is None:
+            raise ValueError(f"Unsupported I-type opcode: {opcode:06b}")
+        return operation(src, immediate)
 
     def giveAddr(self, baseAddr, lower16bits):
         """
@@ -86,4 +103,56 @@ class ALU:
         """
         return int1 == int2  # Direct comparison of integers
 
-# --------------------------------------------
+
+# Randomized equivalence check against the previous string-based ALU
+# (run from the repository root: python -m components.alu)
+if __name__ == "__main__":
+    import random
+    from old.alu_old import ALU as StringALU
+
+    rng = random.Random(0)
+    edges = [0, 1, -1, 2, -2, 0x7FFF, -0x8000, 0x7FFFFFFF, -0x80000000, 0x12345678, -0x12345678]
+    def operand():
+        return rng.choice(edges) if rng.random() < 0.2 else rng.randint(-2**31, 2**31 - 1)
+    def fits32(num):
+        return -2**31 <= num < 2**31
+
+    old, new = StringALU(), ALU()
+    samples = 20000
+
+    # The string ALU did not wrap add/sub overflow and had no xor/xori/lui,
+    # so those cases are checked against exact 32-bit arithmetic instead
+    for funct, exact in [(0b100000, lambda a, b: a + b), (0b100010, lambda a, b: a - b),
+                         (0b100100, None), (0b100101, None), (0b100111, None),
+                         (0b101010, None), (0b101011, None), (0b100110, lambda a, b: a ^ b)]:
+        for _ in range(samples):
+            a, b = operand(), operand()
+            if exact is not None and (funct == 0b100110 or not fits32(exact(a, b))):
+                assert new.alu_arith(funct, a, b) == toSigned32(exact(a, b)), (funct, a, b)
+            else:
+                assert new.alu_arith(funct, a, b) == old.alu_arith(format(funct, '06b'), a, b), (funct, a, b)
+    print("R-type arithmetic: OK")
+
+    for funct in [0b000000, 0b000010, 0b000011]:
+        for shamt in range(32):
+            for _ in range(samples // 32):
+                a = operand()
+                if shamt == 0 and funct != 0b000000:
+                    # the string ALU sliced opr1[:-0] == '' for srl/sra by 0
+                    assert new.alu_shift(funct, a, shamt) == a
+                    continue
+                assert new.alu_shift(funct, a, shamt) == old.alu_shift(format(funct, '06b'), a, shamt), (funct, a, shamt)
+    print("Shifts: OK")
+
+    for opcode in [0b001000, 0b001010, 0b001011, 0b001100, 0b001101]:
+        for _ in range(samples):
+            a, imm = operand(), rng.randint(-0x8000, 0x7FFF)
+            expected = old.alu_arith_i(format(opcode & 0b111, '03b'), a, imm)
+            if opcode == 0b001000 and not fits32(expected):
+                expected = toSigned32(expected)
+            assert new.alu_arith_i(opcode, a, imm) == expected, (opcode, a, imm)
+    for _ in range(samples):
+        a, imm = operand(), rng.randint(-0x8000, 0x7FFF)
+        assert new.alu_arith_i(0b001110, a, imm) == a ^ imm
+        assert new.alu_arith_i(0b001111, a, imm) == toSigned32((imm & 0xFFFF) << 16)
+    print("I-type arithmetic: OK")
@@ -0,0 +1,91 @@
+class Latch:
+    """Base class for pipeline latch payloads: slotted records with a readable repr."""
+    __slots__ = ()
+
+    def __repr__(self):
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+
+class FetchLatch(Latch):
+    """IF/ID payload: the fetched (pre-decoded) instruction and its address."""
+    __slots__ = ('pc', 'instruction', 'predicted')
+
+    def __init__(self, pc, instruction, predicted=None):
+        self.pc = pc
+        self.instruction = instruction
+        self.predicted = predicted  # address fetched next, as the branch predictor chose; None for pc + 4
+
+
+class DecodeLatch(Latch):
+    """ID/EX payload: the decoded instruction and the rs value read from the register file."""
+    __slots__ = ('instruction', 'pc', 'rs', 'predicted')
+
+    def __init__(self, instruction, pc, rs, predicted=None):
+        self.instruction = instruction  # DecodedInstruction with integer fields and immediates
+        self.pc = pc
+        self.rs = rs
+        self.predicted = predicted  # see FetchLatch
+
+
+class ExecuteLatch(Latch):
+    """EX/MEM payload: the ALU result, destination register and store data."""
+    __slots__ = ('instruction', 'pc', 'alu_result', 'rd', 'rt')
+
+    def __init__(self, instruction, pc, alu_result=None, rd=None, rt=None):
+        self.instruction = instruction
+        self.pc = pc
+        self.alu_result = alu_result
+        self.rd = rd  # destination register, None if nothing is written back
+        self.rt = rt  # value to store (stores only)
+
+
+class MemoryLatch(Latch):
+    """MEM/WB payload: the value to write back and its destination register."""
+    __slots__ = ('instruction', 'pc', 'alu_result', 'mem_data', 'rd')
+
+    def __init__(self, instruction, pc, alu_result=None, mem_data=None, rd=None):
+        self.instruction = instruction
+        self.pc = pc
+        self.alu_result = alu_result
+        self.mem_data = mem_data  # loaded value (loads only)
+        self.rd = rd
+
+
+class LatchBank:
+    """One copy of the four inter-stage pipeline registers."""
+    __slots__ = ('IF_ID', 'ID_EX', 'EX_MEM', 'MEM_WB')
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.IF_ID = None
+        self.ID_EX = None
+        self.EX_MEM = None
+        self.MEM_WB = None
+
+    def is_empty(self):
+        return self.IF_ID is None and self.ID_EX is None and self.EX_MEM is None and self.MEM_WB is None
+
+    def __repr__(self):
+        return f"LatchBank(IF_ID={self.IF_ID!r}, ID_EX={self.ID_EX!r}, EX_MEM={self.EX_MEM!r}, MEM_WB={self.MEM_WB!r})"
+
+
+class PipelineLatches:
+    """
+    Double-buffered pipeline registers.
+
+    Stages read their inputs from `current` and write their outputs to `next`;
+    `swap` at the end of a cycle makes the written values visible and hands
+    back an empty bank, so a stage that writes nothing produces a bubble.
+    """
+    __slots__ = ('current', 'next')
+
+    def __init__(self):
+        self.current = LatchBank()
+        self.next = LatchBank()
+
+    def swap(self):
+        self.current, self.next = self.next, self.current
+        self.next.clear()
@@ -1,37 +1,151 @@
+import struct
+
+PAGE_SHIFT = 8
+PAGE_SIZE = 1 << PAGE_SHIFT  # bytes per page in memory snapshots
+
 class Memory:
-    def __init__(self, initialise=False):
-        self.data = [""]*4*1024 # 1024 words # byte addressing
+    """
+    Byte-addressable memory backed by a bytearray.
+
+    Words and halfwords are packed/unpacked with precompiled `struct` formats
+    in the configured byte order ('big' by default, matching the layout the
+    pipeline has always used). `data` and `load`/`store` keep the old view of
+    memory as a list of 8-character bit strings for the UI.
+    """
+    def __init__(self, initialise=False, size=4*1024, endianness='big'):
+        self.size = size  # 1024 words # byte addressing
+        self.endianness = endianness
+        self.buffer = bytearray(size)  # always zero-filled
+        self.view = memoryview(self.buffer)
+        self._last_snapshot = None  # pages of the most recent snapshot/restore
+        self._dirty = set()  # indices of pages stored to since then
+
+        order = '>' if endianness == 'big' else '<'
+        self._half = struct.Struct(order + 'H')
+        self._shalf = struct.Struct(order + 'h')
+        self._word = struct.Struct(order + 'I')
+        self._sword = struct.Struct(order + 'i')
+
         if initialise==True:
-            self.data = [format(0, '008b')]*4*1024 # initialise with all 0's
             # test data filled for loading
-            self.data[1000] = "11111011" 
-            self.data[1001] = "00001111"
-            self.data[1002] = "00000010"
-            self.data[1003] = "00000001"
+            self.buffer[1000] = 0b11111011
+            self.buffer[1001] = 0b00001111
+            self.buffer[1002] = 0b00000010
+            self.buffer[1003] = 0b00000001
+
+    # Native access ------------------------------------------------------
+
+    def load_byte(self, addr, signed=False):
+        if not 0 <= addr < self.size:
+            raise self._out_of_range(addr, 1)
+        value = self.buffer[addr]
+        if signed and value & 0x80:
+            return value - 0x100
+        return value
+
+    def load_half(self, addr, signed=False):
+        if not 0 <= addr <= self.size - 2:
+            raise self._out_of_range(addr, 2)
+        if signed:
+            return self._shalf.unpack_from(self.buffer, addr)[0]
+        return self._half.unpack_from(self.buffer, addr)[0]
+
+    def load_word(self, addr, signed=False):
+        if not 0 <= addr <= self.size - 4:
+            raise self._out_of_range(addr, 4)
+        if signed:
+            return self._sword.unpack_from(self.buffer, addr)[0]
+        return self._word.unpack_from(self.buffer, addr)[0]
+
+    def store_byte(self, addr, value):
+        if not 0 <= addr < self.size:
+            raise self._out_of_range(addr, 1)
+        self._dirty.add(addr >> PAGE_SHIFT)
+        self.buffer[addr] = value & 0xFF
+
+    def store_half(self, addr, value):
+        if not 0 <= addr <= self.size - 2:
+            raise self._out_of_range(addr, 2)
+        dirty = self._dirty
+        dirty.add(addr >> PAGE_SHIFT)
+        dirty.add((addr + 1) >> PAGE_SHIFT)  # unaligned accesses may cross a page
+        self._half.pack_into(self.buffer, addr, value & 0xFFFF)
+
+    def store_word(self, addr, value):
+        if not 0 <= addr <= self.size - 4:
+            raise self._out_of_range(addr, 4)
+        dirty = self._dirty
+        dirty.add(addr >> PAGE_SHIFT)
+        dirty.add((addr + 3) >> PAGE_SHIFT)
+        self._word.pack_into(self.buffer, addr, value & 0xFFFFFFFF)
+
+    def _out_of_range(self, addr, size):
+        # Negative addresses would otherwise index from the end of the buffer
+        return IndexError(f"{size}-byte access at address {addr:#x} ({addr}) is outside the "
+                          f"{self.size}-byte memory (0x0-{self.size - 1:#x})")
+
+    # Snapshots -------------------------------------------------------------
+
+    def snapshot(self):
+        """
+        Contents as a tuple of immutable PAGE_SIZE-byte pages. Only pages
+        stored to since the previous snapshot (or restore) are copied; the
+        rest are shared with it. Writes made directly to `buffer` or `view`
+        aren't tracked, so make them before the first snapshot.
+        """
+        previous = self._last_snapshot
+        view = self.view
+        if previous is None:
+            pages = tuple(bytes(view[start:start + PAGE_SIZE]) for start in range(0, self.size, PAGE_SIZE))
+        else:
+            pages = list(previous)
+            for i in self._dirty:
+                start = i << PAGE_SHIFT
+                pages[i] = bytes(view[start:start + PAGE_SIZE])
+            pages = tuple(pages)
+        self._dirty.clear()
+        self._last_snapshot = pages
+        return pages
+
+    def restore(self, pages):
+        """Load contents from a `snapshot`."""
+        self.buffer[:] = b"".join(pages)
+        self._last_snapshot = pages
+        self._dirty.clear()
+
+    # Bit-string compatibility view ---------------------------------------
+
+    @property
+    def data(self):
+        """List of 8-character bit strings, one per byte (built on access)."""
+        return [format(byte, '08b') for byte in self.buffer]
+
     def store(self, addr, value):
-        
-        self.data[addr]=value
+        """Store one byte given as an int or an 8-character bit string."""
+        if isinstance(value, str):
+            value = int(value, 2)
+        self.store_byte(addr, value)
 
     # loads a byte
     def load(self, addr):
-        
-        """ Check if addr is io_address, if yes, get the value as input from the user recieved via the application, store it in that location and return the same values. """
-        return self.data[addr]
-    
+        """Load one byte as an 8-character bit string."""
+        return format(self.buffer[addr], '08b')
+
     def fillOutput(self, addr, wordData):
         """Memory mapped I/O"""
         # Reserve address 2000-2019 for display output (4 words for output)
         # Assumed: used only through store word instruction onto these words in the memory
-        for i in range(4):
-            self.data[addr+i] = wordData[i*8:(i+1)*8]
+        self.store_word(addr, int(wordData, 2))
 
     def clear_data(self):
-        self.data = [""]*4*1024
+        self.buffer[:] = bytes(self.size)
+        self._last_snapshot = None  # the next snapshot copies every page
+
+    def __len__(self):
+        return self.size
 
     def __getitem__(self, key):
-        return self.data[key]
-    
-    def __setitem__(self, key, value):
-        self.data[key] = value
+        return self.load(key)
 
-# -------------------------------------------
+    def __setitem__(self, key, value):
+        self.store(key, value)
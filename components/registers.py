@@ -1,3 +1,4 @@
+# -------------------------------------------
 def signedVal(binStr):
     isSigned = int(binStr[0]=="1")
     return int(binStr, 2) - isSigned*(2**len(binStr))
@@ -11,53 +12,66 @@ def signedBin(num):
         ans = format(num, '032b')
     return ans
 
+REGISTER_NAMES = ["$0", "$at", "$v0", "$v1", "$a0", "$a1", "$a2", "$a3",
+                  "$t0", "$t1", "$t2", "$t3", "$t4", "$t5", "$t6", "$t7",
+                  "$s0", "$s1", "$s2", "$s3", "$s4", "$s5", "$s6", "$s7",
+                  "$t8", "$t9", "$k0", "$k1", "$gp", "$sp", "$fp", "$ra"]
+
 class Registers:
+    """
+    Register file holding 32 signed 32-bit integers.
+
+    Values are kept as native ints and wrapped to 32 bits on write; the
+    binary-string view used by the UI is only built when asked for.
+    """
     def __init__(self, initialise=False):
-        self.reg = [""] * 32  # 32 registers
+        self.values = [0] * 32  # 32 registers, $zero is always 0
 
-        self.reg[0] = format(0, '032b')  # $zero register
-        self.reg[31] = format(0, '032b')  # $ra = 0 (default = exit main())
-        self.reg[29] = format(4 * 1023, '032b')  # $sp = 4092 (default pointing to top address in the memory)
-        self.reg[30] = format(4 * 1023, '032b')  # $fp = 4092 (default pointing to top address in the memory)
+        self.values[31] = 0  # $ra = 0 (default = exit main())
+        self.values[29] = 4 * 1023  # $sp = 4092 (default pointing to top address in the memory)
+        self.values[30] = 4 * 1023  # $fp = 4092 (default pointing to top address in the memory)
+        # `initialise` is kept for compatibility: every register already starts at 0
 
-        # Initialize registers if specified
-        if initialise:
-            for i in range(1, 29):
-                self.reg[i] = format(0, '032b')  # Initialize s0-s7 and temporaries with 0's
-            """self.reg[8] = format(5, '032b')  # $t0 = 5
-            self.reg[9] = format(10, '032b')  # $t1 = 10
-            self.reg[10] = format(1, '032b')  # $t2 = 1
-            self.reg[12] = format(20, '032b')  # $t4 = 20
-            self.reg[14] = format(229388, '032b')  # $t6 = 229388"""
-
-    def write(self, number, binStr32):
+    def write(self, number, value):
+        """Write a register; accepts an int or a 32-bit binary string."""
         if number==0: # skip writing to $0
             return
-        self.reg[number] = binStr32  # Store value as binary string
+        if isinstance(value, str):
+            value = int(value, 2)
+        self.values[number] = ((value + 0x80000000) & 0xFFFFFFFF) - 0x80000000  # wrap to signed 32 bits
 
     def read(self, number):
-        return signedVal(self.reg[number])  # Convert binary string to integer
+        return self.values[number]  # signed value
+
+    def read_unsigned(self, number):
+        return self.values[number] & 0xFFFFFFFF
+
+    def snapshot(self):
+        """Copy of the register values, e.g. for the per-instruction history."""
+        return self.values.copy()
 
     def reset(self, initialise=False):
         """Reset all registers to their initial state."""
-        self.reg = [""] * 32  # Clear all registers
-        self.reg[0] = format(0, '032b')  # Ensure $zero register remains 0
+        self.values = [0] * 32  # Clear all registers
 
         if initialise:
-            for i in range(8, 26):
-                self.reg[i] = format(0, '032b')  # Initialize s0-s7 and temporaries with 0's
-            self.reg[16] = format(5, '032b')  # $s0 = 5
-            self.reg[17] = format(10, '032b')  # $s1 = 10
-            self.reg[18] = format(1, '032b')  # $s2 = 1
+            self.values[16] = 5  # $s0 = 5
+            self.values[17] = 10  # $s1 = 10
+            self.values[18] = 1  # $s2 = 1
+
+    @property
+    def reg(self):
+        """Binary-string view of the registers (32 chars each)."""
+        return [format(value & 0xFFFFFFFF, '032b') for value in self.values]
 
     def get_registers(self):
         return self.reg
 
     def __getitem__(self, key):
-        return self.reg[key]
+        return format(self.values[key] & 0xFFFFFFFF, '032b')
 
     def __setitem__(self, key, value):
-        self.reg[key] = value
+        self.write(key, value)
 
 
 # Testing commands for the Registers class
@@ -66,34 +80,43 @@ if __name__ == "__main__":
     registers = Registers(initialise=True)
 
     # Test reading the $zero register
-    assert registers.read(0) == format(0, '032b'), "Error: $zero register should be 0"
+    assert registers.read(0) == 0, "Error: $zero register should be 0"
     print("Test 1 Passed: $zero register is correctly initialized to 0.")
 
-    # Test reading other registers after initialization
-    assert registers.read(16) == format(5, '032b'), "Error: $s0 register should be 5"
-    assert registers.read(17) == format(10, '032b'), "Error: $s1 register should be 10"
-    assert registers.read(18) == format(1, '032b'), "Error: $s2 register should be 1"
-    print("Test 2 Passed: $s0, $s1, and $s2 registers are correctly initialized.")
+    # Test reading the stack and frame pointers
+    assert registers.read(29) == 4092, "Error: $sp register should be 4092"
+    assert registers.read(30) == 4092, "Error: $fp register should be 4092"
+    print("Test 2 Passed: $sp and $fp registers are correctly initialized.")
 
     # Test reading uninitialized registers
-    for i in range(8, 32):
-        if i not in [16, 17, 18, 29, 30, 31]:  # Skip the initialized registers
-            assert registers.read(i) == format(0, '032b'), f"Error: Register ${i} should be 0"
+    for i in range(1, 32):
+        if i not in [29, 30]:  # Skip the initialized registers
+            assert registers.read(i) == 0, f"Error: Register ${i} should be 0"
     print("Test 3 Passed: Uninitialized registers are correctly set to 0.")
 
     # Test writing to registers
-    registers.write(1, format(15, '032b'))  # Writing value 15 to $at register
-    assert registers.read(1) == format(15, '032b'), "Error: $at register should be 15 after writing"
+    registers.write(1, 15)  # Writing value 15 to $at register
+    assert registers.read(1) == 15, "Error: $at register should be 15 after writing"
+    registers.write(2, format(15, '032b'))  # Binary strings are still accepted
+    assert registers.read(2) == 15, "Error: $v0 register should be 15 after writing"
     print("Test 4 Passed: Successfully wrote and read value in $at register.")
 
     # Test attempt to write to $zero register
-    registers.write(0, format(100, '032b'))  # Attempting to write 100 to $zero
-    assert registers.read(0) == format(0, '032b'), "Error: $zero register should remain 0 after attempted write"
+    registers.write(0, 100)  # Attempting to write 100 to $zero
+    assert registers.read(0) == 0, "Error: $zero register should remain 0 after attempted write"
     print("Test 5 Passed: $zero register cannot be modified.")
 
+    # Test 32-bit wraparound and the signed/unsigned/string views
+    registers.write(3, 0x7FFFFFFF + 1)
+    assert registers.read(3) == -2**31, "Error: $v1 should wrap to -2**31"
+    assert registers.read_unsigned(3) == 0x80000000, "Error: unsigned view of $v1 should be 0x80000000"
+    registers.write(4, -1)
+    assert registers[4] == "1" * 32, "Error: string view of -1 should be all ones"
+    assert signedVal(registers.reg[4]) == -1, "Error: string view should round-trip through signedVal"
+    print("Test 6 Passed: Values wrap to 32 bits and views are consistent.")
+
     # Test reset function
     registers.reset()
-    assert registers.read(0) == format(0, '032b'), "Error: $zero register should be 0 after reset"
-    for i in range(1, 32):
-        assert registers.read(i) == "", f"Error: Register ${i} should be uninitialized after reset"
-    print("Test 6 Passed: All registers reset correctly.")
+    for i in range(32):
+        assert registers.read(i) == 0, f"Error: Register ${i} should be 0 after reset"
+    print("Test 7 Passed: All registers reset correctly.")
@@ -0,0 +1,117 @@
+import numpy as np
+
+from instructions import Op
+
+
+STAGES = ("fetch", "decode", "execute", "memory_access", "writeBack")
+FETCH, DECODE, EXECUTE, MEMORY, WRITEBACK = range(len(STAGES))
+
+BUBBLE = -1  # PC code of an empty stage
+
+# Per-stage flags
+STALL = 1  # held in place by a load-use stall
+FLUSH = 2  # squashed behind a taken branch/jump
+HALT = 4   # the instruction that halted the program
+
+_VERBS = ("fetched", "decoded", "executed", "accessed memory", "written back")
+
+
+class CycleTrace:
+    """
+    Columnar record of what each pipeline stage held in each cycle.
+
+    Row 0 is the initial (empty) state and row n is cycle n. Every stage of a
+    row is stored as three compact codes in preallocated NumPy columns: the PC
+    of its instruction (BUBBLE if empty), the Op of the instruction and a
+    bitmask of STALL/FLUSH/HALT flags. The columns double in size when full,
+    so recording is amortised O(1) per cycle. Strings and DataFrames are only
+    built on request.
+    """
+    def __init__(self, capacity=1024):
+        self.pc = np.full((capacity, len(STAGES)), BUBBLE, dtype=np.int32)
+        self.op = np.zeros((capacity, len(STAGES)), dtype=np.uint8)
+        self.flags = np.zeros((capacity, len(STAGES)), dtype=np.uint8)
+        self.length = 1  # the initial state row
+        self.row = 0  # row being written
+
+    def __len__(self):
+        return self.length
+
+    def new_cycle(self):
+        """Start a new row, all bubbles, and make it the target of `record`."""
+        if self.length == len(self.pc):
+            self._grow()
+        self.row = self.length
+        self.length += 1
+
+    def _grow(self):
+        capacity = 2 * len(self.pc)
+        pc = np.full((capacity, len(STAGES)), BUBBLE, dtype=np.int32)
+        op = np.zeros((capacity, len(STAGES)), dtype=np.uint8)
+        flags = np.zeros((capacity, len(STAGES)), dtype=np.uint8)
+        pc[:self.length] = self.pc[:self.length]
+        op[:self.length] = self.op[:self.length]
+        flags[:self.length] = self.flags[:self.length]
+        self.pc, self.op, self.flags = pc, op, flags
+
+    def record(self, stage, pc, op, flags=0):
+        """Record the instruction at `pc` in `stage` of the current cycle."""
+        row = self.row
+        self.pc[row, stage] = pc
+        self.op[row, stage] = op
+        if flags:
+            self.flags[row, stage] = flags
+
+    def mark(self, stage, flags):
+        """Add flags to a stage of the current cycle."""
+        self.flags[self.row, stage] |= flags
+
+    def copy(self, length=None):
+        """A new trace holding the first `length` rows (all rows if None)."""
+        length = self.length if length is None else length
+        trace = CycleTrace(max(length, 1024))
+        trace.pc[:length] = self.pc[:length]
+        trace.op[:length] = self.op[:length]
+        trace.flags[:length] = self.flags[:length]
+        trace.length = length
+        trace.row = length - 1
+        return trace
+
+    def columns(self):
+        """The recorded codes as (pc, op, flags) arrays of shape (len, 5); views, not copies."""
+        return self.pc[:self.length], self.op[:self.length], self.flags[:self.length]
+
+    def describe(self, row, stage, label=None):
+        """
+        Human-readable text for one stage of one row. `label`, if given, maps
+        a PC to a symbol name (or None), as ProgramImage.label does.
+        """
+        pc = int(self.pc[row, stage])
+        if pc == BUBBLE:
+            return "---"
+        symbol = label(pc) if label is not None else None
+        where = f"PC {pc} <{symbol}>" if symbol else f"PC {pc}"
+        text = f"{Op(self.op[row, stage]).name.lower()} at {where} {_VERBS[stage]}"
+        flags = self.flags[row, stage]
+        if flags & STALL:
+            text += " (stalled)"
+        if flags & FLUSH:
+            text += " (flushed)"
+        if flags & HALT:
+            text += " (halt)"
+        return text
+
+    def labels(self, start=0, stop=None):
+        stop = self.length if stop is None else min(stop, self.length)
+        return [f"Cycle {row}" if row else "Initial State" for row in range(start, stop)]
+
+    def to_strings(self, start=0, stop=None, label=None):
+        """Rows [start, stop) as lists of five stage descriptions."""
+        stop = self.length if stop is None else min(stop, self.length)
+        return [[self.describe(row, stage, label) for stage in range(len(STAGES))] for row in range(start, stop)]
+
+    def to_dataframe(self, start=0, stop=None, label=None):
+        """Rows [start, stop) as a pandas DataFrame of stage descriptions, indexed by cycle."""
+        import pandas as pd
+        stop = self.length if stop is None else min(stop, self.length)
+        return pd.DataFrame(self.to_strings(start, stop, label), columns=list(STAGES), index=self.labels(start, stop))
@@ -0,0 +1,347 @@
+"""
+Loader for static ELF32 MIPS executables, such as those linked by a MIPS
+cross-toolchain, as a ProgramImage that any of the simulators can run.
+
+PT_LOAD segments become image segments (views of the file, copied into memory
+with one slice assignment each), the entry point comes from e_entry and the
+symbol table is kept for labelling addresses in traces. The text is scanned
+when the file is loaded, so code this simulator would run differently from a
+MIPS CPU is reported before the run starts.
+
+Two things differ from MIPS hardware and shape what can be loaded:
+  * j/jal here jump relative to the next instruction (see utils.assembler),
+    so absolute jump targets are converted to that form while loading.
+  * There are no branch delay slots. Code must leave them as nops
+    (e.g. gcc -fno-delayed-branch, or the assembler's default `.set reorder`).
+Memory is one flat array from address 0, so link the program low, e.g.
+    mips-linux-gnu-gcc -march=mips1 -static -nostdlib -fno-pic -mno-abicalls -G0 \\
+        -fno-delayed-branch -Wl,-Ttext=0x1000 -o program.elf program.c
+"""
+import mmap
+import struct
+
+import numpy as np
+
+from instructions import Op, decode
+from program_image import ProgramImage, starts_with
+
+ELF_MAGIC = b"\x7fELF"
+ELFCLASS32 = 1
+ELFDATA2LSB, ELFDATA2MSB = 1, 2
+ET_EXEC = 2
+EM_MIPS = 8
+PT_LOAD, PT_DYNAMIC, PT_INTERP = 1, 2, 3
+PF_X = 0x1
+SHT_SYMTAB, SHT_NOBITS = 2, 8
+SHF_EXECINSTR = 0x4
+SHN_UNDEF = 0
+STT_SECTION, STT_FILE = 3, 4
+STB_LOCAL = 0
+EF_MIPS_COMPRESSED = 0x06000000  # MIPS16 or microMIPS code
+
+MAX_MEMORY = 64 * 2**20  # highest segment end address accepted, in bytes
+REPORTED_PROBLEMS = 10  # unsupported instructions listed in the error message
+
+CONTROL_OPS = frozenset({Op.BEQ, Op.BNE, Op.J, Op.JAL, Op.JR})
+LOGICAL_IMMEDIATE_OPS = frozenset({Op.ANDI, Op.ORI, Op.XORI})
+
+# ELF header (after e_ident), program header, section header and symbol, per byte order
+_STRUCTS = {
+    order: (struct.Struct(order + '16xHHIIIIIHHHHHH'), struct.Struct(order + '8I'),
+            struct.Struct(order + '10I'), struct.Struct(order + 'IIIBBH'))
+    for order in '<>'
+}
+
+
+class ELFError(ValueError):
+    """An ELF file that is malformed or can't be run by the simulator."""
+
+
+def is_elf_file(file):
+    """True if `file` (a path or a binary file object) starts with ELF_MAGIC."""
+    return starts_with(file, ELF_MAGIC)
+
+
+def load_elf(buffer, check=True):
+    """
+    ProgramImage for the static ELF32 MIPS executable in `buffer` (bytes, or
+    an mmap). The text is checked with `scan_text` unless `check` is False,
+    and ELFError lists any problems found.
+    """
+    view = memoryview(buffer)
+    if len(view) < 52 or view[:4] != ELF_MAGIC:
+        raise ELFError("not an ELF file")
+    if view[4] != ELFCLASS32:
+        raise ELFError("only 32-bit ELF files are supported")
+    if view[5] not in (ELFDATA2LSB, ELFDATA2MSB):
+        raise ELFError(f"unknown ELF byte order {view[5]}")
+    endianness = 'little' if view[5] == ELFDATA2LSB else 'big'
+    header, program_header, section_header, symbol = _STRUCTS['<' if endianness == 'little' else '>']
+    (e_type, machine, _, entry, phoff, shoff, flags, _,
+     phentsize, phnum, shentsize, shnum, _) = header.unpack_from(view)
+    if machine != EM_MIPS:
+        raise ELFError(f"not a MIPS executable (machine {machine})")
+    if e_type != ET_EXEC:
+        raise ELFError("only static executables (ET_EXEC) are supported")
+    if flags & EF_MIPS_COMPRESSED:
+        raise ELFError("MIPS16 and microMIPS code is not supported")
+
+    _check_table(view, "program header", phoff, phnum, phentsize, program_header)
+    segments = []
+    executable = []  # (start, end) of file-backed executable segments
+    for i in range(phnum):
+        p_type, offset, address, _, file_size, memory_size, p_flags, _ = \
+            program_header.unpack_from(view, phoff + i * phentsize)
+        if p_type in (PT_DYNAMIC, PT_INTERP):
+            raise ELFError("dynamically linked executables are not supported")
+        if p_type != PT_LOAD or memory_size == 0:
+            continue
+        if offset + file_size > len(view):
+            raise ELFError(f"segment at {address:#x} runs past the end of the file")
+        if address + memory_size > MAX_MEMORY:
+            raise ELFError(f"segment at {address:#x} ends above the {MAX_MEMORY // 2**20} MiB memory limit; "
+                           "link the program at lower addresses (e.g. -Ttext=0x1000)")
+        if file_size:
+            segments.append((address, view[offset:offset + file_size]))
+        if memory_size > file_size:
+            segments.append((address + file_size, bytes(memory_size - file_size)))  # .bss
+        if p_flags & PF_X:
+            executable.append((address, address + file_size))
+
+    shnum = shnum if shoff else 0
+    _check_table(view, "section header", shoff, shnum, shentsize, section_header)
+    sections = [section_header.unpack_from(view, shoff + i * shentsize) for i in range(shnum)]
+    # Executable sections rather than whole segments, which often hold read-only data too
+    code = [(address, address + size) for _, sh_type, sh_flags, address, _, size, *_ in sections
+            if sh_flags & SHF_EXECINSTR and sh_type != SHT_NOBITS and size] or executable
+    if not code:
+        raise ELFError("no executable code")
+    text_start = min(start for start, _ in code)
+    text_end = max(end for _, end in code)
+    if not text_start <= entry < text_end:
+        raise ELFError(f"entry point {entry:#x} is outside the text ({text_start:#x}-{text_end:#x})")
+
+    problems = []
+    for start, end in code:
+        words = _text_words(segments, start, end, endianness)
+        relocate_jumps(words, start)
+        problems += scan_text(words, start)
+    if check and problems:
+        lines = [f"  {address:#010x}: {word:08x}  {reason}" for address, word, reason in problems[:REPORTED_PROBLEMS]]
+        if len(problems) > REPORTED_PROBLEMS:
+            lines.append(f"  ... and {len(problems) - REPORTED_PROBLEMS} more")
+        raise ELFError(f"{len(problems)} instructions can't be simulated as written:\n" + "\n".join(lines))
+
+    symbols = _read_symbols(view, sections, symbol)
+    return ProgramImage(segments, text_start, text_end, entry, symbols, endianness)
+
+
+def load_elf_file(path, check=True):
+    """Map an ELF file into memory and read it with `load_elf`."""
+    with open(path, 'rb') as f:
+        if not is_elf_file(f):
+            raise ELFError(f"{path} is not an ELF file")
+        # The mapping stays valid after the file is closed
+        return load_elf(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ), check)
+
+
+def _check_table(view, name, offset, count, entry_size, entry):
+    """Raise ELFError unless `count` entries of `entry_size` bytes at `offset` lie within the file."""
+    if count and (entry_size < entry.size or offset + count * entry_size > len(view)):
+        raise ELFError(f"{name} table ({count} entries of {entry_size} bytes at {offset:#x}) "
+                       f"is not within the {len(view)}-byte file")
+
+
+def _text_words(segments, start, end, endianness):
+    """
+    Writable word array over [start, end) of the segment holding it. The
+    segment is replaced by a copy first, since it may be a read-only view of
+    the file.
+    """
+    if start % 4 or end % 4:
+        raise ELFError(f"code at {start:#x}-{end:#x} is not word aligned")
+    for i, (address, data) in enumerate(segments):
+        if address <= start and end <= address + len(data):
+            if not isinstance(data, bytearray):
+                data = bytearray(data)
+                segments[i] = (address, data)
+            return np.frombuffer(data, '>u4' if endianness == 'big' else '<u4',
+                                 count=(end - start) // 4, offset=start - address)
+    raise ELFError(f"code at {start:#x}-{end:#x} is not inside a loaded segment")
+
+
+def relocate_jumps(words, start):
+    """
+    Rewrite j/jal in `words` (the text from address `start`) in place, from
+    MIPS's absolute targets (within the current 256 MiB region) to offsets
+    from the next instruction, as the simulators expect.
+    """
+    index = np.flatnonzero(((words >> 26) == 2) | ((words >> 26) == 3))
+    if not index.size:
+        return
+    jumps = words[index].astype(np.int64)
+    next_pc = start + 4 * index.astype(np.int64) + 4
+    target = (next_pc & 0xF0000000) | ((jumps & 0x3FFFFFF) << 2)
+    words[index] = ((jumps & 0xFC000000) | (((target - next_pc) >> 2) & 0x3FFFFFF)).astype(np.uint32)
+
+
+def scan_text(words, start):
+    """
+    Instructions in `words` (the text from address `start`, with jumps
+    already relocated) that the simulators would not run as a MIPS CPU does,
+    as a sorted list of (address, word, reason).
+    """
+    reasons = {}
+    transfers = []
+    for word in np.unique(words).tolist():
+        inst = decode(word)
+        if inst.op == Op.UNKNOWN:
+            reasons[word] = "not implemented by the simulator"
+        elif inst.opcode in (0x01, 0x06, 0x07):
+            reasons[word] = "compare-with-zero branch (run as bne here)"
+        elif inst.op in LOGICAL_IMMEDIATE_OPS and inst.imm & 0x8000:
+            reasons[word] = "immediate above 0x7fff (sign-extended here)"
+        if inst.op in CONTROL_OPS:
+            transfers.append(word)
+
+    problems = []
+    if reasons:
+        bad = np.isin(words, list(reasons))
+        problems += [(start + 4 * i, int(words[i]), reasons[int(words[i])]) for i in np.flatnonzero(bad).tolist()]
+    if transfers:
+        # A branch followed by anything but a nop relies on the delay slot running
+        filled = np.isin(words[:-1], transfers) & (words[1:] != 0)
+        problems += [(start + 4 * i, int(words[i]), "in a branch delay slot (delay slots don't run here)")
+                     for i in (np.flatnonzero(filled) + 1).tolist()]
+    return sorted(problems)
+
+
+def _read_symbols(view, sections, symbol):
+    """Defined function, object and untyped symbols from the symbol tables, by name."""
+    symbols = {}
+    for _, sh_type, _, _, offset, size, link, *_ in sections:
+        if sh_type != SHT_SYMTAB:
+            continue
+        if link >= len(sections):
+            raise ELFError(f"symbol table links to section {link} of {len(sections)}")
+        _check_table(view, "symbol", offset, size // symbol.size, symbol.size, symbol)
+        strings = sections[link]
+        names = bytes(view[strings[4]:strings[4] + strings[5]])
+        for entry in range(offset + symbol.size, offset + size, symbol.size):  # entry 0 is reserved
+            name_offset, value, _, info, _, shndx = symbol.unpack_from(view, entry)
+            if shndx == SHN_UNDEF or (info & 0xF) in (STT_SECTION, STT_FILE) or not name_offset:
+                continue
+            end = names.find(b"\0", name_offset)
+            name = names[name_offset:end if end >= 0 else None].decode(errors='replace')
+            # A global symbol wins over a local one of the same name
+            if (info >> 4) != STB_LOCAL or name not in symbols:
+                symbols[name] = value
+    return symbols
+
+
+def _build_elf(words, data, endianness, text_base=0x1000, data_base=0x2000, bss_size=0, symbols=()):
+    """
+    A minimal executable for the self-check: .text and .data (plus .bss)
+    segments, section headers and a symbol table of (name, address) pairs.
+    """
+    order = '<' if endianness == 'little' else '>'
+    header, program_header, section_header, symbol = _STRUCTS[order]
+    text = struct.pack(f'{order}{len(words)}I', *words)
+    strtab = b"\0" + b"".join(name.encode() + b"\0" for name, _ in symbols)
+    symtab = bytes(symbol.size)
+    name_offset = 1
+    for name, address in symbols:
+        section = 1 if text_base <= address < text_base + len(text) else 2
+        symtab += symbol.pack(name_offset, address, 0, (1 << 4) | 2, 0, section)  # global function
+        name_offset += len(name) + 1
+    shstrtab = b"\0.text\0.data\0.symtab\0.strtab\0.shstrtab\0"
+
+    phoff = 52
+    offset = phoff + 2 * program_header.size
+    layout = {}
+    for name, blob in (('text', text), ('data', data), ('symtab', symtab), ('strtab', strtab), ('shstrtab', shstrtab)):
+        offset += -offset % 4
+        layout[name] = offset
+        offset += len(blob)
+    shoff = offset + -offset % 4
+
+    out = bytearray(shoff + 6 * section_header.size)
+    header.pack_into(out, 0, ET_EXEC, EM_MIPS, 1, text_base, phoff, shoff, 0, 52,
+                     program_header.size, 2, section_header.size, 6, 5)
+    out[:7] = ELF_MAGIC + bytes([ELFCLASS32, ELFDATA2LSB if endianness == 'little' else ELFDATA2MSB, 1])
+    program_header.pack_into(out, phoff, PT_LOAD, layout['text'], text_base, text_base, len(text), len(text), 5, 4)
+    program_header.pack_into(out, phoff + program_header.size, PT_LOAD, layout['data'], data_base, data_base,
+                             len(data), len(data) + bss_size, 6, 4)
+    for name, blob in (('text', text), ('data', data), ('symtab', symtab), ('strtab', strtab), ('shstrtab', shstrtab)):
+        out[layout[name]:layout[name] + len(blob)] = blob
+    sections = [
+        (0,) * 10,
+        (1, 1, 0x6, text_base, layout['text'], len(text), 0, 0, 4, 0),
+        (7, 1, 0x3, data_base, layout['data'], len(data), 0, 0, 4, 0),
+        (13, SHT_SYMTAB, 0, 0, layout['symtab'], len(symtab), 4, 1, 4, symbol.size),
+        (21, 3, 0, 0, layout['strtab'], len(strtab), 0, 0, 1, 0),
+        (29, 3, 0, 0, layout['shstrtab'], len(shstrtab), 0, 0, 1, 0),
+    ]
+    for i, fields in enumerate(sections):
+        section_header.pack_into(out, shoff + i * section_header.size, *fields)
+    return bytes(out)
+
+
+# ---------------------------------------------------------
+
+if __name__ == "__main__":
+    from interpreter import MIPSInterpreter
+    from pipeline import MIPSPipeline
+
+    # main:   lui  $t0, 0           # $t0 = &values (0x2000)
+    #         addiu $t0, $t0, 0x2000
+    #         lw   $t1, 0($t0)
+    #         lw   $t2, 4($t0)
+    #         jal  add               # absolute target, relocated on load
+    #         nop
+    #         sw   $v0, 8($t0)       # into .bss
+    #         syscall
+    # add:    addu $v0, $t1, $t2
+    #         jr   $ra
+    #         nop
+    words = [0x3C080000, 0x25082000, 0x8D090000, 0x8D0A0004, 0x0C000000 | (0x1020 >> 2), 0x00000000,
+             0xAD020008, 0x0000000C, 0x012A1021, 0x03E00008, 0x00000000]
+    symbols = [("main", 0x1000), ("add", 0x1020), ("values", 0x2000)]
+    for endianness in ('big', 'little'):
+        data = struct.pack(('>' if endianness == 'big' else '<') + 'ii', 40, 2)
+        image = load_elf(_build_elf(words, data, endianness, bss_size=4, symbols=symbols))
+        assert image.entry == 0x1000 and image.endianness == endianness
+        assert image.symbols == {"main": 0x1000, "add": 0x1020, "values": 0x2000}
+        assert image.label(0x1024) == "add+0x4" and image.label(0x1000) == "main"
+        interpreter = MIPSInterpreter(program=image)
+        interpreter.run()
+        pipeline = MIPSPipeline(program=image)
+        pipeline.run_pipeline()
+        for simulator in (interpreter, pipeline):
+            assert simulator.registers.read(2) == 42, (type(simulator).__name__, endianness)
+            assert simulator.memory.load_word(0x2008) == 42
+
+    # Problems are found when loading, before anything runs
+    bad = [0x04010002, 0x00000000, 0x3508FFFF, 0x10000002, 0x01094020, 0x0000000C, 0x00851018]  # bgez, ori, beq + add, mult
+    try:
+        load_elf(_build_elf(bad, b"", 'big'))
+    except ELFError as e:
+        print(e)
+        assert "4 instructions" in str(e)
+    else:
+        raise AssertionError("unsupported instructions were not reported")
+    assert len(load_elf(_build_elf(bad, b"", 'big'), check=False).text_words()) == len(bad)
+
+    # Tables outside a truncated or corrupt file are ELFErrors, not struct.error
+    good = _build_elf(words, struct.pack('>ii', 40, 2), 'big', symbols=symbols)
+    for field in (28, 32):  # e_phoff, e_shoff
+        corrupt = bytearray(good)
+        struct.pack_into('>I', corrupt, field, 0x10000)
+        for buffer in (corrupt, corrupt[:52]):
+            try:
+                load_elf(bytes(buffer))
+            except ELFError as e:
+                assert "not within" in str(e), e
+            else:
+                raise AssertionError(f"a table offset of 0x10000 at byte {field} was not reported")
+    print("ELF loader self-check passed")
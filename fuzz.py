@@ -0,0 +1,139 @@
+"""
+Differential testing of the simulators on random programs.
+
+Programs come from utils.program_generator, one per seed. Each is run on
+MIPSInterpreter, the reference, and on the other simulators; the final
+registers, I/O port writes and memory must match. The pipeline runs once per
+branch predictor, since a wrong recovery from a misprediction shows up as a
+wrong result. Seeds run in parallel with
+a ProcessPoolExecutor, and the source of every failing program can be saved
+to reproduce it with `python -m utils.program_generator --seed N`.
+
+Usage (from the repository root):
+    python fuzz.py --programs 500 --length 300 --workers 8 --save-failures failures/
+"""
+import argparse
+import contextlib
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from branch_predictor import PREDICTORS
+from interpreter import MIPSInterpreter
+from pipeline import MIPSPipeline
+from translator import MIPSTranslator
+from utils.assembler import MIPSAssembler
+from utils.program_generator import GeneratorConfig, generate_program
+from vectorized import TextStoreError, VectorizedInterpreter
+
+MODES = ('pipeline', 'translated', 'vectorized')
+MAX_STEPS = 10**7  # generated programs terminate; this only bounds a simulator bug
+
+
+def _final_state(mode, image, predictor=None):
+    """(registers, I/O writes, memory bytes, halted) after running `image` in `mode`."""
+    if mode == 'pipeline':
+        simulator = MIPSPipeline(program=image, predictor=predictor)
+        cycles = 0
+        while not simulator.empty_pipeline() and cycles < MAX_STEPS:
+            simulator.run_cycle()
+            cycles += 1
+        return (simulator.registers.snapshot(), list(simulator.io.io_memory), bytes(simulator.memory.buffer),
+                simulator.halt)
+    if mode == 'vectorized':
+        simulator = VectorizedInterpreter(program=image, lanes=1)
+        simulator.run(max_steps=MAX_STEPS)
+        return (list(simulator.lane_registers(0)), list(simulator.io_memory[0]), simulator.mem[0].tobytes(),
+                simulator.halt)
+    simulator = (MIPSTranslator if mode == 'translated' else MIPSInterpreter)(program=image, record_states=False)
+    simulator.run(max_steps=MAX_STEPS)
+    return simulator.registers.snapshot(), list(simulator.io.io_memory), bytes(simulator.memory.buffer), simulator.halt
+
+
+def _differences(reference, state):
+    registers, io, memory, halted = state
+    differences = []
+    if not halted:
+        differences.append("did not halt")
+    differing = [i for i, (a, b) in enumerate(zip(reference[0], registers)) if a != b]
+    if differing:
+        differences.append("registers " + ", ".join(f"${i}: {reference[0][i]} != {registers[i]}" for i in differing))
+    if reference[1] != io:
+        differences.append(f"I/O writes {reference[1]} != {io}")
+    if reference[2] != memory:
+        first = next(i for i, (a, b) in enumerate(zip(reference[2], memory)) if a != b) \
+            if len(reference[2]) == len(memory) else None
+        differences.append("memory" + (f" from address {first:#x}" if first is not None else " size"))
+    return differences
+
+
+def check_seed(seed, config, modes, predictors=('not-taken',)):
+    """
+    Generate, assemble and run the program for `seed` on every mode (the
+    pipeline with each of `predictors`). Never raises: returns
+    (seed, {mode: [differences or error]}) with only failing modes.
+    """
+    failures = {}
+    try:
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            image = MIPSAssembler().assemble(generate_program(seed, config))
+            reference = _final_state('functional', image)
+            if not reference[3]:
+                failures['functional'] = ["did not halt"]
+            runs = [(f"pipeline/{predictor}", 'pipeline', predictor) for predictor in predictors] \
+                if 'pipeline' in modes else []
+            runs += [(mode, mode, None) for mode in modes if mode != 'pipeline']
+            for name, mode, predictor in runs:
+                try:
+                    differences = _differences(reference, _final_state(mode, image, predictor))
+                except TextStoreError:
+                    continue  # vectorized mode and I/O stores into a long program's text
+                except Exception as e:
+                    differences = [f"{type(e).__name__}: {e}"]
+                if differences:
+                    failures[name] = differences
+    except Exception as e:
+        failures['generate'] = [f"{type(e).__name__}: {e}"]
+    return seed, failures
+
+
+def main(argv=None):
+    defaults = GeneratorConfig()
+    arg_parser = argparse.ArgumentParser(description="Run random programs on every simulator and compare the results.")
+    arg_parser.add_argument('--programs', type=int, default=100)
+    arg_parser.add_argument('--seed', type=int, default=0, help="seed of the first program")
+    arg_parser.add_argument('--length', type=int, default=defaults.length)
+    arg_parser.add_argument('--footprint', type=int, default=defaults.footprint, help="data bytes (a power of two)")
+    arg_parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES),
+                            help="simulators compared with the functional interpreter")
+    arg_parser.add_argument('--predictors', nargs='+', choices=list(PREDICTORS), default=list(PREDICTORS),
+                            help="branch predictors to run the pipeline with")
+    arg_parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    arg_parser.add_argument('--save-failures', metavar='DIR', help="write the source of failing programs here")
+    args = arg_parser.parse_args(argv)
+
+    config = defaults._replace(length=args.length, footprint=args.footprint)
+    failed = 0
+    start = time.monotonic()
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        futures = [executor.submit(check_seed, seed, config, args.modes, args.predictors)
+                   for seed in range(args.seed, args.seed + args.programs)]
+        for future in as_completed(futures):
+            seed, failures = future.result()
+            if not failures:
+                continue
+            failed += 1
+            for mode, differences in failures.items():
+                print(f"seed {seed} {mode}: " + "; ".join(differences))
+            if args.save_failures:
+                os.makedirs(args.save_failures, exist_ok=True)
+                with open(os.path.join(args.save_failures, f"random_{seed}.asm"), 'w') as f:
+                    f.write("\n".join(generate_program(seed, config)) + "\n")
+    elapsed = time.monotonic() - start
+    print(f"{args.programs} programs in {elapsed:.2f}s: {args.programs - failed} ok, {failed} failed", file=sys.stderr)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
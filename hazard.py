@@ -1,4 +1,4 @@
-import multiprocessing
+from instructions import LOAD_OPS
 
 class HazardManager:
     def __init__(self, registers):
@@ -9,7 +9,7 @@ class HazardManager:
         self.mem_wb_forwarding_data = None  # Data from MEM/WB stage
 
         self.registers = registers
-        self.stall_signal = multiprocessing.Event()
+        self.stall_signal = False
     
     def update_stage_data(self, ex_mem_reg_dst, ex_mem_forwarding_data, mem_wb_reg_dst, mem_wb_forwarding_data):
         """Update EX/MEM and MEM/WB stage destination registers and data."""
@@ -28,49 +28,47 @@ class HazardManager:
         forward_b = 0  # For rt
         
         # EX/MEM hazard
-        if ex_mem_data and 'RD' in ex_mem_data:
-            if rs == ex_mem_data['RD'] and rs != 0:
+        if ex_mem_data is not None:
+            if rs == ex_mem_data.rd and rs != 0:
                 forward_a = 1
-            if rt == ex_mem_data['RD'] and rt != 0:
+            if rt == ex_mem_data.rd and rt != 0:
                 forward_b = 1
                 
-        # MEM/WB hazard
-        if mem_wb_data and 'RD' in mem_wb_data:
-            if rs == mem_wb_data['RD'] and rs != 0:
+        # MEM/WB hazard (EX/MEM holds the more recent value and takes priority)
+        if mem_wb_data is not None:
+            if rs == mem_wb_data.rd and rs != 0 and forward_a == 0:
                 forward_a = 2
-            if rt == mem_wb_data['RD'] and rt != 0:
+            if rt == mem_wb_data.rd and rt != 0 and forward_b == 0:
                 forward_b = 2
                 
         return forward_a, forward_b
     
     def check_data_hazard_stall(self, inst_cur, inst_prev):
         """
-        Check for data hazards stall
+        Check for data hazards stall: a load in ID/EX whose destination is
+        read by the instruction being decoded (load-use hazard).
         """
-        if not inst_prev['op'][:3]=='100':
+        if inst_prev.op not in LOAD_OPS:
             return False
-        if inst_prev and 'rt' in inst_prev:
-            if 'rs' in inst_cur and inst_cur['rs']==inst_prev['rt']:
-                return True
-            if 'rt' in inst_cur and inst_cur['rt']==inst_prev['rt']:
-                return True
-        return False
+        if inst_cur.type == 2:  # J-type reads no registers
+            return False
+        return inst_cur.rs == inst_prev.rt or inst_cur.rt == inst_prev.rt
 
     def get_forwarded_value(self, reg_num, forward_signal, ex_mem_data, mem_wb_data):
         """Get the forwarded value based on forwarding signal"""
         if forward_signal == 0:
             return self.registers.read(reg_num)
-        elif forward_signal == 1 and ex_mem_data:
-            return ex_mem_data['ALU_result']
-        elif forward_signal == 2 and mem_wb_data:
-            if 'Mem_data' in mem_wb_data:
-                return mem_wb_data['Mem_data']
-            return mem_wb_data['ALU_result']
+        elif forward_signal == 1 and ex_mem_data is not None:
+            return ex_mem_data.alu_result
+        elif forward_signal == 2 and mem_wb_data is not None:
+            if mem_wb_data.mem_data is not None:
+                return mem_wb_data.mem_data
+            return mem_wb_data.alu_result
         return None
     
     def reset(self):
         """Reset hazard and forwarding flags for a new cycle."""
-        self.stall_signal.clear()
+        self.stall_signal = False
         self.ex_mem_reg_dst = None
         self.mem_wb_reg_dst = None
         self.ex_mem_forwarding_data = None
@@ -1,3 +1,7 @@
+from enum import IntEnum, auto
+from typing import NamedTuple
+
+
 class Instruction:
     def __init__(self, type, instruction):
         self.type = type
@@ -36,6 +40,153 @@ class Instruction:
         type_names = {0: 'R-type', 1: 'I-type', 2: 'J-type'}
         return f"{type_names[self.type]} Instruction: {self.fields}"
 
+class Op(IntEnum):
+    """Operations the simulator executes, resolved once at decode time."""
+    UNKNOWN = 0
+    # R-type
+    SLL = auto()
+    SRL = auto()
+    SRA = auto()
+    JR = auto()
+    SYSCALL = auto()
+    ADD = auto()
+    SUB = auto()
+    AND = auto()
+    OR = auto()
+    XOR = auto()
+    NOR = auto()
+    SLT = auto()
+    SLTU = auto()
+    # I-type arithmetic/logical
+    ADDI = auto()
+    SLTI = auto()
+    SLTIU = auto()
+    ANDI = auto()
+    ORI = auto()
+    XORI = auto()
+    LUI = auto()
+    # Loads and stores
+    LB = auto()
+    LH = auto()
+    LW = auto()
+    LBU = auto()
+    LHU = auto()
+    SB = auto()
+    SH = auto()
+    SW = auto()
+    # Branches and jumps, kept last: the pipeline tests op >= BEQ
+    BEQ = auto()
+    BNE = auto()
+    J = auto()
+    JAL = auto()
+
+
+R_FUNCT_OPS = {
+    0x00: Op.SLL, 0x02: Op.SRL, 0x03: Op.SRA, 0x08: Op.JR, 0x0C: Op.SYSCALL,
+    0x20: Op.ADD, 0x22: Op.SUB, 0x24: Op.AND, 0x25: Op.OR, 0x26: Op.XOR, 0x27: Op.NOR,
+    0x2A: Op.SLT, 0x2B: Op.SLTU,
+    # addu/subu: the same as add/sub here, since overflow never traps
+    0x21: Op.ADD, 0x23: Op.SUB,
+}
+
+OPCODE_OPS = {
+    0x02: Op.J, 0x03: Op.JAL,
+    0x04: Op.BEQ, 0x05: Op.BNE,
+    # bgez/bltz, blez and bgtz have always been executed as "branch if rs != rt"
+    0x01: Op.BNE, 0x06: Op.BNE, 0x07: Op.BNE,
+    0x08: Op.ADDI, 0x09: Op.ADDI, 0x0A: Op.SLTI, 0x0B: Op.SLTIU, 0x0C: Op.ANDI, 0x0D: Op.ORI, 0x0E: Op.XORI, 0x0F: Op.LUI,
+    0x20: Op.LB, 0x21: Op.LH, 0x23: Op.LW, 0x24: Op.LBU, 0x25: Op.LHU,
+    0x28: Op.SB, 0x29: Op.SH, 0x2B: Op.SW,
+}
+
+LOAD_OPS = frozenset({Op.LB, Op.LH, Op.LW, Op.LBU, Op.LHU})
+STORE_OPS = frozenset({Op.SB, Op.SH, Op.SW})
+SHIFT_OPS = frozenset({Op.SLL, Op.SRL, Op.SRA})
+
+
+class DecodedInstruction(NamedTuple):
+    """Immutable, fully decoded instruction word with integer fields."""
+    word: int
+    type: int  # 0: R-type, 1: I-type, 2: J-type
+    op: Op
+    opcode: int
+    rs: int
+    rt: int
+    rd: int
+    shamt: int
+    funct: int
+    imm: int  # zero-extended 16-bit immediate
+    simm: int  # sign-extended 16-bit immediate
+    target: int  # sign-extended 26-bit jump field (the assembler emits PC-relative offsets)
+
+    def __str__(self):
+        type_names = {0: 'R-type', 1: 'I-type', 2: 'J-type'}
+        return f"{type_names[self.type]} {self.op.name} (0x{self.word:08x})"
+
+
+def decode(word):
+    """Decode a 32-bit instruction word into a DecodedInstruction."""
+    opcode = (word >> 26) & 0x3F
+    funct = word & 0x3F
+    if opcode == 0:
+        inst_type = 0  # R-type
+        op = R_FUNCT_OPS.get(funct, Op.UNKNOWN)
+    else:
+        inst_type = 2 if opcode in (2, 3) else 1  # J-type / I-type
+        op = OPCODE_OPS.get(opcode, Op.UNKNOWN)
+    imm = word & 0xFFFF
+    target = word & 0x3FFFFFF
+    return DecodedInstruction(
+        word=word,
+        type=inst_type,
+        op=op,
+        opcode=opcode,
+        rs=(word >> 21) & 0x1F,
+        rt=(word >> 16) & 0x1F,
+        rd=(word >> 11) & 0x1F,
+        shamt=(word >> 6) & 0x1F,
+        funct=funct,
+        imm=imm,
+        simm=imm - 0x10000 if imm & 0x8000 else imm,
+        target=target - 0x4000000 if target & 0x2000000 else target,
+    )
+
+
+class DecodeCache:
+    """
+    Decoded instructions of the text region, keyed by PC.
+
+    Each word is decoded once on first fetch. Stores must be reported through
+    `invalidate` so that self-modifying code is decoded again; addresses
+    outside the text region are decoded on every fetch and never cached.
+    """
+    def __init__(self, memory, text_start=0, text_end=0):
+        self.memory = memory
+        self.text_start = text_start
+        self.text_end = text_end
+        self.entries = {}
+
+    def fetch(self, pc):
+        inst = self.entries.get(pc)
+        if inst is None:
+            inst = decode(self.memory.load_word(pc))
+            if self.text_start <= pc < self.text_end:
+                self.entries[pc] = inst
+        return inst
+
+    def invalidate(self, addr, size=4):
+        """Drop cached words overlapping a store of `size` bytes at `addr`."""
+        if addr + size <= self.text_start or addr >= self.text_end:
+            return
+        first = addr & ~3
+        self.entries.pop(first, None)
+        last = (addr + size - 1) & ~3
+        if last != first:
+            self.entries.pop(last, None)
+
+    def clear(self):
+        self.entries.clear()
+
 # ---------------------------------------------------------
 
 if __name__ == "__main__":
@@ -44,3 +195,4 @@ if __name__ == "__main__":
     print(instruction)  # Print string representation of the instruction
     fields_dict = instruction.get_fields()  # Get the fields as a dictionary
     print("Fields dictionary:", fields_dict)  # Print the fields dictionary
+    print("Decoded:", decode(int(inst, 2)))  # Integer-field record used by the pipeline
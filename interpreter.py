@@ -0,0 +1,133 @@
+from components.registers import Registers
+from components.alu import ALU
+from components.io import MemoryMappedIO
+from instructions import DecodeCache, Op
+from parser import MIPSParser
+
+
+class MIPSInterpreter:
+    """
+    Functional (non-pipelined) simulator.
+
+    Executes one instruction per step with no pipeline latches or hazard
+    logic, for when only the architectural results are needed: final
+    registers, memory and I/O output. Branch, jump and halt semantics match
+    MIPSPipeline, and `register_states`/`io_memory` have the same shape, so
+    results can be compared with (or shown in place of) a pipelined run.
+    With `record_states=False` only the initial and final register states
+    are kept.
+    """
+    def __init__(self, file_path=None, record_states=True, program=None):
+        # Initialize components
+        self.io = MemoryMappedIO()
+        image = MIPSParser().parse_image(file_path, program)
+        self.memory = image.create_memory()
+        self.decode_cache = DecodeCache(self.memory, image.text_start, image.text_end)
+        self.alu = ALU()
+        self.registers = Registers(initialise=True)
+        self.PC = image.entry
+        self.halt = False
+        self.instruction_count = 0  # Retired instructions, including the halting one
+        self.record_states = record_states
+
+        # Register file snapshot after each retired instruction
+        self.register_states = []
+        self.register_states.append(self.registers.snapshot())
+
+    def store(self, op, addr, value):
+        """Perform sb/sh/sw, echoing stores into the I/O range to io_memory."""
+        to_output = self.io.is_io_address(addr)
+        match op:
+            case Op.SB:
+                if (to_output): self.io.io_memory.append(format(value & 0xFF, '08b'))
+                self.memory.store_byte(addr, value)
+                self.decode_cache.invalidate(addr, 1)
+            case Op.SH:
+                if (to_output): self.io.io_memory.append(format(value & 0xFFFF, '016b'))
+                self.memory.store_half(addr, value)
+                self.decode_cache.invalidate(addr, 2)
+            case Op.SW:
+                if (to_output): self.io.io_memory.append(format(value & 0xFFFFFFFF, '032b'))
+                self.memory.store_word(addr, value)
+                self.decode_cache.invalidate(addr, 4)
+
+    def step(self):
+        """Execute the instruction at PC. Returns False once the program has halted."""
+        if self.halt:
+            return False
+        pc = self.PC
+        if pc >= self.memory.size:  # Ran off the end of memory
+            self.halt = True
+            return False
+
+        inst = self.decode_cache.fetch(pc)
+        op = inst.op
+        regs = self.registers.values
+        next_pc = pc + 4
+        self.instruction_count += 1
+
+        if op == Op.SYSCALL or (op == Op.JR and inst.rs == 31 and regs[31] == 0):
+            self.halt = True
+            return False
+        elif op == Op.JR:
+            next_pc = regs[inst.rs]
+        elif op == Op.SLL or op == Op.SRL or op == Op.SRA:
+            self.registers.write(inst.rd, self.alu.alu_shift(inst.funct, regs[inst.rt], inst.shamt))
+        elif op == Op.LB:
+            self.registers.write(inst.rt, self.memory.load_byte(regs[inst.rs] + inst.simm, signed=True))
+        elif op == Op.LH:
+            self.registers.write(inst.rt, self.memory.load_half(regs[inst.rs] + inst.simm, signed=True))
+        elif op == Op.LW:
+            self.registers.write(inst.rt, self.memory.load_word(regs[inst.rs] + inst.simm, signed=True))
+        elif op == Op.LBU:
+            self.registers.write(inst.rt, self.memory.load_byte(regs[inst.rs] + inst.simm))
+        elif op == Op.LHU:
+            self.registers.write(inst.rt, self.memory.load_half(regs[inst.rs] + inst.simm))
+        elif op == Op.SB or op == Op.SH or op == Op.SW:
+            self.store(op, regs[inst.rs] + inst.simm, regs[inst.rt])
+        elif op == Op.BEQ:
+            if regs[inst.rs] == regs[inst.rt]:
+                next_pc += inst.simm << 2
+        elif op == Op.BNE:
+            if regs[inst.rs] != regs[inst.rt]:
+                next_pc += inst.simm << 2
+        elif op == Op.J:
+            next_pc += inst.target << 2
+        elif op == Op.JAL:
+            self.registers.write(31, next_pc)
+            next_pc += inst.target << 2
+        elif op == Op.UNKNOWN:
+            raise ValueError(f"Unsupported instruction 0x{inst.word:08x} at PC {pc}")
+        elif inst.type == 0:  # Arithmetic/logical operations
+            self.registers.write(inst.rd, self.alu.alu_arith(inst.funct, regs[inst.rs], regs[inst.rt]))
+        else:  # Immediate arithmetic/logical operations
+            self.registers.write(inst.rt, self.alu.alu_arith_i(inst.opcode, regs[inst.rs], inst.simm))
+
+        self.PC = next_pc
+        if self.record_states:
+            self.register_states.append(self.registers.snapshot())
+        return True
+
+    def run(self, max_steps=None):
+        """
+        Run until the program halts, or for at most `max_steps` instructions.
+        Returns (register_states, io_memory) like MIPSPipeline.run_pipeline.
+        """
+        step = self.step
+        if max_steps is None:
+            while step():
+                pass
+        else:
+            for _ in range(max_steps):
+                if not step():
+                    break
+        if not self.record_states:
+            self.register_states[1:] = [self.registers.snapshot()]
+        return self.register_states, self.io.io_memory
+
+
+if __name__ == "__main__":
+    interpreter = MIPSInterpreter(file_path="tests/lh_lbu_test.txt")
+    register_states, io_memory = interpreter.run()
+    print(f"Retired {interpreter.instruction_count} instructions")
+    print("Final registers:", register_states[-1])
@@ -1,4 +1,7 @@
 from components.memory import Memory
+from elf_loader import is_elf_file, load_elf_file
+from program_image import ProgramImage, is_image_file
+from utils.conversion import ConversionError, binary_to_words, hex_to_words, is_hex_text, to_bytes
 
 class MIPSParser:
     def __init__(self):
@@ -37,27 +40,75 @@ class MIPSParser:
         else:
             return self.parse_i_type(instruction)
 
-    def parse_mips_file(self, file_path):
+    def parse_lines(self, lines):
+        """Parse 32-bit binary instruction strings (other lines are skipped), e.g. assembler output."""
         addr = 0
         parsed_instructions = []
+        for line in lines:
+            instruction = line.strip()
+            if len(instruction) == 32 and all(bit in '01' for bit in instruction):
+                self.memory.store_word(addr, int(instruction, 2))
+                parsed_instructions.append({
+                    "PC": addr,
+                    "IR": instruction
+                })
+                addr += 4
+        return parsed_instructions
+
+    def parse_words(self, lines):
+        """
+        Instruction words of hex words or 32-bit binary strings, one per
+        line; blank lines and '#' comments are ignored, and invalid lines
+        raise ConversionError with their line numbers. `lines` may also be a
+        file or the whole text.
+        """
+        data = to_bytes(lines)
+        if is_hex_text(data):
+            return hex_to_words(data)
+        return binary_to_words(data)
+
+    def parse_file(self, file_path, parse):
+        """`parse` applied to the lines of a text file, or None (with a message) if it can't be read."""
         try:
             with open(file_path, 'r') as f:
-                for line in f:
-                    instruction = line.strip()
-                    if len(instruction) == 32 and all(bit in '01' for bit in instruction):
-                        # Store the binary string directly as IR
-                        self.memory.store(addr, instruction)
-                        parsed_instructions.append({
-                            "PC": addr,
-                            "IR": instruction
-                        })
-                        addr += 4
+                return parse(f)
         except FileNotFoundError:
             print(f"Error: The file '{file_path}' was not found.")
+        except ConversionError:
+            raise  # the program's invalid lines, for the caller to report
         except Exception as e:
             print(f"An error occurred: {e}")
+        return None
 
-        return parsed_instructions
+    def parse_mips_file(self, file_path):
+        parsed_instructions = self.parse_file(file_path, self.parse_lines)
+        return parsed_instructions if parsed_instructions is not None else []
+
+    def parse_program(self, file_path=None, program=None):
+        """Parse `program` (a list of binary instruction strings) if given, else the file at `file_path`."""
+        if program is not None:
+            return self.parse_lines(program)
+        return self.parse_mips_file(file_path)
+
+    def parse_image(self, file_path=None, program=None, endianness='big'):
+        """
+        ProgramImage to load: `program` itself if it is one, else the text
+        built from `program` (binary or hex instruction strings), else the file
+        at `file_path`. Image files (see ProgramImage.save) and ELF executables
+        (see elf_loader) are memory-mapped rather than parsed; anything else
+        is read as binary or hex instruction text.
+        """
+        if isinstance(program, ProgramImage):
+            return program
+        if program is not None:
+            words = self.parse_words(program)
+        elif is_image_file(file_path):
+            return ProgramImage.load(file_path)
+        elif is_elf_file(file_path):
+            return load_elf_file(file_path)
+        else:
+            words = self.parse_file(file_path, self.parse_words)
+        return ProgramImage.from_words(words if words is not None else [], endianness=endianness)
 
     def test_parser(self, file_path):
         """Test the parser with the given file path."""
@@ -0,0 +1,70 @@
+"""
+Simulated performance counters of a MIPSPipeline.
+
+The stages count events in a PerfCounters as they happen; `report` turns them
+into a dict with CPI and a CPI stack. The stack attributes every cycle of the
+run to a cause: one base cycle per retired instruction, a cycle per load-use
+stall, a cycle per wrong-path instruction squashed behind a mispredicted
+branch or jump, and the remainder to filling and draining the pipeline
+(plus, mid-run, the instructions still in flight).
+"""
+
+CPI_STACK_CAUSES = ('base', 'load_use', 'branch', 'jump', 'fill_drain')
+
+
+class PerfCounters:
+    """Event counts of one pipeline run; cycles, retired and stalls are kept by MIPSPipeline itself."""
+    __slots__ = ('branches', 'branches_taken', 'jumps', 'branch_squashed', 'jump_squashed',
+                 'forward_ex_mem', 'forward_mem_wb', 'memory_reads', 'memory_writes', 'io_stores',
+                 'branch_mispredicts', 'jump_mispredicts')  # new counters go last, for saved checkpoints
+
+    def __init__(self, values=None):
+        for name in self.__slots__:
+            setattr(self, name, 0)
+        for name, value in zip(self.__slots__, values or ()):
+            setattr(self, name, value)
+
+    def values(self):
+        """The counts as a tuple, in __slots__ order; PerfCounters(values) restores them."""
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def report(self, cycles, retired, load_use_stalls, predictor=None):
+        """All counters, CPI, prediction accuracy and the CPI stack (cycles per cause) as a dict."""
+        stack = {
+            'base': retired,
+            'load_use': load_use_stalls,
+            'branch': self.branch_squashed,
+            'jump': self.jump_squashed,
+        }
+        stack['fill_drain'] = cycles - sum(stack.values())
+        return {
+            'cycles': cycles,
+            'retired': retired,
+            'cpi': cycles / retired if retired else None,
+            'load_use_stalls': load_use_stalls,
+            'branches': self.branches,
+            'branches_taken': self.branches_taken,
+            'jumps': self.jumps,
+            'predictor': predictor,
+            'branch_mispredicts': self.branch_mispredicts,
+            'jump_mispredicts': self.jump_mispredicts,
+            'branch_accuracy': 1 - self.branch_mispredicts / self.branches if self.branches else None,
+            'jump_accuracy': 1 - self.jump_mispredicts / self.jumps if self.jumps else None,
+            'flushes': self.branch_mispredicts + self.jump_mispredicts,
+            'forward_ex_mem': self.forward_ex_mem,
+            'forward_mem_wb': self.forward_mem_wb,
+            'memory_reads': self.memory_reads,
+            'memory_writes': self.memory_writes,  # I/O port stores included
+            'io_stores': self.io_stores,
+            'cpi_stack': stack,
+        }
+
+    def __repr__(self):
+        return "PerfCounters(" + ", ".join(f"{name}={getattr(self, name)}" for name in self.__slots__) + ")"
+
+
+def cpi_stack_rows(report):
+    """(cause, cycles, CPI contribution, share of cycles) for each CPI stack entry of a report."""
+    cycles, retired = report['cycles'], report['retired']
+    return [(cause, report['cpi_stack'][cause], report['cpi_stack'][cause] / retired if retired else None,
+             report['cpi_stack'][cause] / cycles if cycles else None) for cause in CPI_STACK_CAUSES]
@@ -1,457 +1,492 @@
-import multiprocessing
-from components.registers import Registers
-from components.alu import ALU, signedVal, signedBin
-from components.memory import Memory
+from components.registers import Registers, REGISTER_NAMES
+from components.alu import ALU
 from components.io import MemoryMappedIO
-from instructions import Instruction
+from components.latches import PipelineLatches, FetchLatch, DecodeLatch, ExecuteLatch, MemoryLatch
+from instructions import DecodeCache, Op, LOAD_OPS, STORE_OPS, SHIFT_OPS
 from parser import MIPSParser
 from hazard import HazardManager
-import pandas as pd
+from register_history import RegisterHistory
+from cycle_trace import CycleTrace, FETCH, DECODE, EXECUTE, MEMORY, WRITEBACK, STALL, FLUSH, HALT
+from tracing import Tracer, INFO, DEBUG, CYCLE, REGISTERS
+from checkpoint import Checkpoint
+from perf_counters import PerfCounters
+from branch_predictor import make_predictor
+from bisect import bisect_right
+from typing import NamedTuple
+
+
+# Checked on every fetch; module globals are much faster to look up than Op members
+FIRST_BRANCH_OP, JR_OP = Op.BEQ, Op.JR
+
+
+class CycleState(NamedTuple):
+    """Summary of the machine after one cycle, as yielded by MIPSPipeline.step/iter_cycles."""
+    cycle: int  # cycles run so far
+    pc: int  # next fetch address
+    retired: int  # instructions written back so far
+    halted: bool  # halt seen; the pipeline may still be draining
+
 
 class MIPSPipeline:
-    def __init__(self, file_path):
+    def __init__(self, file_path=None, tracer=None, checkpoint_interval=None, program=None, predictor=None):
         # Initialize components
         self.io = MemoryMappedIO()
-        self.memory = Memory(initialise=True)
         self.stall = False
-        self.curr_state=['---']*5
-        mips_parser = MIPSParser()
-        instructions_parsed = mips_parser.parse_mips_file(file_path)
-        for insts in instructions_parsed:
-            for i in range(4):
-                self.memory.store(insts["PC"] + i, insts["IR"][i*8:(i+1)*8])
+        self.stall_cycles = 0  # Cycles spent in load-use stalls
+        self.counters = PerfCounters()  # Branch, forwarding and memory events, see perf_counters
+        # Memory sized for the program, with each of its segments copied in at once
+        image = MIPSParser().parse_image(file_path, program)
+        self.memory = image.create_memory()
+        # Decoded instructions of the loaded program, keyed by PC
+        self.decode_cache = DecodeCache(self.memory, image.text_start, image.text_end)
         self.alu = ALU()
         self.registers = Registers(initialise=True)
-        self.PC = multiprocessing.Value('i', 0)  # Shared program counter
-        self.pc_lock = multiprocessing.Lock()  # Lock for updating PC
-        self.halt = multiprocessing.Value('i', 0)
-        # Use Manager to create shared dictionary for pipeline registers
-        manager = multiprocessing.Manager()
-        self.pipeline_registers = manager.dict({
-            'IF_ID': None,
-            'ID_EX': None,
-            'EX_MEM': None,
-            'MEM_WB': None,
-        })
-        
-        # Register and memory locks
-        self.register_lock = multiprocessing.Lock()
+        self.PC = image.entry  # Program counter
+        self.halt = False
+        self.flush = False  # Set by the execute stage on a mispredicted branch/jump or halt
+        # Chooses the fetch address after each branch/jump: a PREDICTORS name or a BranchPredictor
+        self.predictor = make_predictor(predictor)
+        # Pipeline registers: stages read `latches.current` and write `latches.next`
+        self.latches = PipelineLatches()
+
         self.hazard_manager = HazardManager(self.registers)
+        # Per-cycle record of the instruction in each stage
+        self.trace = CycleTrace()
+        # Text trace output, off unless a configured Tracer is passed in
+        self.tracer = tracer if tracer is not None else Tracer()
 
-        # Synchronization events for pipeline control
+        # Register file state after each retired instruction, delta-encoded
+        self.register_states = RegisterHistory(self.registers.snapshot())
+        self.stop_reason = None  # why the last iter_cycles/run_pipeline stopped
 
-        # Use a Manager to create a shared list for register states
-        self.register_states = manager.list()
-        self.register_states.append(self.registers.reg.copy())
+        # With a checkpoint interval, a checkpoint is kept every that many
+        # cycles so that `seek` can jump to any cycle without starting over
+        self.checkpoint_interval = checkpoint_interval
+        self.checkpoints = [self.checkpoint()] if checkpoint_interval else []
 
     def fetch_stage(self):
         """Fetches instructions from memory."""
-        if self.halt.value == 1:
+        if self.halt:
             return
-        with self.pc_lock:
-            # Check if PC is within range
-            if self.PC.value < len(self.memory.data):
-                instruction_data = ""
-                for i in range(4):
-                    instruction_data += self.memory.load(self.PC.value + i)
-                IR = instruction_data
-                self.pipeline_registers['IF_ID'] = {'PC': self.PC.value , 'IR': IR}
-                print(f"Fetch Stage: Instruction at PC {self.PC.value} fetched")
-                self.PC.value += 4
-            else:
-                self.pipeline_registers['IF_ID'] = None
-                return  # Exit when end of instructions is reached
-       
-            
-    
-    def decode_stage(self, fetched_data):
+        # Check if PC is within range
+        if self.PC < self.memory.size:
+            inst = self.decode_cache.fetch(self.PC)
+            next_pc = self.PC + 4
+            if inst.op >= FIRST_BRANCH_OP or inst.op is JR_OP:  # a branch or jump: ask the predictor
+                next_pc = self.predictor.predict(self.PC, inst)
+            self.latches.next.IF_ID = FetchLatch(self.PC, inst, next_pc)
+            self.trace.record(FETCH, self.PC, inst.op)
+            if self.tracer.levels[FETCH] >= INFO:
+                self.tracer.emit(FETCH, "Fetch Stage: Instruction at PC %d fetched", self.PC)
+            self.PC = next_pc
+        else:
+            self.latches.next.IF_ID = None
+            return  # Exit when end of instructions is reached
+
+    def decode_stage(self, fetched_data, decoded_data):
         """Decodes instructions and passes them to the execute stage."""
         if fetched_data is not None:
-            # Check for end signal
-            if fetched_data is None:  # If None is received, break the loop
-                self.pipeline_registers['ID_EX'] = None
-                return
-
-            IR = fetched_data['IR']
-            opcode = int(IR[:6], 2)
+            # The word was decoded once by the decode cache when it was fetched
+            inst = fetched_data.instruction
 
-            # Create the instruction object based on opcode
-            if opcode == 0:
-                inst_type = 0  # R-type
-            elif opcode in [2, 3]:
-                inst_type = 2  # J-type
-            else:
-                inst_type = 1  # I-type
-            
-            inst = Instruction(type=inst_type, instruction=IR)
-            fields = inst.get_fields()
-
-            if self.pipeline_registers['ID_EX']:
-                inst_prev = self.pipeline_registers['ID_EX']['Instruction'].get_fields()
-                
-                if self.hazard_manager.check_data_hazard_stall(fields, inst_prev):
+            if decoded_data is not None:
+                if self.hazard_manager.check_data_hazard_stall(inst, decoded_data.instruction):
                     self.stall = True
-            
-            try:
-                rs_value = self.registers.read(int(fields['rs'], 2))
-            except:
-                rs_value = 0
-        
-            # Prepare the data to send to the ID_EX stage
-            id_ex_data = {
-                'instruction': inst,
-                'PC': fetched_data['PC'],
-                'RS': rs_value,
-            }
-
-            # Handle I-type immediate value and sign extension
-            if inst.type == 1:  # I-type instruction
-                immediate = int(IR[16:], 2)  # Immediate is bits 16-31
-                if (immediate & 0x8000):  # Sign extend if negative
-                    immediate |= 0xFFFF0000
-                id_ex_data['Immediate'] = immediate
-            
-            # Handle J-type instruction
-            if inst.type == 2:  # J-type instruction
-                id_ex_data['Address'] = int(IR[6:], 2)  # Convert address to decimal
-
-            # Create a dictionary with the mapped values
-            decoded_values = {
-                'Instruction': id_ex_data['instruction'],
-                'PC': id_ex_data['PC'],
-                'RS': id_ex_data['RS'],
-            }
-
-            if not inst.type == 2:  # RT for R and I types
-                id_ex_data['RT'] = int(fields['rt'], 2)
-                decoded_values['RT'] = id_ex_data['RT']
-            
-            # Add Immediate or Address if they exist
-            if 'Immediate' in id_ex_data:
-                decoded_values['Immediate'] = id_ex_data['Immediate']
-            if 'Address' in id_ex_data:
-                decoded_values['Address'] = id_ex_data['Address']
+
+            rs_value = self.registers.read(inst.rs) if inst.type != 2 else 0
 
             # Send the decoded values to the ID_EX register
-            self.pipeline_registers['ID_EX'] = decoded_values
-            print(f"Decode Stage: Instruction decoded with PC {fetched_data['PC']}")
-            self.curr_state[1]=f"Instruction decoded with PC {fetched_data['PC']}"
-            #self.pipeline_registers['IF_ID'] = None
+            self.latches.next.ID_EX = DecodeLatch(inst, fetched_data.pc, rs_value, fetched_data.predicted)
+            if self.tracer.levels[DECODE] >= INFO:
+                self.tracer.emit(DECODE, "Decode Stage: Instruction decoded with PC %d", fetched_data.pc)
+            self.trace.record(DECODE, fetched_data.pc, inst.op)
         else:
-            self.pipeline_registers['ID_EX'] = None
-            self.curr_state[1]='---'
-    
-    def execute_stage(self, decoded_data):
+            self.latches.next.ID_EX = None
+
+    def execute_stage(self, decoded_data, ex_mem_data, mem_wb_data):
         """Executes instructions and updates the EX/MEM pipeline register."""
         if decoded_data is not None:
-            
-
-            # Check for end signal
-            if decoded_data is None:  # If None is received, break the loop
-                self.pipeline_registers['EX_MEM'] = None
-                return
-
-            # Retrieve the instruction and type
-            inst = decoded_data['Instruction']
-            type = inst.type  # Save the type of instruction
-            inst = inst.get_fields()  # Get the instruction fields as a dictionary
+            inst = decoded_data.instruction
+            op = inst.op
 
-            result = {'instruction': decoded_data['Instruction']}
+            result = ExecuteLatch(inst, decoded_data.pc)
 
-            # Check for forwarding needs
-            ex_mem_data = self.pipeline_registers['EX_MEM']
-            mem_wb_data = self.pipeline_registers['MEM_WB']
-
-            
-            # Simulated ALU operations based on instruction type
-            if type == 0:  # R-type
-                rs = int(inst['rs'], 2)
-                rt = int(inst['rt'], 2)
-                forward_a, forward_b = self.hazard_manager.check_data_hazard(rs, rt, ex_mem_data, mem_wb_data)
-                # Get forwarded values if needed
-                src1 = self.hazard_manager.get_forwarded_value(rs, forward_a, ex_mem_data, mem_wb_data)
-                src2 = self.hazard_manager.get_forwarded_value(rt, forward_b, ex_mem_data, mem_wb_data)
-                if inst['funct'] == '001100':
-                    print(f"Execute Stage: Halt condition met for instruction at PC {decoded_data['PC']}")
-                    self.curr_state[2]=f"Halt condition met for instruction at PC {decoded_data['PC']}"
-                    # Set the halt flag and clear the pipeline
-                    self.halt.value = 1
-                    self.pipeline_registers["IF_ID"] = None
-                    self.pipeline_registers["ID_EX"] = None
-                    self.pipeline_registers['EX_MEM'] = None
-                    return
-                elif inst['funct'] == '001000':  # jr
-                    if rs == 31 and src1 == 0:
-                        print(f"Execute Stage: Halt condition met for instruction at PC {decoded_data['PC']}")
-                        self.curr_state[2]=f"Halt condition met for instruction at PC {decoded_data['PC']}"
-                        # Set the halt flag and clear the pipeline
-                        self.halt.value = 1
-                        self.pipeline_registers["IF_ID"] = None
-                        self.pipeline_registers["ID_EX"] = None
-                        self.pipeline_registers['EX_MEM'] = None
-                        return
-                    with self.pc_lock:
-                        self.PC.value = src1
-                    self.pipeline_registers["IF_ID"] = None
-                    self.pipeline_registers["ID_EX"] = None
-                    result['ALU_result'] = None
-                    result['RD'] = None
-                elif inst['funct'][:3] == "000":  # Shift operations
-                    result['ALU_result'] = self.alu.alu_shift(inst['funct'], src2, int(inst['shamt'], 2))
-                    result['RD'] = int(inst['rd'], 2)
-                else:  # Arithmetic/logical operations
-                    result['ALU_result'] = self.alu.alu_arith(inst['funct'], src1, src2)
-                    result['RD'] = int(inst['rd'], 2)
-            
-            elif type == 1:  # I-type
-                rs = int(inst['rs'], 2)
-                rt = int(inst['rt'], 2)
+            if inst.type != 2:  # R-type and I-type read rs and rt
+                rs = inst.rs
+                rt = inst.rt
                 forward_a, forward_b = self.hazard_manager.check_data_hazard(rs, rt, ex_mem_data, mem_wb_data)
+                if forward_a or forward_b:
+                    self.count_forwarding(inst, forward_a, forward_b)
                 # Get forwarded values if needed
                 src1 = self.hazard_manager.get_forwarded_value(rs, forward_a, ex_mem_data, mem_wb_data)
                 src2 = self.hazard_manager.get_forwarded_value(rt, forward_b, ex_mem_data, mem_wb_data)
-                imm = decoded_data.get('Immediate', 0)
-
-                if inst['op'][:3] == "100":  # Load
-                    result['ALU_result'] = self.alu.giveAddr(src1, imm)
-                    result['RD'] = int(inst['rt'], 2)
-                elif inst['op'][:3] == "101":  # Store
-                    result['ALU_result'] = self.alu.giveAddr(src1, imm)
-                    result['RT'] = src2  # Default to 0 if not present
-                elif inst['op'][:3] == "000": # beq, bne (Conditional Branch instructions)
-                    if (imm & 0x8000): #sign extend
-                        imm= imm | 0xFFFF0000
-                    a_equal= self.alu.isEqual(src1, src2)
-                    b_condition= int(inst["op"][3:],2)==4
-                    if (not (a_equal^b_condition)):
-                        self.pipeline_registers["IF_ID"] = None
-                        self.pipeline_registers["ID_EX"] = None
-                        with self.pc_lock:
-                            self.PC.value = self.PC.value + (imm<<2) - 4
-                    result['ALU_result'] = None
-                    result['RD'] = None
-                else:  # Arithmetic/logical operations
-                    result['ALU_result'] = self.alu.alu_arith_i(inst['op'][3:6], src1, imm)
-                    result['RD'] = int(inst['rt'], 2)
-
-            elif type == 2:  # J-type
-                addr = int(inst['address'], 2)
-                if inst['op'][3:] == '010':
-                    with self.pc_lock:
-                        self.PC.value = self.PC.value + (addr<<2) - 4
-                    self.pipeline_registers["IF_ID"] = None
-                    self.pipeline_registers["ID_EX"] = None
-                    result['ALU_result'] = None
-                    result['RD'] = None
-                elif inst['op'][3:] == '011':  # jal (jump and link)
-                    result['ALU_result'] = self.PC.value - 4
-                    result['RD'] = 31
-                    with self.pc_lock:
-                        self.PC.value = self.PC.value + (addr<<2) - 4
-                    self.pipeline_registers["IF_ID"] = None
-                    self.pipeline_registers["ID_EX"] = None
-                    
-            
+
+            if op == Op.SYSCALL or (op == Op.JR and rs == 31 and src1 == 0):
+                if self.tracer.levels[EXECUTE] >= INFO:
+                    self.tracer.emit(EXECUTE, "Execute Stage: Halt condition met for instruction at PC %d", decoded_data.pc)
+                self.trace.record(EXECUTE, decoded_data.pc, op, HALT)
+                # Set the halt flag and clear the pipeline
+                self.halt = True
+                self.flush = True
+                self.latches.next.EX_MEM = None
+                return
+            elif op == Op.JR:
+                self.counters.jumps += 1
+                self.resolve(decoded_data, True, src1)
+            elif op in SHIFT_OPS:  # Shift operations
+                result.alu_result = self.alu.alu_shift(inst.funct, src2, inst.shamt)
+                result.rd = inst.rd
+            elif op in LOAD_OPS:
+                result.alu_result = self.alu.giveAddr(src1, inst.simm)
+                result.rd = rt
+            elif op in STORE_OPS:
+                result.alu_result = self.alu.giveAddr(src1, inst.simm)
+                result.rt = src2
+            elif op == Op.BEQ or op == Op.BNE:  # Conditional branch instructions
+                taken = self.alu.isEqual(src1, src2) == (op == Op.BEQ)
+                self.counters.branches += 1
+                self.counters.branches_taken += taken
+                self.resolve(decoded_data, taken, decoded_data.pc + 4 + (inst.simm<<2))
+            elif op == Op.J:
+                self.counters.jumps += 1
+                self.resolve(decoded_data, True, decoded_data.pc + 4 + (inst.target<<2))
+            elif op == Op.JAL:  # jal (jump and link)
+                result.alu_result = decoded_data.pc + 4
+                result.rd = 31
+                self.counters.jumps += 1
+                self.resolve(decoded_data, True, decoded_data.pc + 4 + (inst.target<<2))
+            elif op == Op.UNKNOWN:
+                raise ValueError(f"Unsupported instruction 0x{inst.word:08x} at PC {decoded_data.pc}")
+            elif inst.type == 0:  # Arithmetic/logical operations
+                result.alu_result = self.alu.alu_arith(inst.funct, src1, src2)
+                result.rd = inst.rd
+            else:  # Immediate arithmetic/logical operations
+                result.alu_result = self.alu.alu_arith_i(inst.opcode, src1, inst.simm)
+                result.rd = rt
+
             # Put the result in the EX_MEM register
-            self.pipeline_registers['EX_MEM'] = result
-            print(f"Execute Stage: Executed instruction with result {result}")
-            self.curr_state[2]=f"Executed instruction with result: {result}"
-            #self.pipeline_registers['ID_EX'] = None
+            self.latches.next.EX_MEM = result
+            if self.tracer.levels[EXECUTE] >= INFO:
+                self.tracer.emit(EXECUTE, "Execute Stage: Executed instruction with result %r", result)
+            self.trace.record(EXECUTE, decoded_data.pc, op)
         else:
-            self.pipeline_registers['EX_MEM'] = None
-            self.curr_state[2]=f"---"
+            self.latches.next.EX_MEM = None
 
     def memory_access_stage(self, execute_data):
         """Handles memory operations and passes results to write-back stage."""
         if execute_data is not None:
-            
-            if execute_data is None:  # End signal
-                self.pipeline_registers['MEM_WB'] = None
-                return
-            
-            inst = execute_data['instruction']
-            type = inst.type  # Save the type of instruction
-            inst = inst.get_fields()
-
-            memory_data = {'instruction': execute_data['instruction']}
-
-            if type == 1 and inst['op'][:3] == "100":  # Load instruction
-                address = execute_data['ALU_result']
-                
-                # op[3:6] = 000 | 001 | 011 | 100 | 101
-                # load    = lb  | lh  | lw  | lbu | lhu
-
-                match inst['op'][3:6]:
-                    case "000": #lb
-                        loaded_binary = self.memory.load(address)
-                        memory_data['Mem_data'] = signedVal(loaded_binary)
-                    case "001": #lh
-                        loaded_binary = "".join([self.memory.load(address+i) for i in range(2)])
-                        memory_data['Mem_data'] = signedVal(loaded_binary)
-                    case "011": #lw
-                        loaded_binary = "".join([self.memory.load(address+i) for i in range(4)])
-                        memory_data['Mem_data'] = signedVal(loaded_binary)
-                    case "100": # lbu
-                        loaded_binary = self.memory.load(address)
-                        memory_data['Mem_data'] = int(loaded_binary, 2)
-                    case "101": #lhu
-                        loaded_binary = "".join([self.memory.load(address+i) for i in range(2)])
-                        memory_data['Mem_data'] = int(loaded_binary, 2)
-
-                memory_data['RD'] = execute_data['RD']
-
-            elif type == 1 and inst['op'][:3] == "101":  # Store instruction
-                mem_addr = execute_data['ALU_result']
-                store_data32 = signedBin(execute_data['RT'])
-                
+            inst = execute_data.instruction
+            op = inst.op
+
+            memory_data = MemoryLatch(inst, execute_data.pc)
+
+            if op in LOAD_OPS:  # Load instruction
+                address = execute_data.alu_result
+                self.counters.memory_reads += 1
+
+                match op:
+                    case Op.LB:
+                        memory_data.mem_data = self.memory.load_byte(address, signed=True)
+                    case Op.LH:
+                        memory_data.mem_data = self.memory.load_half(address, signed=True)
+                    case Op.LW:
+                        memory_data.mem_data = self.memory.load_word(address, signed=True)
+                    case Op.LBU:
+                        memory_data.mem_data = self.memory.load_byte(address)
+                    case Op.LHU:
+                        memory_data.mem_data = self.memory.load_half(address)
+
+                memory_data.rd = execute_data.rd
+
+            elif op in STORE_OPS:  # Store instruction
+                mem_addr = execute_data.alu_result
+                store_data = execute_data.rt
+
                 to_output = False
                 if (self.io.is_io_address(mem_addr)):
                     to_output = True
+                    self.counters.io_stores += 1
+                self.counters.memory_writes += 1
+
+                match op:
+                    case Op.SB:
+                        if (to_output): self.io.io_memory.append(format(store_data & 0xFF, '08b'))
+                        self.memory.store_byte(mem_addr, store_data)
+                        self.decode_cache.invalidate(mem_addr, 1)
+                    case Op.SH:
+                        if (to_output): self.io.io_memory.append(format(store_data & 0xFFFF, '016b'))
+                        self.memory.store_half(mem_addr, store_data)
+                        self.decode_cache.invalidate(mem_addr, 2)
+                    case Op.SW:
+                        if (to_output): self.io.io_memory.append(format(store_data & 0xFFFFFFFF, '032b'))
+                        self.memory.store_word(mem_addr, store_data)
+                        self.decode_cache.invalidate(mem_addr, 4)
 
-                # op[3:6] = 000 | 001 | 011
-                # store   = sb  | sh  | sw
-
-                match inst['op'][3:6]:
-                    case "000": #sb
-                        if (to_output): self.io.io_memory.append(store_data32[24:])
-                        self.memory.store(mem_addr, store_data32[24:])
-                    case "001": #sh
-                        if (to_output): self.io.io_memory.append(store_data32[16:])
-                        self.memory.store(mem_addr, store_data32[16:24])
-                        self.memory.store(mem_addr + 1, store_data32[24:])
-                    case "011": #sw
-                        if (to_output): self.io.io_memory.append(store_data32)
-                        for i in range(4):
-                            self.memory.store(mem_addr + i, store_data32[8*i:8*(i+1)])  
-                
-                memory_data['RD'] = None
-            
             else:  # No memory access, pass ALU result
-                memory_data['ALU_result'] = execute_data['ALU_result']
-                memory_data['RD'] = execute_data['RD']
+                memory_data.alu_result = execute_data.alu_result
+                memory_data.rd = execute_data.rd
 
-            self.pipeline_registers['MEM_WB'] = memory_data
-            print(f"Memory Access Stage: Instruction memory access with data {memory_data}")
-            self.curr_state[3]=f"Instruction memory access with data {memory_data}"
-            #self.pipeline_registers['EX_MEM'] = None
+            self.latches.next.MEM_WB = memory_data
+            if self.tracer.levels[MEMORY] >= INFO:
+                self.tracer.emit(MEMORY, "Memory Access Stage: Instruction memory access with data %r", memory_data)
+            self.trace.record(MEMORY, execute_data.pc, op)
         else:
-            self.pipeline_registers['MEM_WB'] = None
-            self.curr_state[3]="---"
+            self.latches.next.MEM_WB = None
 
     def write_back_stage(self, memory_data):
         """Writes data back to registers if necessary."""
         if memory_data is not None:
-
-            inst = memory_data['instruction']
-            type = inst.type  # Save the type of instruction
-            inst = inst.get_fields()
-            reg_dst = memory_data['RD']
+            reg_dst = memory_data.rd
             if reg_dst: # if reg_dst is none, branch instruction, no write_back required
                 # Perform the write-back operation
-                if type == 1 and inst['op'][:3] == "100":  # Load instruction
-                    match inst['op'][3:6]:
-                        # self.registers.write() method takes register number and 32 bit binary
-                        case "000": #lb (signed)
-                            self.registers.write(reg_dst, signedBin(memory_data['Mem_data'])) 
-                        case "001": #lh (signed)
-                            self.registers.write(reg_dst, signedBin(memory_data['Mem_data']))
-                        case "011": #lw (full word)
-                            self.registers.write(reg_dst, signedBin(memory_data['Mem_data']))
-                        case "100": # lbu (unsigned)
-                            self.registers.write(reg_dst, format(memory_data['Mem_data'], '032b'))
-                        case "101": #lhu (unsigned)
-                            self.registers.write(reg_dst, format(memory_data['Mem_data'], '032b'))
-
-                elif (type in [0, 1]) :  # R-type or I-type ALU instruction
-                    self.registers.write(reg_dst, signedBin(memory_data['ALU_result']))
-                
-                elif type == 2 and inst['op'][3:] == '011':
-                    self.registers.write(reg_dst, signedBin(memory_data['ALU_result']))
-
-            # Store the register state
-            self.register_states.append(self.registers.reg.copy())
-            print(f"Write-Back Stage: Write back completed for instruction {memory_data}")
-            self.curr_state[4]=f"Write back completed for instruction {memory_data}"
-            #self.pipeline_registers['MEM_WB'] = None
+                if memory_data.instruction.op in LOAD_OPS:
+                    # lb/lh/lw are already sign-extended and lbu/lhu zero-extended by the memory stage
+                    self.registers.write(reg_dst, memory_data.mem_data)
+                else:  # ALU result, or the return address for jal
+                    self.registers.write(reg_dst, memory_data.alu_result)
+                self.register_states.retire(reg_dst, self.registers.values[reg_dst])
+            else:
+                self.register_states.retire()
+            if self.tracer.levels[WRITEBACK] >= INFO:
+                self.tracer.emit(WRITEBACK, "Write-Back Stage: Write back completed for instruction %r", memory_data)
+            self.trace.record(WRITEBACK, memory_data.pc, memory_data.instruction.op)
+
+    def resolve(self, decoded_data, taken, target):
+        """
+        Check the fetch-time prediction for a branch or jump against its
+        outcome, train the predictor, and on a misprediction redirect fetch
+        and have the wrong-path instruction in decode squashed. With a
+        predictor that `flushes_taken` (not-taken), a taken branch or jump to
+        pc+4 is still redirected, as it was before predictors existed.
+        """
+        pc = decoded_data.pc
+        inst = decoded_data.instruction
+        self.predictor.update(pc, inst, taken, target)
+        fall_through = pc + 4
+        predicted = decoded_data.predicted if decoded_data.predicted is not None else fall_through
+        if taken:
+            mispredicted = predicted != target or (predicted == fall_through and self.predictor.flushes_taken)
+        else:
+            mispredicted = predicted != fall_through
+        if mispredicted:
+            self.PC = target if taken else fall_through
+            self.flush = True
+            if inst.op == Op.BEQ or inst.op == Op.BNE:
+                self.counters.branch_mispredicts += 1
+            else:
+                self.counters.jump_mispredicts += 1
+
+    def count_forwarding(self, inst, forward_a, forward_b):
+        """Count the operands forwarded to `inst` from EX/MEM (1) and MEM/WB (2)."""
+        counters = self.counters
+        if forward_a == 1:
+            counters.forward_ex_mem += 1
+        elif forward_a == 2:
+            counters.forward_mem_wb += 1
+        # rt is the destination, not a source, of immediate-type ALU ops and loads
+        if forward_b and (inst.type == 0 or inst.op in STORE_OPS or inst.op == Op.BEQ or inst.op == Op.BNE):
+            if forward_b == 1:
+                counters.forward_ex_mem += 1
+            else:
+                counters.forward_mem_wb += 1
+
+    def empty_pipeline(self):
+        return self.halt and self.latches.current.is_empty()
+
+    def run_cycle(self):
+        """
+        Advances the pipeline by one clock cycle.
+
+        Every stage reads the latch values captured at the end of the previous
+        cycle from `latches.current` and writes its output to `latches.next`;
+        the banks are swapped once all stages have run. Stages are evaluated in
+        reverse order (write-back first, fetch last) so that register writes
+        and PC redirects are visible to the stages that follow.
+        """
+        current = self.latches.current
+        fetched_data = current.IF_ID
+        decoded_data = current.ID_EX
+        execute_data = current.EX_MEM
+        memory_data = current.MEM_WB
+        stall = self.stall
+        self.trace.new_cycle()
+
+        self.write_back_stage(memory_data)
+        self.memory_access_stage(execute_data)
+        if stall:
+            # Load-use stall: hold IF/ID and ID/EX, insert a bubble into EX/MEM
+            self.latches.next.IF_ID = fetched_data
+            self.latches.next.ID_EX = decoded_data
+            self.trace.record(DECODE, fetched_data.pc, fetched_data.instruction.op, STALL)
+            self.trace.record(EXECUTE, decoded_data.pc, decoded_data.instruction.op, STALL)
+            if not self.halt and self.PC < self.memory.size:
+                self.trace.record(FETCH, self.PC, self.decode_cache.fetch(self.PC).op, STALL)
+            self.stall = False
+            self.stall_cycles += 1
         else:
-            self.curr_state[4]=f"---"
-
-    def empty_pipeline(self, halt, pipregs):
-        if halt.value==0:
-            return False
-        for val in pipregs.values():
-            if val is not None:
-                return False
-        return True
-
-    def run_pipeline(self):
-        """Starts and manages pipeline stages as parallel processes."""
-        cycle = 1
-        columns = ["fetch", "decode", "execute", "memory_access", "writeBack"]
-        cycle_states=pd.DataFrame(columns=columns)
-        cycle_states.loc['Initial State']=self.curr_state
-        while not self.empty_pipeline(self.halt, self.pipeline_registers):
-            print("Cycle ", cycle)
-            # Get the data from pipeline registers
-            
-            fetched_data = self.pipeline_registers["IF_ID"]
-            decoded_data = self.pipeline_registers["ID_EX"] 
-            execute_data = self.pipeline_registers["EX_MEM"]
-            memory_data = self.pipeline_registers["MEM_WB"]
-            stall = self.stall
-            
-            self.curr_state[0]=f"Instruction at PC {self.PC.value} fetched"
-            
-            # Initialize processes for each stage
-            if not stall:
-                fetch_process = multiprocessing.Process(target=self.fetch_stage)
-                decode_process = multiprocessing.Process(target=self.decode_stage(fetched_data))
-                execute_process = multiprocessing.Process(target=self.execute_stage(decoded_data))
-            mem_access_process = multiprocessing.Process(target=self.memory_access_stage(execute_data))
-            write_back_process = multiprocessing.Process(target=self.write_back_stage(memory_data))
-            # Start all processes
-            if not stall:
-                fetch_process.start()
-                decode_process.start()
-                execute_process.start()
-            mem_access_process.start()
-            write_back_process.start()
-
-            # Join all processes
-            if not stall:
-                fetch_process.join()
-                decode_process.join()
-                execute_process.join()
-            mem_access_process.join()
-            write_back_process.join()
-            if (self.halt.value==1):
-                self.curr_state[0]='---'
-            cycle_states.loc[f"Cycle {cycle}"]= self.curr_state
-            
-            if stall == True:
-                self.stall = False
-                self.pipeline_registers["EX_MEM"] = None
-            cycle += 1
-
-        # Display the final state of registers
-        print("Final Register States:")
-        # Display the tracked register states after each instruction
-        print("-----------------------------")
-        print("Tracked Register States After Each Instruction:")
-        allRegNames = ["$0", "$at", "$v0", "$v1", "$a0", "$a1", "$a2", "$a3", "$t0", "$t1", "$t2", "$t3", "$t4", "$t5", "$t6", "$t7", "$s0", "$s1", "$s2", "$s3", "$s4", "$s5", "$s6", "$s7", "$t8", "$t9", "$k0", "$k1", "$gp", "$sp", "$fp", "$ra"]
-        for i, state in enumerate(self.register_states):
-            allRegValues = [signedVal(val) for val in state]
-            if i==0:
-                print("Initial Values:")
-            else: 
-                print(f"Instruction {i}:")
+            self.execute_stage(decoded_data, execute_data, memory_data)
+            self.decode_stage(fetched_data, decoded_data)
+            if self.flush:
+                # Squash the wrong-path instruction decoded behind a mispredicted branch/jump
+                if self.latches.next.ID_EX is not None:
+                    self.trace.mark(DECODE, FLUSH)
+                    if not self.halt:  # the cycle lost to the squashed instruction
+                        if decoded_data.instruction.op in (Op.BEQ, Op.BNE):
+                            self.counters.branch_squashed += 1
+                        else:
+                            self.counters.jump_squashed += 1
+                self.latches.next.ID_EX = None
+                self.flush = False
+            self.fetch_stage()
+
+        self.latches.swap()
+
+        if self.checkpoint_interval:
+            cycle = len(self.trace) - 1
+            if cycle % self.checkpoint_interval == 0 and cycle > self.checkpoints[-1].cycle:
+                self.checkpoints.append(self.checkpoint())
+
+    @property
+    def cycle(self):
+        """Number of cycles run so far."""
+        return len(self.trace) - 1
+
+    @property
+    def retired(self):
+        """Instructions retired so far, counting the one that halted the machine."""
+        return len(self.register_states) - 1 + int(self.halt)
+
+    def perf_counters(self):
+        """Counters and CPI stack of the run so far as a dict, see PerfCounters.report."""
+        return self.counters.report(self.cycle, self.retired, self.stall_cycles, self.predictor.name)
+
+    def checkpoint(self):
+        """Snapshot of the complete machine state, see Checkpoint."""
+        current = self.latches.current
+        return Checkpoint(
+            cycle=self.cycle,
+            pc=self.PC,
+            halt=self.halt,
+            stall=self.stall,
+            stall_cycles=self.stall_cycles,
+            latches=(current.IF_ID, current.ID_EX, current.EX_MEM, current.MEM_WB),
+            registers=tuple(self.registers.values),
+            memory=self.memory.snapshot(),
+            io=(self.io.io_memory, len(self.io.io_memory)),
+            trace=(self.trace, len(self.trace)),
+            history=(self.register_states, len(self.register_states)),
+            counters=self.counters.values(),
+            predictor=self.predictor.snapshot(),
+        )
+
+    def restore(self, checkpoint):
+        """Return the machine to a checkpoint; the trace and register history are rewound with it."""
+        self.PC = checkpoint.pc
+        self.halt = checkpoint.halt
+        self.flush = False
+        self.stall = checkpoint.stall
+        self.stall_cycles = checkpoint.stall_cycles
+        self.counters = PerfCounters(checkpoint.counters)
+        if checkpoint.predictor is not None:
+            self.predictor.restore(checkpoint.predictor)
+        self.latches = PipelineLatches()
+        current = self.latches.current
+        current.IF_ID, current.ID_EX, current.EX_MEM, current.MEM_WB = checkpoint.latches
+        self.registers.values[:] = checkpoint.registers
+        self.memory.restore(checkpoint.memory)
+        self.decode_cache.clear()  # the text may differ after self-modifying stores
+        # Fresh copies: the recorded objects stay as they were for other checkpoints
+        self.io.io_memory = checkpoint.io_memory()
+        self.trace = checkpoint.cycle_trace()
+        self.register_states = checkpoint.register_history()
+
+    def seek(self, cycle):
+        """
+        Bring the machine to the state after `cycle` cycles (or the end of the
+        run if it drains first), restoring the nearest earlier checkpoint
+        instead of re-simulating from cycle 0. Needs a checkpoint interval.
+        """
+        if not self.checkpoints:
+            raise ValueError("seek needs a pipeline created with a checkpoint_interval")
+        index = bisect_right([checkpoint.cycle for checkpoint in self.checkpoints], cycle) - 1
+        checkpoint = self.checkpoints[index]
+        # Running on is cheaper when the machine is already between it and the target
+        if not checkpoint.cycle <= self.cycle <= cycle:
+            self.restore(checkpoint)
+        while self.cycle < cycle and not self.empty_pipeline():
+            self.run_cycle()
+
+    def step(self):
+        """Run one cycle and return its CycleState, or None once the pipeline has drained."""
+        if self.empty_pipeline():
+            return None
+        if self.tracer.levels[CYCLE] >= INFO:
+            self.tracer.emit(CYCLE, "Cycle %d", self.cycle + 1)
+        self.run_cycle()
+        return CycleState(self.cycle, self.PC, len(self.register_states) - 1, self.halt)
+
+    def iter_cycles(self, max_cycles=None, cancel=None):
+        """
+        Lazily run the pipeline, yielding a CycleState after every cycle.
+
+        Stops when the pipeline drains, after `max_cycles` cycles, or once
+        `cancel.is_set()` (e.g. a threading.Event) is true; closing the
+        generator also stops it. `stop_reason` is then 'drained', 'budget' or
+        'cancelled', and the run can be continued with another call.
+        """
+        self.stop_reason = None
+        ran = 0
+        while True:
+            if self.empty_pipeline():
+                self.stop_reason = 'drained'
+                return
+            if cancel is not None and cancel.is_set():
+                self.stop_reason = 'cancelled'
+                return
+            if max_cycles is not None and ran >= max_cycles:
+                self.stop_reason = 'budget'
+                return
+            yield self.step()
+            ran += 1
+
+    def run_pipeline(self, max_cycles=None, cancel=None, counters=False):
+        """
+        Runs the pipeline cycle by cycle until it halts and drains, or until
+        `max_cycles`/`cancel` stop it early (see iter_cycles and stop_reason).
+        Returns (register_states, io_memory, trace); `trace.to_dataframe()`
+        gives the cycle-by-cycle stage table. With `counters`, the
+        perf_counters() dict is returned as a fourth element.
+        """
+        for _ in self.iter_cycles(max_cycles, cancel):
+            pass
+        self.trace_registers()
+
+        if counters:
+            return self.register_states, self.io.io_memory, self.trace, self.perf_counters()
+        return self.register_states, self.io.io_memory, self.trace
+
+    def trace_registers(self):
+        """Dump the final register file, or at DEBUG every tracked state, to the tracer."""
+        tracer = self.tracer
+        if tracer.levels[REGISTERS] < INFO:
+            return
+        if tracer.levels[REGISTERS] >= DEBUG:
+            tracer.emit(REGISTERS, "Tracked Register States After Each Instruction:")
+            states = enumerate(self.register_states)
+        else:
+            tracer.emit(REGISTERS, "Final Register States:")
+            states = [(len(self.register_states) - 1, self.register_states[-1])]
+        tracer.emit(REGISTERS, "-----------------------------")
+        for i, state in states:
+            if i == 0:
+                tracer.emit(REGISTERS, "Initial Values:")
+            else:
+                tracer.emit(REGISTERS, "Instruction %d:", i)
             for j in range(32):
-                print(f"{allRegNames[j]}: {allRegValues[j]}")
-            print() 
-        print("-----------------------------")
-
-        return self.register_states, self.io.io_memory,cycle_states
+                tracer.emit(REGISTERS, "%s: %d", REGISTER_NAMES[j], state[j])
+            tracer.emit(REGISTERS, "")
+        tracer.emit(REGISTERS, "-----------------------------")
 
 if __name__ == "__main__":
-    mips_pipeline = MIPSPipeline(file_path="tests/lh_lbu_test.txt")
+    mips_pipeline = MIPSPipeline(file_path="tests/lh_lbu_test.txt", tracer=Tracer(DEBUG))
     mips_pipeline.run_pipeline()
\ No newline at end of file
@@ -0,0 +1,187 @@
+import mmap
+import struct
+import sys
+from array import array
+from bisect import bisect_right
+
+from components.memory import Memory, PAGE_SIZE
+
+TEXT_BASE = 0  # instructions start at address 0, where the PC starts
+DATA_BASE = 0x1000  # .data starts just above the default 4 KiB memory
+
+IMAGE_MAGIC = b"MIPSIMG1"
+# Header: magic, byte order (b'B'/b'L'), entry, text start, text end, segment count, symbol count
+_HEADER = struct.Struct('>8sc3xIIIII')
+_SEGMENT = struct.Struct('>III')  # address, file offset, size
+_SYMBOL = struct.Struct('>IH')  # address, name length; the UTF-8 name follows
+_ALIGN = 16  # segment data starts on this boundary in the file
+
+
+class ProgramImage:
+    """
+    A loadable program: memory segments, the text range, entry point and symbols.
+
+    `segments` is a list of (address, bytes-like) pairs in memory byte order.
+    `load_into` copies each one into a Memory with a single slice assignment.
+    The text range [text_start, text_end) is what simulators decode and cache.
+    `symbols` maps label names to byte addresses.
+    """
+    def __init__(self, segments, text_start=TEXT_BASE, text_end=None, entry=None, symbols=None, endianness='big'):
+        self.segments = segments
+        self.text_start = text_start
+        self.text_end = text_start if text_end is None else text_end
+        self.entry = text_start if entry is None else entry
+        self.symbols = symbols if symbols is not None else {}
+        self.endianness = endianness
+        self._symbol_index = None  # (addresses, names) sorted by address, built by `label`
+
+    @classmethod
+    def from_words(cls, words, data=b"", data_base=DATA_BASE, symbols=None, endianness='big'):
+        """Image with `words` (ints) as the text at TEXT_BASE and `data` at `data_base`."""
+        text = array('I', words)
+        if (endianness == 'big') != (sys.byteorder == 'big'):
+            text.byteswap()
+        segments = [(TEXT_BASE, text.tobytes())]
+        if data:
+            segments.append((data_base, bytes(data)))
+        return cls(segments, TEXT_BASE, TEXT_BASE + 4 * len(text), symbols=symbols, endianness=endianness)
+
+    def memory_size(self, minimum=4 * 1024):
+        """Smallest memory (a whole number of pages, at least `minimum`) holding every segment."""
+        end = max((address + len(data) for address, data in self.segments), default=0)
+        return max(minimum, -(-end // PAGE_SIZE) * PAGE_SIZE)
+
+    def create_memory(self, endianness=None):
+        """A Memory (with the usual test data) sized for the image and loaded with it."""
+        memory = Memory(initialise=True, size=self.memory_size(), endianness=endianness or self.endianness)
+        self.load_into(memory)
+        return memory
+
+    def load_into(self, memory):
+        for address, data in self.segments:
+            if address + len(data) > memory.size:
+                raise ValueError(f"segment at {address:#x} ({len(data)} bytes) does not fit in {memory.size} bytes of memory")
+            memory.view[address:address + len(data)] = data
+
+    def text_words(self):
+        """The text segment as an array of instruction words."""
+        for address, data in self.segments:
+            if address <= self.text_start and self.text_end <= address + len(data):
+                text = array('I')
+                text.frombytes(bytes(data[self.text_start - address:self.text_end - address]))
+                if (self.endianness == 'big') != (sys.byteorder == 'big'):
+                    text.byteswap()
+                return text
+        raise ValueError("the text range is not inside a segment")
+
+    def label(self, address):
+        """
+        `address` as "name" or "name+offset" relative to the nearest symbol at
+        or below it, or None if there is no such symbol.
+        """
+        if self._symbol_index is None:
+            pairs = sorted((address, name) for name, address in self.symbols.items())
+            self._symbol_index = ([a for a, _ in pairs], [n for _, n in pairs])
+        addresses, names = self._symbol_index
+        i = bisect_right(addresses, address) - 1
+        if i < 0:
+            return None
+        offset = address - addresses[i]
+        return f"{names[i]}+{offset:#x}" if offset else names[i]
+
+    def __getstate__(self):
+        # Segments may be views of a mapped file; pickle their contents
+        state = self.__dict__.copy()
+        state['segments'] = [(address, bytes(data)) for address, data in self.segments]
+        return state
+
+    def __repr__(self):
+        segments = ", ".join(f"{address:#x}+{len(data)}" for address, data in self.segments)
+        return f"ProgramImage(segments=[{segments}], entry={self.entry:#x}, symbols={len(self.symbols)})"
+
+    # Image file format -----------------------------------------------------
+    #
+    # A header (IMAGE_MAGIC, byte order, entry, text range and table sizes),
+    # the segment table, the symbol table, then each segment's bytes starting
+    # on a 16-byte boundary. All header fields are big-endian; segment bytes
+    # are in the image's memory byte order, ready to copy into memory as-is.
+
+    def save(self, path):
+        symbols = [(address, name.encode()) for name, address in self.symbols.items()]
+        offset = _HEADER.size + _SEGMENT.size * len(self.segments)
+        offset += sum(_SYMBOL.size + len(name) for _, name in symbols)
+        table = []
+        for address, data in self.segments:
+            offset += -offset % _ALIGN
+            table.append((address, offset, len(data)))
+            offset += len(data)
+
+        with open(path, 'wb') as f:
+            f.write(_HEADER.pack(IMAGE_MAGIC, b'B' if self.endianness == 'big' else b'L', self.entry,
+                                 self.text_start, self.text_end, len(self.segments), len(symbols)))
+            for entry in table:
+                f.write(_SEGMENT.pack(*entry))
+            for address, name in symbols:
+                f.write(_SYMBOL.pack(address, len(name)))
+                f.write(name)
+            for (_, data), (_, offset, _) in zip(self.segments, table):
+                f.write(bytes(offset - f.tell()))
+                f.write(data)
+
+    @classmethod
+    def from_buffer(cls, buffer):
+        """
+        Image read from the file format in `buffer` (bytes, or an mmap).
+        Segments are views into the buffer, so nothing is copied until the
+        image is loaded into memory.
+        """
+        view = memoryview(buffer)
+        if len(view) < _HEADER.size or view[:len(IMAGE_MAGIC)] != IMAGE_MAGIC:
+            raise ValueError("not a MIPS program image")
+        _, order, entry, text_start, text_end, segment_count, symbol_count = _HEADER.unpack_from(view)
+        offset = _HEADER.size
+        if offset + segment_count * _SEGMENT.size > len(view):
+            raise ValueError("segment table runs past the end of the image")
+        segments = []
+        for _ in range(segment_count):
+            address, data_offset, size = _SEGMENT.unpack_from(view, offset)
+            if data_offset + size > len(view):
+                raise ValueError(f"segment at {address:#x} runs past the end of the image")
+            segments.append((address, view[data_offset:data_offset + size]))
+            offset += _SEGMENT.size
+        symbols = {}
+        for _ in range(symbol_count):
+            if offset + _SYMBOL.size > len(view):
+                raise ValueError("symbol table runs past the end of the image")
+            address, length = _SYMBOL.unpack_from(view, offset)
+            offset += _SYMBOL.size
+            symbols[bytes(view[offset:offset + length]).decode()] = address
+            offset += length
+        return cls(segments, text_start, text_end, entry, symbols, 'big' if order == b'B' else 'little')
+
+    @classmethod
+    def load(cls, path):
+        """Map an image file into memory and read it with `from_buffer`."""
+        with open(path, 'rb') as f:
+            if not is_image_file(f):
+                raise ValueError(f"{path} is not a MIPS program image")
+            # The mapping stays valid after the file is closed
+            return cls.from_buffer(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+
+def starts_with(file, magic):
+    """True if `file` (a path or a binary file object) starts with the bytes `magic`."""
+    if hasattr(file, 'read'):
+        head = file.read(len(magic))
+        file.seek(0)
+        return head == magic
+    try:
+        with open(file, 'rb') as f:
+            return f.read(len(magic)) == magic
+    except OSError:
+        return False
+
+
+def is_image_file(file):
+    """True if `file` (a path or a binary file object) starts with IMAGE_MAGIC."""
+    return starts_with(file, IMAGE_MAGIC)
@@ -0,0 +1,169 @@
+from array import array
+from bisect import bisect_right
+
+from components.registers import REGISTER_NAMES
+
+KEYFRAME_INTERVAL = 256  # retired instructions between full keyframes
+
+
+class RegisterHistory:
+    """
+    Register file state after each retired instruction, stored as deltas.
+
+    Entry 0 is the initial state and entry i the state after the i-th
+    retired instruction. Each register write is kept as an (instruction
+    index, register, value) delta in three compact arrays, and a full copy of
+    the register file is kept every `keyframe_interval` instructions. State i
+    is rebuilt from the keyframe at or before it plus the deltas up to i,
+    found by binary search, so random access is O(log n) and memory grows with
+    the number of writes rather than 32 values per instruction.
+
+    Behaves as a read-only sequence of 32-int lists (len, indexing, slicing,
+    iteration), so it can stand in for the plain list of snapshots.
+    """
+    def __init__(self, initial, keyframe_interval=KEYFRAME_INTERVAL):
+        self.keyframe_interval = keyframe_interval
+        self.current = list(initial)  # latest state
+        self.keyframes = [list(initial)]  # state at instruction k * keyframe_interval
+        self.keyframe_deltas = [0]  # deltas recorded before each keyframe
+        self.delta_index = array('q')
+        self.delta_reg = array('B')
+        self.delta_value = array('q')
+        self.length = 1
+
+    @classmethod
+    def from_states(cls, states, keyframe_interval=KEYFRAME_INTERVAL):
+        """Build a history from a list of full register snapshots."""
+        states = iter(states)
+        history = cls(next(states), keyframe_interval)
+        for state in states:
+            history.append(state)
+        return history
+
+    def retire(self, reg=0, value=0):
+        """Record one retired instruction that wrote `value` to `reg` ($0 for no write)."""
+        if reg:
+            self.delta_index.append(self.length)
+            self.delta_reg.append(reg)
+            self.delta_value.append(value)
+            self.current[reg] = value
+        self._commit()
+
+    def append(self, state):
+        """Record one retired instruction from a full snapshot; only changed registers are stored."""
+        current = self.current
+        for reg in range(32):
+            if state[reg] != current[reg]:
+                self.delta_index.append(self.length)
+                self.delta_reg.append(reg)
+                self.delta_value.append(state[reg])
+                current[reg] = state[reg]
+        self._commit()
+
+    def _commit(self):
+        if self.length % self.keyframe_interval == 0:
+            self.keyframes.append(self.current.copy())
+            self.keyframe_deltas.append(len(self.delta_index))
+        self.length += 1
+
+    def copy(self, length=None):
+        """A new history holding the first `length` states (all states if None)."""
+        length = self.length if length is None else length
+        history = RegisterHistory(self.keyframes[0], self.keyframe_interval)
+        keyframes = (length - 1) // self.keyframe_interval + 1
+        history.keyframes = [state.copy() for state in self.keyframes[:keyframes]]
+        history.keyframe_deltas = self.keyframe_deltas[:keyframes]
+        deltas = bisect_right(self.delta_index, length - 1)
+        history.delta_index = self.delta_index[:deltas]
+        history.delta_reg = self.delta_reg[:deltas]
+        history.delta_value = self.delta_value[:deltas]
+        history.current = self.state(length - 1)
+        history.length = length
+        return history
+
+    def __len__(self):
+        return self.length
+
+    def state(self, index):
+        """Full register file after instruction `index` (negative indices count from the end)."""
+        if index < 0:
+            index += self.length
+        if not 0 <= index < self.length:
+            raise IndexError("register history index out of range")
+        if index == self.length - 1:
+            return self.current.copy()
+        keyframe = index // self.keyframe_interval
+        state = self.keyframes[keyframe].copy()
+        start = self.keyframe_deltas[keyframe]
+        end = bisect_right(self.delta_index, index, start)
+        for j in range(start, end):
+            state[self.delta_reg[j]] = self.delta_value[j]
+        return state
+
+    def states(self, start=0, stop=None):
+        """Iterate over states [start, stop), rolling deltas forward from the first one."""
+        stop = self.length if stop is None else min(stop, self.length)
+        if start >= stop:
+            return
+        state = self.state(start)
+        j = bisect_right(self.delta_index, start)
+        delta_index, delta_reg, delta_value = self.delta_index, self.delta_reg, self.delta_value
+        for index in range(start, stop):
+            while j < len(delta_index) and delta_index[j] == index:
+                state[delta_reg[j]] = delta_value[j]
+                j += 1
+            yield state.copy()
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, step = key.indices(self.length)
+            if step == 1:
+                return list(self.states(start, stop))
+            return [self.state(i) for i in range(start, stop, step)]
+        return self.state(key)
+
+    def __iter__(self):
+        return self.states()
+
+    def labels(self, start=0, stop=None):
+        stop = self.length if stop is None else min(stop, self.length)
+        return [f'I{i}' if i else 'Initial Value' for i in range(start, stop)]
+
+    def to_dataframe(self, start=0, stop=None, registers=None):
+        """
+        Rows [start, stop) as a pandas DataFrame with one column per register
+        (or per index in `registers`); only the requested rows are rebuilt.
+        """
+        import pandas as pd
+        stop = self.length if stop is None else min(stop, self.length)
+        registers = list(range(32)) if registers is None else list(registers)
+        rows = [[state[reg] for reg in registers] for state in self.states(start, stop)]
+        return pd.DataFrame(rows, columns=[REGISTER_NAMES[reg] for reg in registers],
+                            index=self.labels(start, stop))
+
+
+# Check random access and slicing against a plain list of snapshots
+if __name__ == "__main__":
+    import random
+
+    rng = random.Random(0)
+    state = [0] * 32
+    snapshots = [state.copy()]
+    history = RegisterHistory(state, keyframe_interval=16)
+    for _ in range(1000):
+        reg = rng.choice([0, 0, rng.randrange(1, 32)])  # some instructions write nothing
+        if reg:
+            state[reg] = rng.randrange(-2**31, 2**31)
+        snapshots.append(state.copy())
+        history.retire(reg, state[reg])
+    assert len(history) == len(snapshots)
+    assert all(history[i] == snapshots[i] for i in range(-len(snapshots), len(snapshots)))
+    assert list(history) == snapshots
+    assert history[100:300] == snapshots[100:300] and history[5:900:7] == snapshots[5:900:7]
+    assert list(RegisterHistory.from_states(snapshots, keyframe_interval=16)) == snapshots
+    for length in (1, 16, 17, 500):
+        prefix = history.copy(length)
+        assert list(prefix) == snapshots[:length]
+        prefix.retire(1, 7)
+        assert prefix[-1] == snapshots[length - 1][:1] + [7] + snapshots[length - 1][2:]
+    print(f"OK: {len(history)} states, {len(history.delta_index)} deltas, {len(history.keyframes)} keyframes")
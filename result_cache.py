@@ -0,0 +1,132 @@
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+
+class SimulationResult(NamedTuple):
+    """Everything the app shows for one run; treated as immutable once cached."""
+    register_states: object  # RegisterHistory, or a list of snapshots
+    io_memory: list
+    memory: bytes  # final memory contents
+    cycle_trace: object  # CycleTrace, or None for functional runs
+    checkpoints: list  # pipeline checkpoints for the cycle inspector
+    cycles: int  # cycles (pipelined) or instructions (functional) run
+    completed: bool  # False if the run hit its budget
+    trace_lines: list  # text trace output
+    counters: dict = None  # MIPSPipeline.perf_counters(), for pipelined runs
+
+
+def program_key(image, config):
+    """Hash of a ProgramImage and the simulator configuration (a JSON-serialisable dict)."""
+    digest = hashlib.sha256()
+    layout = [image.text_start, image.text_end, image.entry, [(address, len(data)) for address, data in image.segments]]
+    digest.update(json.dumps(layout).encode())
+    for _, data in image.segments:
+        digest.update(data)
+    digest.update(json.dumps(config, sort_keys=True).encode())
+    return digest.hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier cache of simulation results keyed by `program_key`.
+
+    The first tier is an in-memory LRU of up to `max_entries` results. With a
+    `directory`, results are also pickled to disk. Files are evicted oldest
+    access first once they use more than `max_bytes`, and a disk hit is
+    promoted into memory. Safe to share between threads (Streamlit sessions).
+    """
+    def __init__(self, max_entries=32, directory=None, max_bytes=256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".pkl")
+
+    def get(self, key):
+        """The cached result for `key`, or None."""
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+        result = self._load(key) if self.directory else None
+        with self.lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, result)
+        return result
+
+    def put(self, key, result):
+        with self.lock:
+            self._remember(key, result)
+        if self.directory:
+            self._store(key, result)
+
+    def _remember(self, key, result):
+        self.entries[key] = result
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+        if self.directory:
+            for name in os.listdir(self.directory):
+                if name.endswith(".pkl"):
+                    os.remove(os.path.join(self.directory, name))
+
+    # Disk tier ---------------------------------------------------------------
+
+    def _load(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                result = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError, AttributeError):
+            return None
+        os.utime(path)  # mark as recently used for eviction
+        return result
+
+    def _store(self, key, result):
+        # Write to a temporary file first so readers never see a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, 'wb') as f:
+            pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self._path(key))
+        self._evict()
+
+    def _evict(self):
+        """Delete the least recently used files until the tier fits in max_bytes."""
+        files = []
+        for name in os.listdir(self.directory):
+            if name.endswith(".pkl"):
+                try:
+                    stat = os.stat(os.path.join(self.directory, name))
+                except OSError:  # removed by another process
+                    continue
+                files.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in files)
+        for _, size, name in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+            total -= size
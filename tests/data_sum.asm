@@ -0,0 +1,25 @@
+# Sum a .data array and copy a string to the output port
+.data
+values: .word 12, -5, 0x20, 7, 100
+count:  .word 5
+greeting: .asciiz "hi"
+
+.text
+la $t0, values
+lw $t1, count($0)
+addi $t2, $0, 0
+sum:
+lw $t3, 0($t0)
+add $t2, $t2, $t3      # $t2 = 146 at the end
+addi $t0, $t0, 4
+addi $t1, $t1, -1
+bne $t1, $0, sum
+la $t4, greeting
+copy:
+lb $t5, 0($t4)
+beq $t5, $0, done
+sb $t5, 2000($0)       # output 'h', then 'i'
+addi $t4, $t4, 1
+j copy
+done:
+syscall
@@ -0,0 +1,92 @@
+import sys
+from collections import deque
+
+from cycle_trace import STAGES, FETCH
+
+
+# Trace levels
+OFF = 0
+INFO = 1   # stage events, cycle numbers, final registers
+DEBUG = 2  # also the register file after every retired instruction
+
+# One category per pipeline stage (same indices as the cycle trace), then the
+# per-cycle banner and the register dumps at the end of a run
+CATEGORIES = STAGES + ("cycle", "registers")
+CYCLE, REGISTERS = len(STAGES), len(STAGES) + 1
+
+
+class StdoutSink:
+    """Writes trace lines to stdout (looked up per line, so redirection works)."""
+    def write(self, line):
+        sys.stdout.write(line + "\n")
+
+    def close(self):
+        pass
+
+
+class FileSink:
+    """Appends trace lines to a file."""
+    def __init__(self, path):
+        self.file = open(path, 'a')
+
+    def write(self, line):
+        self.file.write(line + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+class RingBufferSink:
+    """Keeps the last `capacity` trace lines in memory."""
+    def __init__(self, capacity=10000):
+        self.buffer = deque(maxlen=capacity)
+
+    def write(self, line):
+        self.buffer.append(line)
+
+    def lines(self):
+        return list(self.buffer)
+
+    def clear(self):
+        self.buffer.clear()
+
+    def close(self):
+        pass
+
+
+class Tracer:
+    """
+    Level-gated trace output for the simulator, per category.
+
+    `levels[category]` holds the level enabled for each category, so callers
+    guard a message with a list lookup and compare:
+
+        if tracer.levels[FETCH] >= INFO:
+            tracer.emit(FETCH, "Fetch Stage: Instruction at PC %d fetched", pc)
+
+    Messages use %-style arguments and are only formatted once they pass the
+    check, so a disabled tracer costs one comparison per call site.
+    """
+    def __init__(self, level=OFF, categories=None, sink=None):
+        self.sink = sink if sink is not None else StdoutSink()
+        self.levels = [OFF] * len(CATEGORIES)
+        self.set_level(level, categories)
+
+    def set_level(self, level, categories=None):
+        """Set the level of `categories` (names or indices; all categories if None)."""
+        if categories is None:
+            categories = range(len(CATEGORIES))
+        for category in categories:
+            if isinstance(category, str):
+                category = CATEGORIES.index(category)
+            self.levels[category] = level
+
+    def enabled(self, category, level=INFO):
+        return self.levels[category] >= level
+
+    def emit(self, category, message, *args):
+        """Write a message to the sink; `args` are %-formatted into `message`."""
+        self.sink.write(message % args if args else message)
+
+    def close(self):
+        self.sink.close()
@@ -0,0 +1,208 @@
+from instructions import Op
+from interpreter import MIPSInterpreter
+
+
+# Instructions that end a basic block
+BLOCK_ENDS = frozenset({Op.BEQ, Op.BNE, Op.J, Op.JAL, Op.JR, Op.SYSCALL, Op.UNKNOWN})
+
+MAX_BLOCK_LENGTH = 256  # instructions per translated block
+
+_WRAP = "((({}) + 0x80000000) & 0xFFFFFFFF) - 0x80000000"  # wrap to signed 32 bits
+
+# Expressions for ALU operations, in terms of the operands a and b
+_R_EXPRS = {
+    Op.ADD: _WRAP.format("{a} + {b}"),
+    Op.SUB: _WRAP.format("{a} - {b}"),
+    Op.AND: "{a} & {b}",
+    Op.OR: "{a} | {b}",
+    Op.XOR: "{a} ^ {b}",
+    Op.NOR: "~({a} | {b})",
+    Op.SLT: "int({a} < {b})",
+    Op.SLTU: "int(({a} & 0xFFFFFFFF) < ({b} & 0xFFFFFFFF))",
+    Op.SLL: _WRAP.format("{a} << {b}"),
+    Op.SRL: _WRAP.format("({a} & 0xFFFFFFFF) >> {b}"),
+    Op.SRA: "{a} >> {b}",
+}
+_I_EXPRS = {
+    Op.ADDI: _R_EXPRS[Op.ADD],
+    Op.SLTI: "int({a} < {b})",
+    Op.SLTIU: _R_EXPRS[Op.SLTU],
+    Op.ANDI: "{a} & {b}",
+    Op.ORI: "{a} | {b}",
+    Op.XORI: "{a} ^ {b}",
+}
+_LOADS = {
+    Op.LB: "load_byte({addr}, True)",
+    Op.LH: "load_half({addr}, True)",
+    Op.LW: "load_word({addr}, True)",
+    Op.LBU: "load_byte({addr})",
+    Op.LHU: "load_half({addr})",
+}
+_STORE_SIZES = {Op.SB: 1, Op.SH: 2, Op.SW: 4}
+
+
+class MIPSTranslator(MIPSInterpreter):
+    """
+    Functional simulator that translates basic blocks to Python functions.
+
+    A block runs from its start PC up to and including the next branch, jump,
+    jr or syscall. Each block is compiled once into a function over the
+    integer register file that returns (next PC, instructions executed), and
+    cached by start PC; a block that halts returns the halting PC and a
+    negated count. Stores into the text region drop the affected blocks and
+    end the running block, so self-modifying code is translated again.
+    Code outside the text region is executed with the step interpreter.
+    """
+    def __init__(self, file_path=None, record_states=True, program=None):
+        super().__init__(file_path, record_states=record_states, program=program)
+        self.blocks = {}  # start PC -> compiled block function
+        self.block_ranges = {}  # start PC -> end PC (exclusive)
+        self.sources = {}  # start PC -> generated source, for inspection
+
+    def store(self, op, addr, value):
+        super().store(op, addr, value)
+        if addr < self.decode_cache.text_end and addr + _STORE_SIZES[op] > self.decode_cache.text_start:
+            self.invalidate(addr, _STORE_SIZES[op])
+
+    def invalidate(self, addr, size):
+        """Drop translated blocks overlapping [addr, addr + size)."""
+        for start, end in list(self.block_ranges.items()):
+            if start < addr + size and addr < end:
+                del self.blocks[start]
+                del self.block_ranges[start]
+                self.sources.pop(start, None)
+
+    def translate(self, start):
+        """Compile the block starting at `start`, or return None if it lies outside the text region."""
+        cache = self.decode_cache
+        if not cache.text_start <= start < cache.text_end:
+            return None
+
+        lines = [f"def block_{start:x}(r):"]
+        pc = start
+        count = 0
+        while True:
+            inst = cache.fetch(pc)
+            count += 1
+            lines.extend("    " + line for line in self._emit(inst, pc, count))
+            pc += 4
+            if inst.op in BLOCK_ENDS:
+                break
+            if pc >= cache.text_end or count >= MAX_BLOCK_LENGTH:
+                lines.append(f"    return {pc}, {count}")
+                break
+
+        source = "\n".join(lines)
+        namespace = {
+            'load_byte': self.memory.load_byte,
+            'load_half': self.memory.load_half,
+            'load_word': self.memory.load_word,
+            'store': self.store,
+            'record': self.register_states.append,
+            'Op': Op,
+        }
+        exec(compile(source, f"<block 0x{start:x}>", "exec"), namespace)
+        block = namespace[f"block_{start:x}"]
+        self.blocks[start] = block
+        self.block_ranges[start] = pc
+        self.sources[start] = source
+        return block
+
+    def _emit(self, inst, pc, count):
+        """Source lines for one instruction; `count` is its 1-based position in the block."""
+        op = inst.op
+        rs, rt = f"r[{inst.rs}]", f"r[{inst.rt}]"
+        next_pc = pc + 4
+        record = ["record(r.copy())"] if self.record_states else []
+        lines = []
+
+        if op == Op.SYSCALL:
+            return [f"return {pc}, {-count}"]
+        elif op == Op.JR:
+            lines.append(f"t = {rs}")
+            if inst.rs == 31:
+                lines.append(f"if t == 0: return {pc}, {-count}")
+            return lines + record + [f"return t, {count}"]
+        elif op == Op.BEQ or op == Op.BNE:
+            cmp = "==" if op == Op.BEQ else "!="
+            return record + [f"if {rs} {cmp} {rt}: return {next_pc + (inst.simm << 2)}, {count}",
+                             f"return {next_pc}, {count}"]
+        elif op == Op.J:
+            return record + [f"return {next_pc + (inst.target << 2)}, {count}"]
+        elif op == Op.JAL:
+            return [f"r[31] = {next_pc}"] + record + [f"return {next_pc + (inst.target << 2)}, {count}"]
+        elif op == Op.UNKNOWN:
+            return [f"raise ValueError('Unsupported instruction 0x{inst.word:08x} at PC {pc}')"]
+        elif op in _LOADS:
+            value = _LOADS[op].format(addr=f"{rs} + {inst.simm}")
+            lines.append(f"r[{inst.rt}] = {value}" if inst.rt else value)
+        elif op in _STORE_SIZES:
+            size = _STORE_SIZES[op]
+            lines.append(f"a = {rs} + {inst.simm}")
+            lines.append(f"store(Op.{op.name}, a, {rt})")
+            text_start, text_end = self.decode_cache.text_start, self.decode_cache.text_end
+            # a store into the text region may have rewritten this very block
+            lines.extend(record)
+            lines.append(f"if a < {text_end} and a + {size} > {text_start}: return {next_pc}, {count}")
+            return lines
+        elif op in (Op.SLL, Op.SRL, Op.SRA):
+            if inst.rd:
+                lines.append(f"r[{inst.rd}] = " + _R_EXPRS[op].format(a=rt, b=inst.shamt))
+        elif op == Op.LUI:
+            if inst.rt:
+                lines.append(f"r[{inst.rt}] = {_WRAP.format((inst.imm << 16))}")
+        elif inst.type == 0:
+            if inst.rd:
+                lines.append(f"r[{inst.rd}] = " + _R_EXPRS[op].format(a=rs, b=rt))
+        else:
+            if inst.rt:
+                lines.append(f"r[{inst.rt}] = " + _I_EXPRS[op].format(a=rs, b=inst.simm))
+        return lines + record
+
+    def run(self, max_steps=None):
+        """
+        Run until the program halts. `max_steps` is checked between blocks, so
+        a run may overshoot it by up to one block.
+        Returns (register_states, io_memory) like MIPSInterpreter.run.
+        """
+        regs = self.registers.values
+        blocks = self.blocks
+        pc = self.PC
+        while not self.halt and (max_steps is None or self.instruction_count < max_steps):
+            block = blocks.get(pc)
+            if block is None:
+                block = self.translate(pc)
+                if block is None:  # outside the text region: single-step
+                    self.PC = pc
+                    self.step()
+                    pc = self.PC
+                    continue
+            pc, executed = block(regs)
+            if executed < 0:  # halted at pc
+                self.halt = True
+                executed = -executed
+            self.instruction_count += executed
+            self.PC = pc
+        if not self.record_states:
+            self.register_states[1:] = [self.registers.snapshot()]
+        return self.register_states, self.io.io_memory
+
+
+# Differential check against the step interpreter
+# (run from the repository root: python translator.py [file.asm ...])
+if __name__ == "__main__":
+    import glob
+    import sys
+    from utils.assembler import MIPSAssembler
+
+    asm_files = sys.argv[1:] or sorted(glob.glob("tests/*.asm")) + sorted(glob.glob("assets/mipsasm_*.asm"))
+    for asm_path in asm_files:
+        image = MIPSAssembler().assemble_file(asm_path)
+        interpreter = MIPSInterpreter(program=image)
+        translator = MIPSTranslator(program=image)
+        expected, translated = interpreter.run(), translator.run()
+        assert expected[0] == translated[0], f"{asm_path}: register states differ"
+        assert expected[1] == translated[1], f"{asm_path}: I/O output differs"
+        assert interpreter.memory.buffer == translator.memory.buffer, f"{asm_path}: memory differs"
+        assert interpreter.instruction_count == translator.instruction_count, f"{asm_path}: instruction counts differ"
+        print(f"{asm_path}: OK ({len(translator.blocks)} blocks, {translator.instruction_count} instructions)")
@@ -1,161 +1,396 @@
-class MIPSAssembler:
+import argparse
+import ast
+import re
+from array import array
+
+from program_image import ProgramImage, TEXT_BASE, DATA_BASE
+from utils.conversion import words_to_binary
+
+# Operand formats
+R3, SHIFT, JR, MEMORY, LUI, BRANCH_Z, IMMEDIATE, JUMP, SYSCALL = range(9)
+
+# Mnemonic -> (operand format, word with the opcode/funct bits already set)
+OPCODES = {
+    # R-format: funct in the low 6 bits
+    'add': (R3, 0x20), 'sub': (R3, 0x22), 'and': (R3, 0x24), 'or': (R3, 0x25), 'slt': (R3, 0x2A),
+    'nor': (R3, 0x27), 'sltu': (R3, 0x2B), 'div': (R3, 0x1A), 'mult': (R3, 0x18), 'xor': (R3, 0x26),
+    'mfhi': (R3, 0x10), 'mflo': (R3, 0x12), 'mthi': (R3, 0x11), 'mtlo': (R3, 0x13),
+    'sll': (SHIFT, 0x00), 'srl': (SHIFT, 0x02), 'sra': (SHIFT, 0x03),
+    'jr': (JR, 0x08),
+    # I-format: opcode in the top 6 bits
+    'addi': (IMMEDIATE, 0x08 << 26), 'andi': (IMMEDIATE, 0x0C << 26), 'ori': (IMMEDIATE, 0x0D << 26),
+    'beq': (IMMEDIATE, 0x04 << 26), 'bne': (IMMEDIATE, 0x05 << 26), 'slti': (IMMEDIATE, 0x0A << 26),
+    'xori': (IMMEDIATE, 0x0E << 26), 'sltiu': (IMMEDIATE, 0x0B << 26),
+    'lui': (LUI, 0x0F << 26),
+    'bgez': (BRANCH_Z, 0x01 << 26), 'bgtz': (BRANCH_Z, 0x07 << 26),
+    'blez': (BRANCH_Z, 0x06 << 26), 'bltz': (BRANCH_Z, 0x01 << 26),
+    'lw': (MEMORY, 0x23 << 26), 'lh': (MEMORY, 0x21 << 26), 'lhu': (MEMORY, 0x25 << 26),
+    'lb': (MEMORY, 0x20 << 26), 'lbu': (MEMORY, 0x24 << 26),
+    'sw': (MEMORY, 0x2B << 26), 'sh': (MEMORY, 0x29 << 26), 'sb': (MEMORY, 0x28 << 26),
+    # J-format
+    'j': (JUMP, 0x02 << 26), 'jal': (JUMP, 0x03 << 26),
+    'syscall': (SYSCALL, 0x0C),
+}
+
+REGISTERS = {
+    '$0': 0, '$at': 1, '$v0': 2, '$v1': 3, '$a0': 4, '$a1': 5, '$a2': 6, '$a3': 7,
+    '$t0': 8, '$t1': 9, '$t2': 10, '$t3': 11, '$t4': 12, '$t5': 13, '$t6': 14, '$t7': 15,
+    '$s0': 16, '$s1': 17, '$s2': 18, '$s3': 19, '$s4': 20, '$s5': 21, '$s6': 22, '$s7': 23,
+    '$t8': 24, '$t9': 25, '$k0': 26, '$k1': 27, '$gp': 28, '$sp': 29, '$fp': 30, '$ra': 31,
+}
+
+IMMEDIATE_MASK = 0xFFFF
+TARGET_MASK = 0x3FFFFFF
+
+# How a label's value is placed in the word (or data) referring to it:
+# OFFSET - branch immediates: word offset for text labels, address for data labels
+# TARGET - jump targets: word offset (text labels only)
+# ADDRESS - load/store offsets: absolute address
+# HIGH/LOW - the lui/addi halves of `la`
+# DATA_WORD - a 32-bit address in .word data
+OFFSET, TARGET, ADDRESS, HIGH, LOW, DATA_WORD = range(6)
+LABEL_FIELDS = {IMMEDIATE: OFFSET, BRANCH_Z: OFFSET, JUMP: TARGET, MEMORY: ADDRESS}
+
+PSEUDO_OPS = ('la', 'li')
+DATA_SIZES = {'.word': 4, '.half': 2, '.byte': 1}
+
+_LABEL = re.compile(r'\s*([A-Za-z_.][\w.]*)\s*:')
+
+
+def parse_int(token):
+    """Decimal or 0x-prefixed hexadecimal integer, optionally negative."""
+    if token[:2] in ('0x', '0X') or token[:3] in ('-0x', '-0X'):
+        return int(token, 16)
+    return int(token)
+
+
+def is_label(token):
+    return token[0].isalpha() or token[0] in '_.'
+
+
+def strip_comment(line):
+    """`line` without its # comment, leaving # inside string literals alone."""
+    quoted = escaped = False
+    for i, char in enumerate(line):
+        if escaped:
+            escaped = False
+        elif char == '\\':
+            escaped = quoted
+        elif char == '"':
+            quoted = not quoted
+        elif char == '#' and not quoted:
+            return line[:i]
+    return line
+
+
+class AssemblyError(ValueError):
+    """An error in the source, with the line it was found on in the message."""
+
+
+class _Assembly:
+    """Output and label state of one assembler run."""
     def __init__(self):
-        # Instruction type formats
-        self.r_format = {
-            'add': '100000', 'sub': '100010', 'and': '100100', 'or': '100101', 'slt': '101010', 'nor': '100111',
-            'sll': '000000', 'srl': '000010', 'sra': '000011', 'sltu': '101011', 'div': '011010', 'mult': '011000',
-            'jr': '001000', 'xor': '100110', 'nor': '100111', 'mfhi': '010000', 'mflo': '010010', 'mthi': '010001', 'mtlo': '010011'
-        }
-        
-        self.i_format = {
-            'addi': '001000', 'andi': '001100', 'ori': '001101', 'beq': '000100', 'bne': '000101', 'lw': '100011',
-            'sw': '101011', 'slti': '001010', 'xori': '001110', 'lui': '001111', 'sltiu': '001011', 'bgez': '000001',
-            'bgtz': '000111', 'blez': '000110', 'bltz': '000001', 
-            'lh': '100001', 'lhu': '100101', 'lb': '100000', 'lbu': '100100', 
-            'sh': '101001', 'sb': '101000', 'syscall': '000000'  # Syscall opcode
-        }
-        
-        self.j_format = {'j': '000010', 'jal': '000011'}
-        
-        # Register mappings
-        self.registers = {
-            '$0': '00000', '$at': '00001', '$v0': '00010', '$v1': '00011', '$a0': '00100', '$a1': '00101', '$a2': '00110', '$a3': '00111',
-            '$t0': '01000', '$t1': '01001', '$t2': '01010', '$t3': '01011', '$t4': '01100', '$t5': '01101', '$t6': '01110', '$t7': '01111',
-            '$s0': '10000', '$s1': '10001', '$s2': '10010', '$s3': '10011', '$s4': '10100', '$s5': '10101', '$s6': '10110', '$s7': '10111',
-            '$t8': '11000', '$t9': '11001', '$k0':'11010','$k1':'11011', '$gp': '11100', '$sp': '11101', '$fp': '11110', '$ra': '11111'
-        }
+        self.words = array('I')
+        self.data = bytearray()
+        self.data_base = DATA_BASE
+        self.in_data = False
+        self.text_labels = {}  # name -> instruction index
+        self.data_labels = {}  # name -> byte address
+        self.pending_labels = []  # data labels waiting for the next directive's alignment
+        self.fixups = {}  # label -> [(word index or data offset, field, line number)] of forward references
 
+    def define(self, label, line_number):
+        if label in self.text_labels or label in self.data_labels:
+            raise AssemblyError(f"line {line_number}: duplicate label {label!r}")
+        if self.in_data:
+            self.data_labels[label] = self.data_base + len(self.data)
+        else:
+            self.text_labels[label] = len(self.words)
+        for index, field, reference_line in self.fixups.pop(label, ()):
+            self.patch(index, field, label, reference_line)
+
+    def define_pending(self, line_number):
+        for label in self.pending_labels:
+            self.define(label, line_number)
+        self.pending_labels.clear()
+
+    def value(self, label, field, index):
+        """Bits for `label` in `field` of the word at `index`."""
+        if label in self.text_labels:
+            target = self.text_labels[label]
+            if field == OFFSET or field == TARGET:
+                return (target - index - 1) & (TARGET_MASK if field == TARGET else IMMEDIATE_MASK)
+            address = TEXT_BASE + 4 * target
+        elif field == TARGET:
+            raise ValueError(f"cannot jump to data label {label!r}")
+        else:
+            address = self.data_labels[label]
+        if field == HIGH:
+            return (address + 0x8000) >> 16 & IMMEDIATE_MASK  # adjusted for the sign-extending addi
+        if field == LOW:
+            return address & IMMEDIATE_MASK
+        if field == DATA_WORD:
+            return address
+        if address > 0x7FFF:
+            raise ValueError(f"address of {label!r} ({address:#x}) does not fit a 16-bit immediate; load it with la")
+        return address
+
+    def reference(self, index, field, label, line_number):
+        """Value of `label` for `field`, or 0 with a fixup if it is not defined yet."""
+        if label in self.text_labels or label in self.data_labels:
+            try:
+                return self.value(label, field, index)
+            except ValueError as e:
+                raise AssemblyError(f"line {line_number}: {e}") from None
+        self.fixups.setdefault(label, []).append((index, field, line_number))
+        return 0
+
+    def patch(self, index, field, label, line_number):
+        try:
+            value = self.value(label, field, index)
+        except ValueError as e:
+            raise AssemblyError(f"line {line_number}: {e}") from None
+        if field == DATA_WORD:
+            self.data[index:index + 4] = value.to_bytes(4, 'big')
+        else:
+            self.words[index] |= value
+
+    def align(self, size):
+        self.data += bytes(-len(self.data) % size)
+
+
+class MIPSAssembler:
+    """
+    Single-pass assembler from MIPS assembly to a ProgramImage.
+
+    Each line is tokenized once and encoded straight to an int with the
+    opcode tables above. Branch and jump targets are emitted as word offsets
+    from the next instruction. References to labels defined earlier are
+    resolved immediately. Forward references wait as fixups and are patched
+    when their label is defined. So only the output, the label table and the
+    unresolved fixups are held in memory, never the source.
+
+    `.text` and `.data [address]` switch segments. Instructions go at
+    TEXT_BASE and data at DATA_BASE unless another address is given. In
+    .data, `.word`, `.half` and `.byte` take values (`.word` also takes labels,
+    and `value:count` repeats a value). `.space n`, `.ascii`/`.asciiz "text"`
+    and `.align n` (to 2**n bytes) are supported too; `.word` and `.half`
+    align themselves. Data labels are absolute addresses. They can be used
+    as load/store offsets and immediates below 0x8000, and `la rt, label`
+    loads any address. `li rt, value` loads any 32-bit constant.
+    """
     def decimal_to_binary(self, value, bits):
         """Convert decimal or hexadecimal string to binary with specified number of bits"""
-        if isinstance(value, str):
-            if value.startswith('0x') or value.startswith('0X'):  # If value is hex
-                decimal = int(value, 16)
-            else:  # If value is decimal
-                decimal = int(value)
-        else:
-            decimal = value
-
-        if decimal < 0:
-            # Handle negative numbers using 2's complement
-            decimal = (1 << bits) + decimal
-        binary = bin(decimal)[2:].zfill(bits)
-        return binary[-bits:]
-
-    def parse_instruction(self, instruction, labels,inst_line_num):
-        """Parse MIPS instruction into components and resolve labels"""
-        instruction = instruction.split('#')[0].strip()
-        parts = instruction.replace(',', '').split()
-        op = parts[0].lower()
-        operands = parts[1:]
-
-        # Check if the last operand is a label and replace it with the resolved address/offset
-        if operands and operands[-1] in labels:
-            operands[-1] = str(labels[operands[-1]]-inst_line_num)  # Resolve label to its corresponding address or offset
-        return op, operands
-
-    def resolve_labels(self, instructions):
-        """First pass: Resolve label addresses in the instruction list"""
-        labels = {}
-        resolved_instructions = []
-        line_number = 0
+        decimal = parse_int(value) if isinstance(value, str) else value
+        return format(decimal & ((1 << bits) - 1), f'0{bits}b')
 
-        # Identify labels and store their line numbers
-        for instruction in instructions:
-            if ':' in instruction:  # It's a label
-                label = instruction.split(':')[0].strip()
-                labels[label] = line_number
-                continue  # Skip the label itself, don't add it as an instruction
+    def encode(self, kind, word, operands):
+        """
+        Encode one instruction's operands into `word`. Returns the word and the
+        label in its immediate/target field, if any (left as 0 for the caller).
+        Raises KeyError for an unknown register and ValueError for bad operands.
+        """
+        label = None
+        register = REGISTERS
+        if kind == IMMEDIATE:
+            rt, rs, immediate = operands
+            word |= register[rs] << 21 | register[rt] << 16
+            if is_label(immediate):
+                label = immediate
             else:
-                resolved_instructions.append(instruction)
-                line_number += 1
-
-        # Second pass: Replace labels with their resolved addresses
-        for i, instruction in enumerate(resolved_instructions):
-            op, operands = self.parse_instruction(instruction, labels,i+1)
-            resolved_instructions[i] = f"{op} " + ", ".join(operands)
-        
-        return resolved_instructions, labels
-    
-    def check_register_validity(self, reg):
-        """Ensure register is valid and $0 is not changed"""
-        if reg not in self.registers:
-            raise ValueError(f"Invalid register: {reg}")
-
-    def assemble_r_format(self, op, operands):
-        """Convert R-format instruction to machine code"""
-        opcode = '000000'
-        
-        if op in ['sll', 'srl', 'sra']:
-            rd, rt, shamt = operands[0], operands[1], int(operands[2])
-            self.check_register_validity(rd)
-            self.check_register_validity(rt)
-            machine_code = opcode + '00000' + self.registers[rt] + self.registers[rd] + self.decimal_to_binary(shamt, 5) + self.r_format[op]
-        elif op == 'jr':
-            rs = operands[0]
-            self.check_register_validity(rs)
-            machine_code = opcode + self.registers[rs] + '000000000000000' + self.r_format[op]
-        else:
-            rd, rs, rt = operands[0], operands[1], operands[2]
-            self.check_register_validity(rd)
-            self.check_register_validity(rs)
-            self.check_register_validity(rt)
-            machine_code = opcode + self.registers[rs] + self.registers[rt] + self.registers[rd] + '00000' + self.r_format[op]
-        
-        return machine_code
-
-    def assemble_i_format(self, op, operands):
-        """Convert I-format instruction to machine code"""
-        opcode = self.i_format[op]
-        
-        if op in ['lw', 'sw', 'lh', 'lhu', 'lb', 'lbu', 'sh', 'sb']:
-            rt, offset_base = operands[0], operands[1]
-            offset, base = offset_base.split('(')
-            base = base.rstrip(')')
-            self.check_register_validity(rt)
-            self.check_register_validity(base)
-            machine_code = opcode + self.registers[base] + self.registers[rt] + self.decimal_to_binary(offset, 16)
-        elif op in ['bgez', 'bgtz', 'blez', 'bltz']:
-            rs, immediate = operands[0], operands[1]
-            self.check_register_validity(rs)
-            machine_code = opcode + self.registers[rs] + '00000' + self.decimal_to_binary(immediate, 16)
+                word |= parse_int(immediate) & IMMEDIATE_MASK
+        elif kind == R3:
+            rd, rs, rt = operands
+            word |= register[rs] << 21 | register[rt] << 16 | register[rd] << 11
+        elif kind == MEMORY:
+            rt, address = operands
+            offset, _, base = address.partition('(')
+            word |= register[base.rstrip(')') or '$0'] << 21 | register[rt] << 16
+            if offset and is_label(offset):
+                label = offset
+            elif offset:
+                word |= parse_int(offset) & IMMEDIATE_MASK
+        elif kind == SHIFT:
+            rd, rt, shamt = operands
+            word |= register[rt] << 16 | register[rd] << 11 | (parse_int(shamt) & 0x1F) << 6
+        elif kind == JUMP:
+            (target,) = operands
+            if is_label(target):
+                label = target
+            else:
+                word |= parse_int(target) & TARGET_MASK
+        elif kind == BRANCH_Z:
+            rs, immediate = operands
+            word |= register[rs] << 21
+            if is_label(immediate):
+                label = immediate
+            else:
+                word |= parse_int(immediate) & IMMEDIATE_MASK
+        elif kind == LUI:
+            rt, immediate = operands
+            word |= register[rt] << 16 | parse_int(immediate) & IMMEDIATE_MASK
+        elif kind == JR:
+            (rs,) = operands
+            word |= register[rs] << 21
+        return word, label
+
+    def expand(self, state, op, operands, line_number):
+        """Emit the instructions for a pseudo-instruction."""
+        words = state.words
+        if op == 'la':
+            rt, label = operands
+            reg = REGISTERS[rt]
+            if not is_label(label):
+                raise ValueError(f"expected a label, got {label!r}")
+            words.append(OPCODES['lui'][1] | reg << 16 | state.reference(len(words), HIGH, label, line_number))
+            words.append(OPCODES['addi'][1] | reg << 21 | reg << 16 | state.reference(len(words), LOW, label, line_number))
+        else:  # li
+            rt, value = operands
+            reg = REGISTERS[rt]
+            value = parse_int(value)
+            if not -2**31 <= value < 2**32:
+                raise ValueError(f"li value {value} does not fit in 32 bits")
+            if -0x8000 <= value < 0x8000:
+                words.append(OPCODES['addi'][1] | reg << 16 | value & IMMEDIATE_MASK)
+            else:
+                words.append(OPCODES['lui'][1] | reg << 16 | (value + 0x8000) >> 16 & IMMEDIATE_MASK)
+                words.append(OPCODES['addi'][1] | reg << 21 | reg << 16 | value & IMMEDIATE_MASK)
+
+    def directive(self, state, name, args, line_number):
+        """Apply an assembler directive; `args` is the rest of the line."""
+        if name == '.text' or name == '.data':
+            state.define_pending(line_number)
+            state.in_data = name == '.data'
+            if state.in_data and args.strip():
+                if state.data:
+                    raise ValueError(".data address must be given before any data")
+                state.data_base = parse_int(args.strip())
+            return
+        if name in ('.globl', '.global'):
+            return  # every label is visible in a single source file
+        if not state.in_data:
+            raise ValueError(f"{name} is only allowed in .data")
+        data = state.data
+        if name in DATA_SIZES:
+            size = DATA_SIZES[name]
+            values = args.replace(',', ' ').split()
+            if not values:
+                raise ValueError(f"{name} needs at least one value")
+            state.align(size)
+            state.define_pending(line_number)
+            for value in values:
+                value, _, count = value.partition(':')
+                count = parse_int(count) if count else 1
+                if size == 4 and is_label(value):
+                    for _ in range(count):
+                        data += state.reference(len(data), DATA_WORD, value, line_number).to_bytes(4, 'big')
+                else:
+                    data += (parse_int(value) & ((1 << 8 * size) - 1)).to_bytes(size, 'big') * count
+        elif name == '.space':
+            state.define_pending(line_number)
+            data += bytes(parse_int(args.strip()))
+        elif name == '.align':
+            state.align(1 << parse_int(args.strip()))
+            state.define_pending(line_number)
+        elif name == '.ascii' or name == '.asciiz':
+            try:
+                text = ast.literal_eval(args.strip())
+            except (ValueError, SyntaxError):
+                text = None
+            if not isinstance(text, str):
+                raise ValueError(f"{name} needs a quoted string")
+            state.define_pending(line_number)
+            data += text.encode() + (b"\0" if name == '.asciiz' else b"")
         else:
-            rt, rs, immediate = operands[0], operands[1], operands[2]
-            self.check_register_validity(rt)
-            self.check_register_validity(rs)
-            machine_code = opcode + self.registers[rs] + self.registers[rt] + self.decimal_to_binary(immediate, 16)
-        
-        return machine_code
-
-    def assemble_j_format(self, op, operands):
-        """Convert J-format instruction to machine code"""
-        opcode = self.j_format[op]
-        address = self.decimal_to_binary(int(operands[0]), 26)
-        return opcode + address
-
-    def assemble_syscall(self):
-        """Convert syscall to machine code"""
-        return '00000000000000000000000000001100'  # Syscall in R-format with funct code 0xC
+            raise ValueError(f"unknown directive {name}")
+
+    def assemble_state(self, lines):
+        state = _Assembly()
+        words = state.words
+        encode = self.encode
+        in_data = False
+        line_number = 0
+        for line_number, line in enumerate(lines, 1):
+            code = line.split('#', 1)[0] if '"' not in line else strip_comment(line)
+            label = None
+            if ':' in code:
+                match = _LABEL.match(code)
+                if match:
+                    label = match.group(1)
+                    code = code[match.end():]
+            operands = code.replace(',', ' ').split()
+            if label is not None:
+                if in_data:
+                    state.pending_labels.append(label)
+                else:
+                    state.define(label, line_number)
+            if not operands:
+                continue
+            op = operands[0].lower()
+            entry = OPCODES.get(op)
+            try:
+                if entry is None or in_data:
+                    if op[0] == '.':
+                        self.directive(state, op, code.split(None, 1)[1] if len(operands) > 1 else "", line_number)
+                        in_data = state.in_data
+                        continue
+                    if in_data:
+                        raise ValueError(f"instruction {op!r} in .data")
+                    if op not in PSEUDO_OPS:
+                        raise ValueError(f"Unknown instruction: {op}")
+                    self.expand(state, op, operands[1:], line_number)
+                    continue
+                kind, word = entry
+                word, label = encode(kind, word, operands[1:])
+            except KeyError as e:
+                raise AssemblyError(f"line {line_number}: Invalid register: {e.args[0]}") from None
+            except AssemblyError:
+                raise
+            except ValueError as e:
+                # Also raised when unpacking the wrong number of operands
+                raise AssemblyError(f"line {line_number}: {line.strip()!r}: {e}") from None
+            if label is not None:
+                word |= state.reference(len(words), LABEL_FIELDS[kind], label, line_number)
+            words.append(word)
+
+        state.define_pending(line_number)
+        if state.fixups:
+            label, references = min(state.fixups.items(), key=lambda item: item[1][0][2])
+            raise AssemblyError(f"line {references[0][2]}: undefined label {label!r}")
+        if state.data and TEXT_BASE + 4 * len(words) > state.data_base:
+            raise AssemblyError(f"the text ({4 * len(words)} bytes) runs into .data at {state.data_base:#x}; "
+                             "give .data a higher address")
+        return state
+
+    def assemble(self, lines):
+        """
+        Assemble an iterable of source lines (e.g. an open file) into a
+        ProgramImage. Raises AssemblyError (a ValueError) naming the line for
+        unknown instructions or directives, bad operands and undefined or
+        duplicate labels.
+        """
+        state = self.assemble_state(lines)
+        symbols = {label: TEXT_BASE + 4 * index for label, index in state.text_labels.items()}
+        symbols.update(state.data_labels)
+        return ProgramImage.from_words(state.words, state.data, state.data_base, symbols)
+
+    def assemble_words(self, lines):
+        """The instruction words of `lines` as an array (any .data is dropped)."""
+        return self.assemble_state(lines).words
 
     def assemble_binary(self, instructions):
-        """Convert MIPS instructions to binary machine code"""
-        instructions, labels = self.resolve_labels(instructions)
-        binary_codes = []
-        for i, instruction in enumerate(instructions):
-            op, operands = self.parse_instruction(instruction, labels, i+1)
-            if op == 'syscall':
-                binary = self.assemble_syscall()
-            elif op in self.r_format:
-                binary = self.assemble_r_format(op, operands)
-            elif op in self.i_format:
-                binary = self.assemble_i_format(op, operands)
-            elif op in self.j_format:
-                binary = self.assemble_j_format(op, operands)
-            else:
-                raise ValueError(f"Unknown instruction: {op}")
-            
-            binary_codes.append(binary)
-        
-        return binary_codes
+        """Convert MIPS instructions to binary machine code strings (text segment only)"""
+        return [format(word, '032b') for word in self.assemble_words(instructions)]
+
+    def assemble_file(self, asm_path):
+        """Assemble a source file into a ProgramImage, streaming it line by line."""
+        with open(asm_path, 'r') as file:
+            return self.assemble(file)
+
+    def write_binary(self, words, file_path):
+        """Write words as one 32-character binary string per line, the format MIPSParser reads."""
+        with open(file_path, 'w') as file:
+            file.write(words_to_binary(words))
 
     def format_machine_codes(self, binary_codes):
         """Convert binary codes to hexadecimal format and format as string"""
@@ -163,49 +398,46 @@ class MIPSAssembler:
         return formatted_codes
 
     def parse_asm(self, file_path):
-        instructions = []
         with open(file_path, 'r') as file:
-            for line in file:
-                # Strip whitespace and ignore empty lines or comments
-                line = line.strip()
-                if line and not line.startswith('#'):  # Exclude comments if any
-                    instructions.append(line)
+            return self.parse_asm_lines(file)
+
+    def parse_asm_lines(self, lines):
+        """Like parse_asm, for source already in memory (e.g. `text.splitlines()`)."""
+        instructions = []
+        for line in lines:
+            # Strip whitespace and ignore empty lines or comments
+            line = line.strip()
+            if line and not line.startswith('#'):  # Exclude comments if any
+                instructions.append(line)
         return instructions
 
 def main():
+    arg_parser = argparse.ArgumentParser(description="Assemble a MIPS source file to binary machine code.")
+    arg_parser.add_argument('source', help="assembly (.asm) file")
+    arg_parser.add_argument('-o', '--output', help="write a program image (.img) or one binary instruction per line "
+                                                   "(any other name) here instead of printing")
+    args = arg_parser.parse_args()
+
     assembler = MIPSAssembler()
-    
-    # Replace with the path to your assembly code file
-    test_instructions = assembler.parse_asm("../assets/tests/lh_lbu_test.asm")
+    image = assembler.assemble_file(args.source)
+    words = image.text_words()
+    if args.output and args.output.endswith('.img'):
+        image.save(args.output)
+        print(f"{len(words)} instructions and {len(image.symbols)} symbols written to {args.output}")
+        return
+    if args.output:
+        if len(image.segments) > 1:
+            arg_parser.error("the program has a .data segment; write a .img file to keep it")
+        assembler.write_binary(words, args.output)
+        print(f"{len(words)} instructions written to {args.output}")
+        return
 
     print("MIPS Assembly to Machine Code Conversion:")
     print("-" * 60)
-    print(f"{'Instruction':<25} {'Hex':<12} Binary")
-    print("-" * 60)
-
-    machine_codes = assembler.assemble_binary(test_instructions)
-    format_code = assembler.format_machine_codes(machine_codes)
-    
-    save=True
-    if (save):
-        #write machine code to text file
-        file_path="../assets/tests/lh_lbu_test.txt"
-        with open(file_path, 'w') as file:
-                for code in machine_codes:
-                    file.write(f"{code}\n")
-        print(f"\nMachine code successfully written to {file_path}")
-
-    for code in format_code:
+    for code in assembler.format_machine_codes([f"{word:032b}" for word in words]):
         print(code)
-
-def check_resolve_inst():
-    assembler = MIPSAssembler()
-    
-    # Replace with the path to your assembly code file
-    test_instructions = assembler.parse_asm("../assets/mipsasm_1.asm")
-    instructions, labels = assembler.resolve_labels(test_instructions)
-    print(instructions,'------------',labels)
+    for address, data in image.segments[1:]:
+        print(f"\n.data at {address:#x}: {len(data)} bytes")
 
 if __name__ == "__main__":
     main()
-    # check_resolve_inst()
@@ -1,69 +1,234 @@
+"""
+Conversion between instruction words and hex or binary text.
+
+The *_to_words functions convert a whole program (one 32-bit word per line)
+at once. When every line has the same width the text is viewed as a NumPy
+array of rows and decoded in bulk (bytes.fromhex for hex, np.packbits for
+binary); anything else is converted line by line. Blank lines and '#'
+comments are ignored, and every invalid line is reported, with its line
+number, in one ConversionError.
+"""
+import string
+from array import array
+
+import numpy as np
+
+HEX_DIGITS = string.hexdigits
+NEWLINE = ord('\n')
+REPORTED_ERRORS = 10  # invalid lines listed in a ConversionError message
+
+
+class ConversionError(ValueError):
+    """Invalid lines in a program; `errors` is a list of (line number, message)."""
+    def __init__(self, errors):
+        self.errors = errors
+        lines = [f"line {number}: {message}" for number, message in errors[:REPORTED_ERRORS]]
+        if len(errors) > REPORTED_ERRORS:
+            lines.append(f"... and {len(errors) - REPORTED_ERRORS} more invalid lines")
+        super().__init__("\n".join(lines))
+
+
 def hex_to_binary(hex_string):
-    # Remove '0x' prefix if present
-    hex_string = hex_string.lower().replace('0x', '')
-    
-    # Dictionary to map hex digits to 4-bit binary strings
-    hex_to_bin = {
-        '0': '0000', '1': '0001', '2': '0010', '3': '0011',
-        '4': '0100', '5': '0101', '6': '0110', '7': '0111',
-        '8': '1000', '9': '1001', 'a': '1010', 'b': '1011',
-        'c': '1100', 'd': '1101', 'e': '1110', 'f': '1111'
-    }
-    
-    return ''.join(hex_to_bin[char] for char in hex_string)
+    """Four binary digits per hex digit of `hex_string` ('0x' prefixes are removed)."""
+    digits = hex_string.lower().replace('0x', '')
+    return format(int(digits, 16), f'0{4 * len(digits)}b') if digits else ''
+
 
 def binary_to_hex(binary_string):
-    # Ensure the binary string length is a multiple of 4
-    binary_string = binary_string.zfill((len(binary_string) + 3) // 4 * 4)
-    
-    # Dictionary to map 4-bit binary strings to hex digits
-    bin_to_hex = {
-        '0000': '0', '0001': '1', '0010': '2', '0011': '3',
-        '0100': '4', '0101': '5', '0110': '6', '0111': '7',
-        '1000': '8', '1001': '9', '1010': 'a', '1011': 'b',
-        '1100': 'c', '1101': 'd', '1110': 'e', '1111': 'f'
-    }
-    
-    hex_result = ''
-    for i in range(0, len(binary_string), 4):
-        hex_result += bin_to_hex[binary_string[i:i+4]]
-    
-    return hex_result
+    """Hex digits of `binary_string`, zero-padded on the left to a whole number of digits."""
+    return format(int(binary_string, 2), f'0{(len(binary_string) + 3) // 4}x') if binary_string else ''
 
-def parse_hex_file(file_path):
-    binary_instructions = []
 
-    try:
-        # Open the hex file
-        with open(file_path, 'r', encoding='utf-8') as file:
-            for line in file:
-                hex_instruction = line.strip()  # Remove any surrounding whitespace
-                if hex_instruction:  # Check if line is not empty
-                    binary_instruction = hex_to_binary(hex_instruction)
-                    binary_instructions.append(binary_instruction)
+def to_bytes(source):
+    """Program text as bytes, from bytes, a str, a text or binary file, or an iterable of lines."""
+    if hasattr(source, 'read'):
+        source = source.read()
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return bytes(source)
+    if isinstance(source, str):
+        return source.encode()
+    return "".join(line if line.endswith("\n") else line + "\n" for line in source).encode()
+
+
+def is_hex_text(source):
+    """
+    True if the first line of `source` that holds a word is a hex word rather
+    than 32 binary digits. Blank lines, comments and invalid lines are passed
+    over, so a header doesn't decide the format; text with no valid word at
+    all counts as binary.
+    """
+    for line in to_bytes(source).decode(errors='replace').split("\n"):
+        text = _content(line)
+        if _binary_word(text) is not None:
+            return False
+        if _hex_word(text) is not None:
+            return True
+    return False
+
+
+def hex_to_words(source, skip_invalid=False):
+    """
+    Words of hex text with one word per line: up to 8 digits, optionally
+    prefixed with '0x'. Blank lines and comments are ignored; other lines
+    raise ConversionError, or are skipped if `skip_invalid`.
+    """
+    data = to_bytes(source)
+    rows = _rows(data, (8, 10))
+    if rows is not None:
+        prefixed = rows.shape[1] == 10
+        if not prefixed or ((rows[:, 0] == ord('0')).all() and (rows[:, 1] | 0x20 == ord('x')).all()):
+            digits = rows[:, 2:] if prefixed else rows
+            try:
+                raw = bytes.fromhex(digits.tobytes().decode('ascii'))
+            except ValueError:  # also UnicodeDecodeError; the line-by-line pass reports it
+                raw = b""
+            if len(raw) == 4 * len(rows):
+                return _word_array(np.frombuffer(raw, '>u4'))
+    return _convert_lines(data, _hex_word, "expected a hex word of up to 8 digits", skip_invalid)
+
+
+def binary_to_words(source, skip_invalid=False):
+    """
+    Words of binary text with 32 binary digits per line. Blank lines and
+    comments are ignored; other lines raise ConversionError, or are skipped
+    if `skip_invalid`.
+    """
+    data = to_bytes(source)
+    rows = _rows(data, (32,))
+    if rows is not None:
+        bits = rows - ord('0')  # wraps around for characters below '0'
+        if (bits <= 1).all():
+            return _word_array(np.packbits(bits, axis=1).view('>u4').ravel())
+    return _convert_lines(data, _binary_word, "expected 32 binary digits", skip_invalid)
+
+
+def words_to_hex(words):
+    """Text with each word as 8 hex digits on its own line."""
+    text = np.asarray(words, dtype=np.uint32).astype('>u4').tobytes().hex().encode()
+    return _join_rows(np.frombuffer(text, np.uint8).reshape(-1, 8))
+
+
+def words_to_binary(words):
+    """Text with each word as 32 binary digits on its own line, the format MIPSParser reads."""
+    big_endian = np.asarray(words, dtype=np.uint32).astype('>u4')
+    return _join_rows(np.unpackbits(big_endian.view(np.uint8)).reshape(-1, 32) + ord('0'))
 
+
+def _rows(data, widths):
+    """
+    `data` as a 2-D array of its lines (newlines dropped) if they all have
+    the same length, one of `widths`; otherwise None.
+    """
+    if b"\r" in data:
+        data = data.replace(b"\r", b"")
+    data = data.rstrip() + b"\n"
+    width = data.find(b"\n")
+    if width not in widths or len(data) % (width + 1):
+        return None
+    rows = np.frombuffer(data, np.uint8).reshape(-1, width + 1)
+    if not (rows[:, width] == NEWLINE).all():
+        return None
+    return rows[:, :width]
+
+
+def _join_rows(rows):
+    """Rows of ASCII codes as text, one row per line."""
+    text = np.empty((len(rows), rows.shape[1] + 1), np.uint8)
+    text[:, :-1] = rows
+    text[:, -1] = NEWLINE
+    return text.tobytes().decode('ascii')
+
+
+def _word_array(words):
+    """An array('I') of `words` (any NumPy integer array)."""
+    result = array('I')
+    result.frombytes(words.astype(np.uint32).tobytes())
+    return result
+
+
+def _content(line):
+    """A line without its '#' comment and surrounding whitespace."""
+    return line.split('#', 1)[0].strip()
+
+
+def _hex_word(text):
+    digits = text[2:] if text[:2] in ('0x', '0X') else text
+    if 0 < len(digits) <= 8 and not digits.strip(HEX_DIGITS):
+        return int(digits, 16)
+    return None
+
+
+def _binary_word(text):
+    if len(text) == 32 and not text.strip('01'):
+        return int(text, 2)
+    return None
+
+
+def _convert_lines(data, convert, expected, skip_invalid):
+    """Words of each line of `data` that isn't blank or a comment, converted by `convert` (None if invalid)."""
+    words = array('I')
+    errors = []
+    for number, line in enumerate(data.decode(errors='replace').split("\n"), 1):
+        text = _content(line)
+        if not text:
+            continue
+        word = convert(text)
+        if word is not None:
+            words.append(word)
+        elif not skip_invalid:
+            errors.append((number, f"{expected}, got {text[:40]!r}"))
+    if errors:
+        raise ConversionError(errors)
+    return words
+
+
+def parse_hex_file(file_path):
+    """Binary instruction strings of a hex file, one word per line (see hex_to_words)."""
+    try:
+        with open(file_path, 'rb') as file:
+            words = hex_to_words(file.read())
     except FileNotFoundError:
         print(f"Error: The file '{file_path}' was not found.")
-    except Exception as e:
-        print(f"An error occurred: {e}")
+        return []
+    return words_to_binary(words).splitlines()
 
-    return binary_instructions
 
 def write_binary_to_file(binary_instructions, output_file_path):
     try:
         with open(output_file_path, 'w', encoding='utf-8') as file:
-            for binary_instruction in binary_instructions:
-                file.write(binary_instruction + '\n')
+            file.writelines(binary_instruction + '\n' for binary_instruction in binary_instructions)
         print(f"Binary instructions written to '{output_file_path}' successfully.")
-    except Exception as e:
+    except OSError as e:
         print(f"An error occurred while writing to the file: {e}")
 
 
 # Example usage
 if __name__=="__main__":
-    print(hex_to_binary('2408001e'))  # Output: 0001101000111111
+    print(hex_to_binary('2408001e'))  # Output: 00100100000010000000000000011110
     print(binary_to_hex('0001101000111111'))  # Output: 1a3f
 
-    ptmp=parse_hex_file("assets\hex.txt")
-    print(ptmp)
-    write_binary_to_file(ptmp,"assets\\binary.txt")
\ No newline at end of file
+    words = [0x2408001E, 0x00851020, 0xFFFFFFFF, 0]
+    assert list(hex_to_words(words_to_hex(words))) == words
+    assert list(hex_to_words("0x2408001E\r\n0x00851020\r\n0xffffffff\r\n0x0\r\n")) == words  # bulk, then per line
+    assert list(hex_to_words("2408001e\n\n  851020\n")) == [0x2408001E, 0x851020]
+    assert list(binary_to_words(words_to_binary(words))) == words
+    assert list(binary_to_words(["# listing", f"{words[0]:032b}", ""], skip_invalid=True)) == words[:1]
+    assert is_hex_text("\n0x2408001e\n") and not is_hex_text(words_to_binary(words))
+    # A header or comment doesn't decide the format, and comments are skipped
+    assert is_hex_text("# header\n0x2408001e  # li $t0, 30\n0x00000000\n")
+    assert list(hex_to_words("# header\n0x2408001e  # li $t0, 30\n0x00000000\n")) == [0x2408001E, 0]
+    assert not is_hex_text("# header\n" + "0" * 31 + "\n" + "0" * 32 + "\n")
+    try:
+        binary_to_words("0" * 31 + "\n" + "0" * 32 + "\n")
+    except ConversionError as e:
+        assert [number for number, _ in e.errors] == [1]
+    else:
+        raise AssertionError("a short binary line was not reported")
+    try:
+        hex_to_words("2408001e\n2408g01e\n00851020\n123456789\n")
+    except ConversionError as e:
+        print(e)
+        assert [number for number, _ in e.errors] == [2, 4]
+    else:
+        raise AssertionError("invalid lines were not reported")
+    print("Conversion self-check passed")
@@ -0,0 +1,283 @@
+"""
+Random MIPS programs for stress, benchmark and differential testing.
+
+Programs use only instructions every simulator executes, and always
+terminate. Control flow is limited to forward branches and jumps within a
+block, counted loops whose counters random code never writes, and calls to
+leaf functions. Loads and stores stay inside a data region of the configured
+footprint, so code is never overwritten. How often each kind of instruction
+appears, and how far back its operands were written (which decides whether
+HazardManager forwards from EX/MEM or MEM/WB, or stalls on a load), are set
+by GeneratorConfig.
+
+    python -m utils.program_generator --seed 7 --length 500 -o random.asm
+    python -m utils.program_generator --count 100 --length 2000 -o programs/
+"""
+import argparse
+import os
+import random
+from typing import NamedTuple
+
+from program_image import DATA_BASE
+
+# Registers random code reads and writes; loop counters, the data base and
+# the address mask are reserved so that loops end and accesses stay in bounds
+POOL = ('$v0', '$v1', '$a0', '$a1', '$a2', '$a3',
+        '$t0', '$t1', '$t2', '$t3', '$t4', '$t5', '$t6', '$t7', '$t8', '$t9')
+COUNTERS = ('$s0', '$s1', '$s2', '$s3')
+BASE = '$s6'
+MASK = '$s7'
+
+R3_OPS = ('add', 'sub', 'and', 'or', 'xor', 'nor', 'slt', 'sltu')
+IMMEDIATE_OPS = ('addi', 'andi', 'ori', 'xori', 'slti', 'sltiu')
+SHIFT_OPS = ('sll', 'srl', 'sra')
+LOAD_OPS = {'lw': 4, 'lh': 2, 'lhu': 2, 'lb': 1, 'lbu': 1}  # mnemonic -> access size
+STORE_OPS = {'sw': 4, 'sh': 2, 'sb': 1}
+
+IO_BASE, IO_SIZE = 2000, 50  # components.io.MemoryMappedIO defaults
+NOP = "sll $0, $0, 0"
+
+DEFAULT_MIX = {'alu': 4, 'immediate': 3, 'shift': 1, 'lui': 0.5, 'load': 2, 'store': 1.5}
+
+
+class GeneratorConfig(NamedTuple):
+    """Shape of generated programs; densities are chances per generated instruction."""
+    length: int = 200  # instructions in the main body, not counting loop control and set-up
+    mix: dict = DEFAULT_MIX  # relative weights of 'alu', 'immediate', 'shift', 'lui', 'load', 'store'
+    branch_density: float = 0.1  # forward beq/bne/j
+    call_density: float = 0.02  # jal to a leaf function
+    io_density: float = 0.01  # stores to the I/O port
+    loop_density: float = 0.03  # counted loops opened
+    max_loop_depth: int = 2  # at most len(COUNTERS)
+    max_loop_body: int = 16
+    loop_iterations: tuple = (2, 8)
+    max_skip: int = 6  # instructions a forward branch or jump skips, at most
+    functions: int = 2
+    function_length: int = 10
+    dependency: dict = {1: 0.3, 2: 0.15, 3: 0.1}  # distance -> chance a source reads that instruction's result
+    footprint: int = 4096  # bytes of data, a power of two
+    indexed_fraction: float = 0.25  # loads/stores whose address is computed from data
+
+
+class ProgramGenerator:
+    """Generates one program from `config` and a seed; see GeneratorConfig."""
+    def __init__(self, config=GeneratorConfig(), seed=0):
+        footprint = config.footprint
+        if footprint < 8 or footprint & (footprint - 1):
+            raise ValueError(f"footprint must be a power of two of at least 8 bytes, not {footprint}")
+        if not 0 <= config.max_loop_depth <= len(COUNTERS):
+            raise ValueError(f"max_loop_depth must be between 0 and {len(COUNTERS)}")
+        if sum(config.dependency.values()) > 1:
+            raise ValueError("dependency chances add up to more than 1")
+        self.config = config
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.mix = list(config.mix)
+        self.mix_weights = [config.mix[kind] for kind in self.mix]
+        self.lines = []
+        self.words = 0  # text words emitted so far
+        self.history = []  # destination register of each emitted instruction, or None
+        self.labels = 0
+        self.io_gap = config.io_density > 0  # keep code out of the I/O port while it may be stored to
+
+    def generate(self):
+        """The program as a list of assembly source lines."""
+        config = self.config
+        rng = self.rng
+        self.lines.append(f"# Random program, seed {self.seed}: {config}")
+        self._emit(f"la {BASE}, data", words=2)
+        self._li(MASK, (config.footprint - 1) & ~3)
+        for register in POOL:
+            self._li(register, rng.randint(-2**31, 2**31 - 1))
+        self._block(config.length, depth=0, in_function=False)
+        self._emit("syscall")
+        for function in range(config.functions):
+            self.lines.append(f"func{function}:")
+            self._block(config.function_length, depth=config.max_loop_depth, in_function=True)
+            self._emit("jr $ra")
+
+        # Data above the text, word-initialised with random values
+        data_base = max(DATA_BASE, -(-4 * self.words // 0x1000) * 0x1000)
+        self.lines += [".data " + hex(data_base), "data:"]
+        initialised = min(config.footprint, 64 * 1024) // 4
+        for i in range(0, initialised, 8):
+            self.lines.append(".word " + ", ".join(str(rng.randint(-2**31, 2**31 - 1)) for _ in range(min(8, initialised - i))))
+        if config.footprint > 4 * initialised:
+            self.lines.append(f".space {config.footprint - 4 * initialised}")
+        return self.lines
+
+    # Emission -----------------------------------------------------------------
+
+    def _emit(self, line, words=1, destination=None):
+        if self.io_gap and self.words + words > IO_BASE // 4 - 1:
+            # Jump over the I/O port, leaving nops there for stores to overwrite
+            while self.words < IO_BASE // 4 - 1:
+                self._emit_word(NOP)
+            self.lines += ["j io_gap_end", *[NOP] * -(-IO_SIZE // 4), "io_gap_end:"]
+            self.words += 1 + -(-IO_SIZE // 4)
+            self.history.append(None)
+            self.io_gap = False
+        self.lines.append(line)
+        self.words += words
+        self.history.append(destination)
+
+    def _li(self, register, value):
+        # MIPSAssembler expands li to a single addi when the value fits in 16 bits
+        self._emit(f"li {register}, {value}", words=1 if -0x8000 <= value < 0x8000 else 2, destination=register)
+
+    def _emit_word(self, line):
+        self.lines.append(line)
+        self.words += 1
+        self.history.append(None)
+
+    def _label(self, prefix):
+        self.labels += 1
+        return f"{prefix}{self.labels}"
+
+    def _block(self, budget, depth, in_function):
+        """Emit `budget` instructions; forward branches land inside the block."""
+        config = self.config
+        rng = self.rng
+        pending = []  # [label, instructions left to skip]
+        emitted = 0
+        while emitted < budget:
+            r = rng.random()
+            if depth < config.max_loop_depth and r < config.loop_density:
+                self._place(pending, everything=True)
+                body = rng.randint(1, min(budget - emitted, config.max_loop_body))
+                counter = COUNTERS[depth]
+                label = self._label("loop")
+                self._emit(f"addi {counter}, $0, {rng.randint(*config.loop_iterations)}", destination=counter)
+                self.lines.append(f"{label}:")
+                self._block(body, depth + 1, in_function)
+                self._emit(f"addi {counter}, {counter}, -1", destination=counter)
+                self._emit(f"bne {counter}, $0, {label}")
+                emitted += body
+                continue
+            r -= config.loop_density
+            if r < config.branch_density:
+                label = self._label("skip")
+                if rng.random() < 0.2:
+                    self._emit(f"j {label}")
+                else:
+                    self._emit(f"{rng.choice(('beq', 'bne'))} {self._source()}, {self._source()}, {label}")
+                pending.append([label, rng.randint(1, config.max_skip) + 1])  # counted down once right away
+            elif r - config.branch_density < config.call_density and config.functions and not in_function:
+                self._emit(f"jal func{rng.randrange(config.functions)}")
+            elif r - config.branch_density - config.call_density < config.io_density:
+                size = rng.choice((4, 2, 1))
+                op = {4: 'sw', 2: 'sh', 1: 'sb'}[size]
+                self._emit(f"{op} {self._source()}, {IO_BASE + rng.randrange(0, IO_SIZE - size + 1, size)}($0)")
+            else:
+                self._instruction(rng.choices(self.mix, self.mix_weights)[0])
+            emitted += 1
+            self._place(pending)
+        self._place(pending, everything=True)
+
+    def _place(self, pending, everything=False):
+        """Count down the pending forward labels and place those that are due."""
+        for entry in list(pending):
+            entry[1] -= 1
+            if everything or entry[1] <= 0:
+                self.lines.append(f"{entry[0]}:")
+                pending.remove(entry)
+
+    # Instructions -------------------------------------------------------------
+
+    def _source(self):
+        """A register to read: the result of a recent instruction, at a random distance, or any."""
+        r = self.rng.random()
+        for distance, chance in self.config.dependency.items():
+            if r < chance:
+                if distance <= len(self.history) and self.history[-distance] is not None:
+                    return self.history[-distance]
+                break
+            r -= chance
+        return self.rng.choice(POOL)
+
+    def _instruction(self, kind):
+        rng = self.rng
+        destination = rng.choice(POOL)
+        if kind == 'alu':
+            self._emit(f"{rng.choice(R3_OPS)} {destination}, {self._source()}, {self._source()}", destination=destination)
+        elif kind == 'immediate':
+            self._emit(f"{rng.choice(IMMEDIATE_OPS)} {destination}, {self._source()}, {rng.randint(-32768, 32767)}",
+                       destination=destination)
+        elif kind == 'shift':
+            self._emit(f"{rng.choice(SHIFT_OPS)} {destination}, {self._source()}, {rng.randrange(32)}",
+                       destination=destination)
+        elif kind == 'lui':
+            self._emit(f"lui {destination}, {rng.randrange(0x10000)}", destination=destination)
+        elif kind in ('load', 'store'):
+            ops = LOAD_OPS if kind == 'load' else STORE_OPS
+            op = rng.choice(list(ops))
+            value = destination if kind == 'load' else self._source()
+            address = self._address(ops[op])
+            self._emit(f"{op} {value}, {address}", destination=destination if kind == 'load' else None)
+        else:
+            raise ValueError(f"unknown instruction kind {kind!r}")
+
+    def _address(self, size):
+        """A memory operand in the data region, emitting the address arithmetic it needs."""
+        rng = self.rng
+        if rng.random() < self.config.indexed_fraction:
+            # Data-dependent: (value & mask) + base, word aligned and within the footprint
+            temporary = rng.choice(POOL)
+            self._emit(f"and {temporary}, {self._source()}, {MASK}", destination=temporary)
+            self._emit(f"add {temporary}, {temporary}, {BASE}", destination=temporary)
+            return f"0({temporary})"
+        limit = min(self.config.footprint, 0x8000)
+        return f"{rng.randrange(0, limit - size + 1, size)}({BASE})"
+
+
+def generate_program(seed=0, config=GeneratorConfig()):
+    """Assembly source lines of the random program for `seed` and `config`."""
+    return ProgramGenerator(config, seed).generate()
+
+
+def _weights(text, convert=float):
+    """'key:weight,key:weight' as a dict."""
+    return {convert(key): float(value) for key, value in (item.split(':') for item in text.split(','))}
+
+
+def main():
+    defaults = GeneratorConfig()
+    arg_parser = argparse.ArgumentParser(description="Generate random, terminating MIPS programs.")
+    arg_parser.add_argument('--seed', type=int, default=0, help="seed of the (first) program")
+    arg_parser.add_argument('--count', type=int, default=1, help="programs to generate, with consecutive seeds")
+    arg_parser.add_argument('-o', '--output', help="output file, or directory if --count > 1 (default: stdout)")
+    arg_parser.add_argument('--length', type=int, default=defaults.length)
+    arg_parser.add_argument('--mix', type=_weights, default=defaults.mix,
+                            help="instruction weights, e.g. alu:4,immediate:3,shift:1,lui:0.5,load:2,store:1.5")
+    arg_parser.add_argument('--branch-density', type=float, default=defaults.branch_density)
+    arg_parser.add_argument('--call-density', type=float, default=defaults.call_density)
+    arg_parser.add_argument('--io-density', type=float, default=defaults.io_density)
+    arg_parser.add_argument('--loop-density', type=float, default=defaults.loop_density)
+    arg_parser.add_argument('--max-loop-depth', type=int, default=defaults.max_loop_depth)
+    arg_parser.add_argument('--dependency', type=lambda text: _weights(text, int), default=defaults.dependency,
+                            help="chance a source reads the result from N instructions back, e.g. 1:0.3,2:0.15,3:0.1")
+    arg_parser.add_argument('--footprint', type=int, default=defaults.footprint, help="data bytes (a power of two)")
+    args = arg_parser.parse_args()
+
+    config = defaults._replace(
+        length=args.length, mix=args.mix, branch_density=args.branch_density, call_density=args.call_density,
+        io_density=args.io_density, loop_density=args.loop_density, max_loop_depth=args.max_loop_depth,
+        dependency=args.dependency, footprint=args.footprint)
+    if args.count > 1:
+        if not args.output:
+            arg_parser.error("--count needs an output directory (-o)")
+        os.makedirs(args.output, exist_ok=True)
+    for seed in range(args.seed, args.seed + args.count):
+        source = "\n".join(generate_program(seed, config)) + "\n"
+        if args.count > 1:
+            with open(os.path.join(args.output, f"random_{seed}.asm"), 'w') as f:
+                f.write(source)
+        elif args.output:
+            with open(args.output, 'w') as f:
+                f.write(source)
+        else:
+            print(source, end="")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+import numpy as np
+
+from components.io import MemoryMappedIO
+from components.memory import Memory
+from components.registers import Registers
+from instructions import DecodeCache, Op
+from parser import MIPSParser
+
+
+class TextStoreError(ValueError):
+    """A store into the program text, which VectorizedInterpreter can't run."""
+
+
+class VectorizedInterpreter:
+    """
+    Lockstep functional simulation of one program over many initial states.
+
+    N machines ("lanes") share the program text but have their own register
+    files, an (N, 32) int32 array, and memories, an (N, size) uint8 array.
+    Each step executes one decoded instruction for all lanes at the same PC
+    with NumPy operations. When branch outcomes diverge, lanes are grouped by
+    PC and each group runs under its own mask until they meet again. Results
+    per lane match MIPSInterpreter with record_states=False.
+
+    Lanes share one decoded text, so stores into the text region
+    (self-modifying code) can't be simulated and raise TextStoreError, a
+    ValueError; run such programs on MIPSInterpreter.
+    """
+    def __init__(self, file_path=None, lanes=None, registers=None, memory=None, endianness='big', program=None):
+        image = MIPSParser().parse_image(file_path, program, endianness)
+        endianness = image.endianness  # an image file records its own byte order
+
+        # Default initial state is the scalar simulator's, broadcast to every lane
+        scalar_memory = image.create_memory()
+        scalar_registers = Registers(initialise=True)
+        if registers is None:
+            if lanes is None:
+                lanes = 1 if memory is None else len(memory)
+            registers = np.tile(np.array(scalar_registers.values, dtype=np.int32), (lanes, 1))
+        self.regs = np.array(registers, dtype=np.int32)
+        self.lanes = len(self.regs)
+        self.regs[:, 0] = 0
+        if memory is None:
+            memory = np.tile(np.frombuffer(bytes(scalar_memory.buffer), dtype=np.uint8), (self.lanes, 1))
+        self.mem = np.array(memory, dtype=np.uint8)
+        self.size = self.mem.shape[1]
+
+        # One shared copy of the program, used for decoding, and the program in every lane
+        self.text = Memory(size=self.size, endianness=endianness)
+        image.load_into(self.text)
+        for address, data in image.segments:
+            self.mem[:, address:address + len(data)] = np.frombuffer(data, dtype=np.uint8)
+        self.decode_cache = DecodeCache(self.text, image.text_start, image.text_end)
+        self.big_endian = endianness == 'big'
+
+        self.io = MemoryMappedIO()
+        self.io_memory = [[] for _ in range(self.lanes)]
+        self.pc = np.full(self.lanes, image.entry, dtype=np.int64)
+        self.halted = np.zeros(self.lanes, dtype=bool)
+        self.instruction_count = np.zeros(self.lanes, dtype=np.int64)
+        self.all_rows = np.arange(self.lanes)
+
+    @property
+    def halt(self):
+        return bool(self.halted.all())
+
+    def step(self):
+        """Execute one instruction in every running lane. Returns False once all lanes have halted."""
+        self.halted |= self.pc >= self.size  # ran off the end of memory
+        running = np.flatnonzero(~self.halted)
+        if running.size == 0:
+            return False
+        pcs = self.pc[running]
+        first = pcs[0]
+        if (pcs == first).all():
+            self._execute(int(first), running)
+        else:
+            # Diverged: run each PC group under its own mask
+            for pc in np.unique(pcs):
+                self._execute(int(pc), running[pcs == pc])
+        return True
+
+    def run(self, max_steps=None):
+        """Run until every lane halts, or for at most `max_steps` lockstep steps."""
+        steps = 0
+        while (max_steps is None or steps < max_steps) and self.step():
+            steps += 1
+        return self.regs, self.io_memory
+
+    def lane_registers(self, lane):
+        return self.regs[lane].tolist()
+
+    def _byte_offsets(self, size):
+        """Byte offsets of an access, from most to least significant."""
+        return range(size) if self.big_endian else range(size - 1, -1, -1)
+
+    def _load(self, rows, addr, size, signed):
+        value = np.zeros(len(rows), dtype=np.uint32)
+        for k in self._byte_offsets(size):
+            value = (value << 8) | self.mem[rows, addr + k]
+        if size == 4:
+            return value.view(np.int32)
+        if signed:
+            return value.astype(np.uint16 if size == 2 else np.uint8).view(np.int16 if size == 2 else np.int8).astype(np.int32)
+        return value.astype(np.int32)
+
+    def _store(self, rows, addr, value, size):
+        text = self.decode_cache
+        in_text = (addr < text.text_end) & (addr + size > text.text_start)
+        if in_text.any():
+            i = int(np.argmax(in_text))
+            raise TextStoreError(f"lane {int(rows[i])} stores to 0x{int(addr[i]):08x}, in the program text, "
+                                 f"which vectorized mode can't modify")
+        value = value.view(np.uint32)
+        for i, k in enumerate(self._byte_offsets(size)):
+            shift = 8 * (size - 1 - i)
+            self.mem[rows, addr + k] = (value >> shift) & 0xFF
+        # Echo stores into the I/O range, per lane
+        io_lanes = (addr >= self.io.io_base) & (addr < self.io.io_base + self.io.io_size)
+        if io_lanes.any():
+            mask = (1 << (8 * size)) - 1
+            for row, data in zip(rows[io_lanes], value[io_lanes]):
+                self.io_memory[row].append(format(int(data) & mask, f'0{8 * size}b'))
+
+    def _execute(self, pc, rows):
+        inst = self.decode_cache.fetch(pc)
+        op = inst.op
+        # A slice avoids fancy-indexing copies while all lanes run together
+        lanes = slice(None) if len(rows) == self.lanes else rows
+        R = self.regs
+        self.instruction_count[lanes] += 1
+        next_pc = pc + 4
+
+        if op == Op.SYSCALL:
+            self.halted[lanes] = True
+            return
+        elif op == Op.JR:
+            target = R[lanes, inst.rs].astype(np.int64)
+            if inst.rs == 31:
+                self.halted[rows[target == 0]] = True
+            self.pc[lanes] = target
+            return
+        elif op == Op.BEQ or op == Op.BNE:
+            taken = R[lanes, inst.rs] == R[lanes, inst.rt]
+            if op == Op.BNE:
+                taken = ~taken
+            self.pc[lanes] = np.where(taken, next_pc + (inst.simm << 2), next_pc)
+            return
+        elif op == Op.J:
+            self.pc[lanes] = next_pc + (inst.target << 2)
+            return
+        elif op == Op.JAL:
+            R[lanes, 31] = next_pc
+            self.pc[lanes] = next_pc + (inst.target << 2)
+            return
+        elif op == Op.UNKNOWN:
+            raise ValueError(f"Unsupported instruction 0x{inst.word:08x} at PC {pc}")
+
+        a = R[lanes, inst.rs]
+        b = R[lanes, inst.rt]
+        dst = inst.rd if inst.type == 0 else inst.rt
+        match op:
+            case Op.ADD: value = a + b
+            case Op.SUB: value = a - b
+            case Op.AND: value = a & b
+            case Op.OR: value = a | b
+            case Op.XOR: value = a ^ b
+            case Op.NOR: value = ~(a | b)
+            case Op.SLT: value = (a < b).astype(np.int32)
+            case Op.SLTU: value = (a.view(np.uint32) < b.view(np.uint32)).astype(np.int32)
+            case Op.SLL: value = (b.view(np.uint32) << np.uint32(inst.shamt)).view(np.int32)
+            case Op.SRL: value = (b.view(np.uint32) >> np.uint32(inst.shamt)).view(np.int32)
+            case Op.SRA: value = b >> np.int32(inst.shamt)
+            case Op.ADDI: value = a + np.int32(inst.simm)
+            case Op.SLTI: value = (a < inst.simm).astype(np.int32)
+            case Op.SLTIU: value = (a.view(np.uint32) < np.uint32(inst.simm & 0xFFFFFFFF)).astype(np.int32)
+            case Op.ANDI: value = a & np.int32(inst.simm)
+            case Op.ORI: value = a | np.int32(inst.simm)
+            case Op.XORI: value = a ^ np.int32(inst.simm)
+            case Op.LUI: value = np.full(len(a), np.uint32(inst.imm << 16), dtype=np.uint32).view(np.int32)
+            case Op.LB | Op.LH | Op.LW | Op.LBU | Op.LHU:
+                size = 1 if op in (Op.LB, Op.LBU) else 2 if op in (Op.LH, Op.LHU) else 4
+                value = self._load(self.all_rows[lanes], a.astype(np.int64) + inst.simm, size,
+                                   op in (Op.LB, Op.LH, Op.LW))
+            case Op.SB | Op.SH | Op.SW:
+                size = 1 if op == Op.SB else 2 if op == Op.SH else 4
+                self._store(self.all_rows[lanes], a.astype(np.int64) + inst.simm, b, size)
+                dst = 0
+        if dst:
+            R[lanes, dst] = value
+        self.pc[lanes] = next_pc
+
+
+# Per-lane check against the scalar interpreter on random initial registers
+# (run from the repository root: python vectorized.py [file.asm ...])
+if __name__ == "__main__":
+    import glob
+    import sys
+    from interpreter import MIPSInterpreter
+    from utils.assembler import MIPSAssembler
+
+    divergent_loop = [
+        "andi $t0, $s0, 63",    # per-lane trip count from the random initial $s0
+        "addi $t1, $0, 0",
+        "loop:",
+        "addi $t1, $t1, 3",
+        "sw $t1, 0($sp)",
+        "lh $t2, 2($sp)",
+        "slt $t3, $t1, $t0",
+        "bne $t3, $0, loop",
+        "sb $t1, 2000($0)",
+        "syscall",
+    ]
+    programs = [(path, None) for path in (sys.argv[1:] or sorted(glob.glob("tests/*.asm")))]
+    programs.append(("divergent loop", divergent_loop))
+
+    rng = np.random.default_rng(0)
+    lanes = 64
+    for name, source in programs:
+        assembler = MIPSAssembler()
+        image = assembler.assemble(source) if source is not None else assembler.assemble_file(name)
+        initial = np.tile(np.array(Registers(initialise=True).values, dtype=np.int32), (lanes, 1))
+        # The test programs expect zeroed temporaries; vary $s0-$s7 per lane
+        initial[:, 16:24] = rng.integers(-2**31, 2**31, size=(lanes, 8), dtype=np.int64)
+        vectorized = VectorizedInterpreter(program=image, registers=initial)
+        vectorized.run()
+        for lane in range(lanes):
+            scalar = MIPSInterpreter(program=image, record_states=False)
+            scalar.registers.values = initial[lane].tolist()
+            states, io_memory = scalar.run()
+            assert states[-1] == vectorized.lane_registers(lane), f"{name}: lane {lane} registers differ"
+            assert io_memory == vectorized.io_memory[lane], f"{name}: lane {lane} I/O differs"
+            assert bytes(scalar.memory.buffer) == vectorized.mem[lane].tobytes(), f"{name}: lane {lane} memory differs"
+            assert scalar.instruction_count == vectorized.instruction_count[lane], f"{name}: lane {lane} counts differ"
+        print(f"{name}: OK ({lanes} lanes)")
+
+    # Self-modifying code is refused with a ValueError rather than run wrongly
+    try:
+        VectorizedInterpreter(program=MIPSAssembler().assemble(["sw $0, 0($0)", "syscall"]), lanes=2).run()
+    except TextStoreError as e:
+        assert isinstance(e, ValueError) and "lane 0" in str(e), e
+    else:
+        raise AssertionError("a store into the text region was not refused")
+    print("text store: refused")